@@ -1,5 +1,4 @@
 import streamlit as st
-import yfinance as yf
 import requests
 import pandas as pd
 import plotly.graph_objects as go
@@ -22,7 +21,9 @@ with open('assets/styles.css') as f:
     st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 from core.data_fetcher import StreamlitDataFetcher
 from core.calculators import SIPCalculator, PortfolioManager
-from components.charts import create_price_chart, create_sip_chart
+from core.alert_daemon import get_alert_daemon
+from core.ledger import LedgerError, sync_holdings
+from components.charts import create_price_chart, create_sip_chart, create_sip_heatmap, create_sip_backtest_chart
 from components.news import display_news
 from components.watchlist import display_watchlist
 from components.alerts import display_price_alerts
@@ -30,6 +31,8 @@ from components.performance import display_portfolio_performance
 from components.portfolio.overview import render_portfolio_overview
 from components.portfolio.holdings import render_holdings
 from components.portfolio.transactions import render_transactions
+from components.portfolio.risk import render_risk
+from components.portfolio.optimizer import render_optimizer
 from components.technical.indicators import render_technical_indicators
 from components.technical.chart_tools import render_chart_tools
 
@@ -41,7 +44,13 @@ def main():
     st.markdown("### Track your investments and plan your SIPs with real-time data")    
     fetcher = StreamlitDataFetcher()
     sip_calc = SIPCalculator()
-    portfolio_manager = PortfolioManager()    
+    portfolio_manager = PortfolioManager()
+    alert_daemon = get_alert_daemon(fetcher)
+    try:
+        # Every page reads holdings; keep them in step with the transaction log
+        sync_holdings()
+    except LedgerError:
+        pass  # reported on the Transactions page, where the log can be repaired
     st.sidebar.markdown("## 🎛️ Control Panel")    
     st.sidebar.markdown("### 📈 Select Assets")    
     asset_type = st.sidebar.selectbox(
@@ -53,6 +62,8 @@ def main():
         "Portfolio Overview",
         "Portfolio Holdings", 
         "Transactions",
+        "Portfolio Risk",
+        "Portfolio Optimizer",
         "Technical Analysis",
         "Chart Tools"
     ]
@@ -75,6 +86,9 @@ def main():
             stock_data = fetcher.fetch_stock_data(stock_symbol)
             
             if stock_data:
+                if stock_data.get('stale'):
+                    st.caption(f"⏳ Showing data as of {stock_data['as_of']:%H:%M:%S} — refreshing in the background")
+                
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
@@ -149,6 +163,9 @@ def main():
             crypto_data = fetcher.fetch_crypto_data(crypto_symbol)
             
             if crypto_data:
+                if crypto_data.get('stale'):
+                    st.caption(f"⏳ Showing data as of {crypto_data['as_of']:%H:%M:%S} — refreshing in the background")
+                
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
@@ -227,6 +244,15 @@ def main():
             value=15
         )
         
+        volatility = st.sidebar.slider(
+            "Return Volatility (% per year)",
+            min_value=0.0,
+            max_value=40.0,
+            value=15.0,
+            step=1.0,
+            help="Spread of simulated returns for the P5/P50/P95 bands; 0 disables the simulation"
+        )
+        
         result = sip_calc.calculate_sip_future_value(monthly_investment, annual_return, investment_years)
         timeline = sip_calc.generate_sip_timeline(monthly_investment, annual_return, investment_years)
         
@@ -269,13 +295,85 @@ def main():
         }
         st.table(pd.DataFrame(summary_data))
         
+        with st.expander("🔬 Scenario Explorer"):
+            # One cached grid per amount: slider moves within it are lookups, not recomputation
+            grid = sip_calc.scenario_grid(monthly_investment, np.arange(1.0, 30.5, 0.5), np.arange(1, 41))
+            st.plotly_chart(create_sip_heatmap(grid), use_container_width=True)
+            
+            st.markdown("**Sensitivity: Future Value by Return and Period**")
+            sensitivity = sip_calc.sensitivity_table(monthly_investment, annual_return, investment_years)
+            st.dataframe(sensitivity.style.format("₹{:,.0f}"), use_container_width=True)
+        
+        with st.expander("🎯 Goal Planner"):
+            col1, col2 = st.columns(2)
+            with col1:
+                target_amount = st.number_input("Target Corpus (₹)", min_value=10000, value=10000000, step=100000)
+            with col2:
+                step_up = st.slider("Annual Step-up (%)", min_value=0.0, max_value=25.0, value=10.0, step=1.0)
+            
+            required = sip_calc.required_monthly_investment(target_amount, annual_return, investment_years, step_up)
+            years_needed = sip_calc.required_years(target_amount, monthly_investment, annual_return, step_up)
+            step_up_result = sip_calc.calculate_step_up_future_value(
+                monthly_investment, annual_return, investment_years, step_up
+            )
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric(f"Needed per Month ({investment_years} yrs)", f"₹{required:,.0f}")
+            col2.metric(f"Time at ₹{monthly_investment:,}/month",
+                        "Not within 100 yrs" if np.isnan(years_needed) else f"{years_needed:.1f} yrs")
+            col3.metric("Step-up SIP Value", f"₹{step_up_result['future_value']:,.0f}",
+                        f"₹{step_up_result['total_invested']:,.0f} invested", delta_color="off")
+            
+            # Every goal in the table is solved in one vectorized call per column
+            targets = target_amount * np.array([0.25, 0.5, 1, 2, 5])
+            goals = pd.DataFrame({
+                'Target': targets,
+                'Monthly (flat)': sip_calc.required_monthly_investment(targets, annual_return, investment_years),
+                'Monthly (step-up)': sip_calc.required_monthly_investment(targets, annual_return, investment_years, step_up),
+                'Years at current amount': sip_calc.required_years(targets, monthly_investment, annual_return, step_up)
+            })
+            st.dataframe(goals.style.format({
+                'Target': "₹{:,.0f}", 'Monthly (flat)': "₹{:,.0f}", 'Monthly (step-up)': "₹{:,.0f}",
+                'Years at current amount': "{:.1f}"
+            }, na_rep="—"), use_container_width=True, hide_index=True)
+        
+        with st.expander("📜 Historical Backtest"):
+            backtest_symbol = st.text_input("Stock Symbol", value="AAPL").strip().upper()
+            stock_data = fetcher.fetch_stock_data(backtest_symbol, "max") if backtest_symbol else None
+            if stock_data:
+                backtest = sip_calc.backtest_sip(stock_data['history'], monthly_investment, investment_years)
+                if backtest.empty:
+                    st.info(f"Not enough history for a {investment_years}-year SIP in {backtest_symbol}.")
+                else:
+                    latest = backtest.iloc[-1]
+                    col1, col2, col3, col4 = st.columns(4)
+                    col1.metric("Latest Window XIRR", f"{latest['xirr']:.1f}%")
+                    col2.metric("Latest Final Value", f"₹{latest['final_value']:,.0f}")
+                    col3.metric("Median XIRR", f"{backtest['xirr'].median():.1f}%")
+                    col4.metric("Worst / Best", f"{backtest['xirr'].min():.1f}% / {backtest['xirr'].max():.1f}%")
+                    
+                    st.plotly_chart(create_sip_backtest_chart(backtest, annual_return), use_container_width=True)
+                    beat = (backtest['xirr'] >= annual_return).mean() * 100
+                    st.caption(f"{len(backtest)} rolling {investment_years}-year windows; "
+                               f"{beat:.0f}% matched or beat the expected {annual_return}% return.")
+        
         if st.button("📈 Generate Detailed Analysis"):
-            chart = create_sip_chart(timeline)
+            bands = None
+            if volatility > 0:
+                with st.spinner("Simulating 100,000 return paths..."):
+                    bands = sip_calc.simulate_sip(monthly_investment, annual_return, investment_years,
+                                                  volatility=volatility, seed=42)
+                final = bands.iloc[-1]
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Pessimistic (P5)", f"₹{final['p5']:,.0f}")
+                col2.metric("Median (P50)", f"₹{final['p50']:,.0f}")
+                col3.metric("Optimistic (P95)", f"₹{final['p95']:,.0f}")
+            
+            chart = create_sip_chart(timeline, annual_return, bands)
             st.plotly_chart(chart, use_container_width=True)
             
         if st.button("📥 Export SIP Results"):
-            timeline_df = pd.DataFrame(timeline)
-            csv = timeline_df.to_csv(index=False)
+            csv = timeline.to_csv(index=False)
             st.download_button(
                 label="Download CSV",
                 data=csv,
@@ -285,26 +383,33 @@ def main():
     
     elif asset_type == "Portfolio Overview":
         display_watchlist(portfolio_manager, fetcher)
-        current_prices = {}
-        display_price_alerts(portfolio_manager, current_prices)
-        display_portfolio_performance()
+        display_price_alerts(portfolio_manager, alert_daemon)
+        display_portfolio_performance(fetcher)
     
 
     elif asset_type == "Portfolio Holdings":
-        render_holdings()
+        render_holdings(fetcher)
 
     elif asset_type == "Transactions":
-        render_transactions()
+        render_transactions(fetcher)
+
+    elif asset_type == "Portfolio Risk":
+        render_risk(fetcher)
+
+    elif asset_type == "Portfolio Optimizer":
+        render_optimizer(fetcher)
 
     elif asset_type == "Technical Analysis":
         stock_symbol = st.sidebar.selectbox("Select Symbol", ["AAPL", "GOOGL", "MSFT"])
-        stock_data = fetcher.fetch_stock_data(stock_symbol)
+        period = st.sidebar.selectbox("History", ["6mo", "1y", "2y", "5y", "10y"], index=1)
+        stock_data = fetcher.fetch_stock_data(stock_symbol, period)
         if stock_data:
             render_technical_indicators(stock_data['history'], stock_symbol)
 
     elif asset_type == "Chart Tools":
         stock_symbol = st.sidebar.selectbox("Select Symbol", ["AAPL", "GOOGL", "MSFT"])
-        stock_data = fetcher.fetch_stock_data(stock_symbol)
+        period = st.sidebar.selectbox("History", ["6mo", "1y", "2y", "5y", "10y"], index=1)
+        stock_data = fetcher.fetch_stock_data(stock_symbol, period)
         if stock_data:
             render_chart_tools(stock_data['history'], stock_symbol)
     
@@ -315,6 +420,23 @@ def main():
         "Track stocks, crypto, and plan your SIP investments with real-time data and interactive visualizations."
     )
     
+    with st.sidebar.expander("🔌 API Usage"):
+        http_stats = fetcher.http.stats()
+        if http_stats:
+            st.dataframe(pd.DataFrame(http_stats).T.round(3), use_container_width=True)
+        else:
+            st.caption("No upstream requests yet.")
+        
+        cache_loads = {
+            'Stocks': fetcher.fetch_stock_data.cache.flight.stats(),
+            'Crypto': fetcher.fetch_crypto_data.cache.flight.stats()
+        }
+        st.caption("Cache loads (coalesced = concurrent requests that shared one load)")
+        st.dataframe(pd.DataFrame(cache_loads).T, use_container_width=True)
+        
+        st.caption("Rate-limit queues")
+        st.dataframe(pd.DataFrame(fetcher.http.scheduler.stats()).T, use_container_width=True)
+    
     st.sidebar.markdown("### 🔧 Features")
     st.sidebar.markdown("""
     - 📊 Real-time stock prices
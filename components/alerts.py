@@ -2,29 +2,58 @@ import streamlit as st
 import time
 from datetime import datetime
 
-def display_price_alerts(portfolio_manager, current_prices):
+from core.rules import RuleError
+
+# Newest trigger events shown as banners; the alert log keeps them all
+MAX_BANNERS = 10
+
+def display_price_alerts(portfolio_manager, alert_daemon):
     st.markdown("### 🔔 Price Alerts")
     
     with st.form("add_alert_form"):
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
             alert_symbol = st.text_input("Symbol", key="alert_symbol")
         with col2:
-            target_price = st.number_input("Target Price", min_value=0.01, value=100.0, step=1.0)
+            alert_asset_type = st.selectbox("Asset Type", ["stock", "crypto"], key="alert_asset_type")
         with col3:
+            target_price = st.number_input("Target Price", min_value=0.01, value=100.0, step=1.0)
+        with col4:
             condition = st.selectbox("Condition", ["above", "below"])
         
         if st.form_submit_button("Add Alert"):
             if alert_symbol:
-                portfolio_manager.add_price_alert(alert_symbol.upper(), target_price, condition)
+                portfolio_manager.add_price_alert(alert_symbol.upper(), target_price, condition, alert_asset_type)
                 st.success(f"Alert added for {alert_symbol} {condition} ${target_price}")
             else:
                 st.error("Please enter a symbol")
     
-    if not st.session_state.price_alerts:
+    with st.form("add_rule_form"):
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            rule_symbol = st.text_input("Symbol", key="rule_symbol")
+        with col2:
+            rule_asset_type = st.selectbox("Asset Type", ["stock", "crypto"], key="rule_asset_type")
+        with col3:
+            rule_text = st.text_input("Indicator Rule", placeholder="RSI(14) < 30",
+                                      help='Examples: "RSI(14) < 30", "close crosses MA50", '
+                                           '"MACD crosses above signal", "30d change > 10%"')
+        
+        if st.form_submit_button("Add Rule Alert"):
+            if rule_symbol and rule_text:
+                try:
+                    portfolio_manager.add_rule_alert(rule_symbol.upper(), rule_text, rule_asset_type)
+                    st.success(f"Rule alert added for {rule_symbol.upper()}: {rule_text}")
+                except RuleError as e:
+                    st.error(str(e))
+            else:
+                st.error("Please enter a symbol and a rule")
+    
+    alerts = portfolio_manager.alert_book.alerts()
+    if not alerts:
         st.info("No price alerts set up yet.")
     else:
-        for alert in st.session_state.price_alerts:
+        for alert in alerts:
             col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
             with col1:
                 st.write(f"**{alert['symbol']}**")
@@ -32,12 +61,32 @@ def display_price_alerts(portfolio_manager, current_prices):
                 status = "✅ Triggered" if alert['triggered'] else "🟡 Active"
                 st.write(status)
             with col3:
-                st.write(f"{alert['condition']} ${alert['target_price']}")
+                if alert['condition'] == 'rule':
+                    st.write(f"`{alert['rule']}`")
+                else:
+                    st.write(f"{alert['condition']} ${alert['target_price']}")
             with col4:
                 if st.button("Delete", key=f"delete_{alert['id']}"):
                     portfolio_manager.remove_price_alert(alert['id'])
                     st.rerun()
         
-        triggered = portfolio_manager.check_price_alerts(current_prices)
-        for alert in triggered:
-            st.success(f"Alert! {alert['symbol']} is {alert['condition']} ${alert['target_price']}")
\ No newline at end of file
+    # Alerts are evaluated by the background daemon; this only reports what it found
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        last_run = alert_daemon.last_run.strftime("%H:%M:%S") if alert_daemon.last_run else "not yet"
+        status = "running" if alert_daemon.running else "stopped"
+        st.caption(f"Background checks {status}, every {alert_daemon.interval}s (last: {last_run})")
+    with col2:
+        if st.button("Check Now"):
+            alert_daemon.run_once()
+    
+    events = alert_daemon.recent_events()
+    for event in events[:MAX_BANNERS]:
+        if event['condition'] == 'rule':
+            st.success(f"Alert! {event['symbol']} matched `{event['rule']}` "
+                       f"(close ${event['price']:,.2f}) at {event['triggered_at']}")
+        else:
+            st.success(f"Alert! {event['symbol']} hit ${event['price']:,.2f} "
+                       f"({event['condition']} ${event['target_price']}) at {event['triggered_at']}")
+    if len(events) > MAX_BANNERS:
+        st.caption(f"{len(events) - MAX_BANNERS} older alerts not shown; see the alert log.")
@@ -28,9 +28,13 @@ def create_price_chart(data, title):
     
     return fig
 
-def create_sip_chart(timeline_data):
-    """Create SIP growth chart"""
-    df = pd.DataFrame(timeline_data)
+def create_sip_chart(timeline_data, annual_return=12, bands=None):
+    """Create SIP growth chart from the timeline DataFrame
+    
+    bands is an optional simulate_sip result whose p5/p50/p95 columns are drawn
+    as a shaded range around the deterministic curve.
+    """
+    df = timeline_data
     
     fig = make_subplots(
         rows=2, cols=2,
@@ -49,8 +53,22 @@ def create_sip_chart(timeline_data):
                   fill='tonexty', line=dict(color='green')),
         row=1, col=1
     )
+    if bands is not None:
+        fig.add_trace(
+            go.Scatter(x=bands['year'], y=bands['p95'], name='P95', line=dict(color='gray', width=1, dash='dot')),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=bands['year'], y=bands['p5'], name='P5 - P95', line=dict(color='gray', width=1, dash='dot'),
+                      fill='tonexty', fillcolor='rgba(128, 128, 128, 0.15)'),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=bands['year'], y=bands['p50'], name='Median (P50)', line=dict(color='orange', dash='dash')),
+            row=1, col=1
+        )
     
-    final_data = timeline_data[-1]
+    final_data = df.iloc[-1]
     fig.add_trace(
         go.Bar(x=['Invested', 'Returns', 'Profit'], 
                y=[final_data['invested'], final_data['value'], final_data['profit']],
@@ -59,29 +77,20 @@ def create_sip_chart(timeline_data):
         row=1, col=2
     )
     
-    yearly_data = [d for d in timeline_data if d['month'] % 12 == 0]
-    if yearly_data:
-        years = [d['year'] for d in yearly_data]
-        invested = [d['invested'] for d in yearly_data]
-        values = [d['value'] for d in yearly_data]
-        
+    yearly_data = df[df['month'] % 12 == 0]
+    if not yearly_data.empty:
         fig.add_trace(
-            go.Bar(x=years, y=invested, name='Invested', marker_color='lightblue', showlegend=False),
+            go.Bar(x=yearly_data['year'], y=yearly_data['invested'], name='Invested', marker_color='lightblue', showlegend=False),
             row=2, col=1
         )
         fig.add_trace(
-            go.Bar(x=years, y=values, name='Value', marker_color='lightgreen', showlegend=False),
+            go.Bar(x=yearly_data['year'], y=yearly_data['value'], name='Value', marker_color='lightgreen', showlegend=False),
             row=2, col=1
         )
     
     amounts = [5000, 10000, 15000, 20000, 25000]
-    calc = SIPCalculator()
-    final_values = []
-    
-    for amount in amounts:
-        years = len(timeline_data) / 12
-        result = calc.calculate_sip_future_value(amount, 12, years)
-        final_values.append(result['future_value'])
+    grid = SIPCalculator().scenario_grid(amounts, annual_return, len(df) / 12)
+    final_values = grid['future_value'][:, 0, 0]
     
     fig.add_trace(
         go.Bar(x=amounts, y=final_values, marker_color='coral', showlegend=False),
@@ -89,4 +98,73 @@ def create_sip_chart(timeline_data):
     )
     
     fig.update_layout(height=600, showlegend=True, title_text="📊 SIP Analysis Dashboard")
-    return fig
\ No newline at end of file
+    return fig
+
+def create_sip_backtest_chart(backtest, annual_return=None):
+    """Rolling XIRR of a historical SIP by start month"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=backtest['start'],
+        y=backtest['xirr'],
+        mode='lines',
+        name='XIRR',
+        line=dict(color='#1f77b4', width=2),
+        customdata=backtest[['end', 'final_value']],
+        hovertemplate='<b>Start:</b> %{x|%b %Y}<br><b>End:</b> %{customdata[0]|%b %Y}<br>'
+                      '<b>XIRR:</b> %{y:.1f}%<br><b>Value:</b> ₹%{customdata[1]:,.0f}<extra></extra>'
+    ))
+    if annual_return is not None:
+        fig.add_hline(y=annual_return, line_dash="dash", line_color="gray",
+                      annotation_text=f"Expected {annual_return}%")
+    
+    fig.update_layout(
+        title="Rolling SIP Returns by Start Month",
+        xaxis_title="Start Month",
+        yaxis_title="XIRR (%)",
+        hovermode='x unified',
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+def create_sip_heatmap(grid, amount_index=0):
+    """Heatmap of future value over annual return x tenure for one amount of a scenario grid"""
+    fig = go.Figure(go.Heatmap(
+        x=grid['years'],
+        y=grid['annual_returns'],
+        z=grid['future_value'][amount_index],
+        colorscale='Viridis',
+        colorbar=dict(title='Value (₹)'),
+        hovertemplate='<b>Years:</b> %{x}<br><b>Return:</b> %{y}%<br><b>Value:</b> ₹%{z:,.0f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f"Future Value for ₹{grid['amounts'][amount_index]:,.0f}/month",
+        xaxis_title="Investment Period (Years)",
+        yaxis_title="Annual Return (%)",
+        height=450
+    )
+    return fig
+
+def create_portfolio_performance_chart(series, benchmark_label="S&P 500"):
+    """Time-weighted return against the benchmark, with both drawdowns underneath"""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.05)
+    fig.add_trace(go.Scatter(x=series.index, y=series['twr'], name='Your Portfolio',
+                             line=dict(color='#1f77b4', width=3)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=series.index, y=series['drawdown'], name='Portfolio Drawdown',
+                             fill='tozeroy', line=dict(color='#d62728', width=1)), row=2, col=1)
+    if 'benchmark' in series:
+        fig.add_trace(go.Scatter(x=series.index, y=series['benchmark'], name=benchmark_label,
+                                 line=dict(color='#888888', width=2)), row=1, col=1)
+        fig.add_trace(go.Scatter(x=series.index, y=series['benchmark_drawdown'], name=f'{benchmark_label} Drawdown',
+                                 line=dict(color='#888888', width=1, dash='dot')), row=2, col=1)
+    
+    fig.update_layout(
+        title="Portfolio Performance vs Benchmark",
+        hovermode='x unified',
+        height=500
+    )
+    fig.update_yaxes(title_text="Time-weighted Return (%)", row=1, col=1)
+    fig.update_yaxes(title_text="Drawdown (%)", row=2, col=1)
+    fig.update_xaxes(title_text="Date", row=2, col=1)
+    return fig
@@ -1,50 +1,141 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 from datetime import datetime
-import plotly.graph_objects as go
 
-def display_portfolio_performance():
+from components.charts import create_portfolio_performance_chart
+from core.portfolio_series import PortfolioSeries
+from core.storage import get_portfolio_store
+
+BENCHMARK = "SPY"
+
+def load_closes(fetcher, assets, start):
+    """Daily closes from `start` to today as a dates x symbols frame; symbols without data are left out"""
+    end = pd.Timestamp.now().normalize()
+    if start > end:
+        return pd.DataFrame()
+    closes = {}
+    for symbol, asset_type in assets.items():
+        try:
+            if asset_type.lower() == "crypto":
+                days = max(1, (end - start).days + 1)
+                history = fetcher.fetch_crypto_history(symbol.lower(), days)
+            else:
+                history = fetcher.load_history(symbol, start, end)
+        except Exception:
+            continue
+        if history is not None and not history.empty:
+            close = history['Close']
+            closes[symbol] = close.groupby(close.index.normalize()).last()
+    return pd.DataFrame(closes).sort_index().loc[start:] if closes else pd.DataFrame()
+
+def _fingerprint(transactions):
+    """Hash of the stored transactions, so an edited or deleted row forces a rebuild"""
+    return hash(tuple((transaction['id'], transaction['date'], transaction['type'], transaction['symbol'],
+                       transaction['quantity'], transaction['price']) for transaction in transactions))
+
+def _build_series(fetcher, transactions):
+    start = pd.Timestamp(transactions[0]['date']).normalize()
+    assets = {transaction['symbol']: transaction['asset_type'] for transaction in transactions}
+    closes = load_closes(fetcher, {**assets, BENCHMARK: "Stock"}, start)
+    benchmark = closes.get(BENCHMARK)
+    if BENCHMARK not in assets:
+        closes = closes.drop(columns=BENCHMARK, errors='ignore')
+    if closes.empty:
+        return None
+    return PortfolioSeries(transactions, closes, benchmark=benchmark)
+
+def portfolio_series(fetcher, store):
+    """Session's PortfolioSeries, extended with transactions and closes that arrived since the last run
+
+    New rows are those with an id above the highest id already applied (ids
+    are not in date order, so back-dated entries are caught too). If any
+    applied row was edited or deleted, or a new one predates the series, it
+    is rebuilt from scratch. The last day is re-marked on every run, so
+    today's value moves from the intraday price to the close.
+    """
+    transactions = store.transactions()
+    if not transactions:
+        st.session_state.pop('portfolio_series', None)
+        return None
+    series, last_id, fingerprint = st.session_state.get('portfolio_series', (None, 0, None))
+    applied = [transaction for transaction in transactions if transaction['id'] <= last_id]
+
+    if (series is None or _fingerprint(applied) != fingerprint
+            or pd.Timestamp(transactions[0]['date']).normalize() < series.dates[0]):
+        series = _build_series(fetcher, transactions)
+        if series is None:
+            return None
+    else:
+        for transaction in transactions:
+            if transaction['id'] <= last_id:
+                continue
+            history = None
+            if transaction['symbol'] not in series.symbols:
+                history = load_closes(fetcher, {transaction['symbol']: transaction['asset_type']},
+                                      series.dates[0]).get(transaction['symbol'])
+            series.add_transaction(transaction, history)
+        assets = {transaction['symbol']: transaction['asset_type'] for transaction in transactions}
+        new = load_closes(fetcher, {**assets, BENCHMARK: "Stock"}, series.dates[-1])
+        for date, row in new.iterrows():
+            benchmark = row.get(BENCHMARK)
+            if BENCHMARK not in assets:
+                row = row.drop(BENCHMARK, errors='ignore')
+            series.add_prices(date, row.dropna().to_dict(), benchmark)
+
+    st.session_state['portfolio_series'] = (
+        series, max(transaction['id'] for transaction in transactions), _fingerprint(transactions)
+    )
+    return series
+
+def display_portfolio_performance(fetcher):
     st.markdown("### 📊 Portfolio Performance")
-    
+
+    store = get_portfolio_store()
+    series = portfolio_series(fetcher, store)
+    if series is None:
+        if store.transaction_count():
+            st.warning("No price history available for the symbols you've traded, so performance can't be shown yet.")
+        else:
+            st.info("Record transactions to see your portfolio's performance.")
+        return
+
+    daily = series.frame()
+    latest = daily.iloc[-1]
+    previous = daily.iloc[-2] if len(daily) > 1 else latest
+    today_change = latest['value'] - previous['value'] - latest['flow']
+    total_gain = latest['value'] - latest['contributions'] - series.initial_cash
+    invested = latest['contributions'] + series.initial_cash
+
+    year_start = daily[daily.index < pd.Timestamp(datetime.now().year, 1, 1)]
+    base = year_start.iloc[-1] if not year_start.empty else daily.iloc[0]
+    ytd = ((1 + latest['twr'] / 100) / (1 + base['twr'] / 100) - 1) * 100
+
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
-        st.metric("Total Value", "$125,430", "+2.3%")
+        st.metric("Total Value", f"${latest['value']:,.0f}", f"{latest['twr']:+.1f}% TWR")
     with col2:
-        st.metric("Today's Change", "+$2,850", "+1.8%")
+        change_pct = today_change / previous['value'] * 100 if previous['value'] else 0.0
+        st.metric("Today's Change", f"${today_change:+,.0f}", f"{change_pct:+.1f}%")
     with col3:
-        st.metric("Total Gain", "$25,430", "+25.4%")
+        gain_pct = total_gain / invested * 100 if invested else 0.0
+        st.metric("Total Gain", f"${total_gain:,.0f}", f"{gain_pct:+.1f}%")
     with col4:
-        st.metric("YTD Return", "+15.2%", "vs. SPY +12.1%")
-    
-    dates = pd.date_range(start='2023-01-01', end=datetime.now(), freq='D')
-    portfolio_values = [100000 + i*100 + np.random.normal(0, 500) for i in range(len(dates))]
-    spy_values = [100000 + i*80 + np.random.normal(0, 400) for i in range(len(dates))]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=portfolio_values, name='Your Portfolio', line=dict(color='#1f77b4')))
-    fig.add_trace(go.Scatter(x=dates, y=spy_values, name='S&P 500', line=dict(color='#888888')))
-    
-    fig.update_layout(
-        title="Portfolio Performance vs Benchmark",
-        xaxis_title="Date",
-        yaxis_title="Portfolio Value ($)",
-        hovermode='x unified'
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
+        if 'benchmark' in daily:
+            benchmark_ytd = ((1 + latest['benchmark'] / 100) / (1 + base['benchmark'] / 100) - 1) * 100
+            st.metric("YTD Return", f"{ytd:+.1f}%", f"vs. {BENCHMARK} {benchmark_ytd:+.1f}%")
+        else:
+            st.metric("YTD Return", f"{ytd:+.1f}%")
+
+    st.plotly_chart(create_portfolio_performance_chart(daily, f"S&P 500 ({BENCHMARK})"), use_container_width=True)
+    st.caption(f"Max drawdown {daily['drawdown'].min():.1f}% · cash ${latest['cash']:,.0f} · "
+               f"contributed ${latest['contributions']:,.0f}")
+
     if st.button("📊 Export Performance Data"):
-        perf_df = pd.DataFrame({
-            'Date': dates,
-            'Portfolio_Value': portfolio_values,
-            'SPY_Value': spy_values
-        })
-        csv = perf_df.to_csv(index=False)
+        csv = daily.rename_axis('Date').to_csv()
         st.download_button(
             label="Download CSV",
             data=csv,
             file_name="portfolio_performance.csv",
             mime="text/csv"
-        )
\ No newline at end of file
+        )
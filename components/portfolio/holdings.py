@@ -1,18 +1,21 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import numpy as np
 
-def render_holdings():
+from core.ledger import LedgerError, sync_holdings
+from core.storage import get_portfolio_store
+from core.valuation import fetch_prices, valuation_totals, value_holdings
+
+DISPLAY_COLUMNS = {
+    'symbol': 'Symbol', 'asset_type': 'Type', 'quantity': 'Quantity', 'purchase_price': 'Avg Price',
+    'current_price': 'Current Price', 'cost_basis': 'Invested', 'market_value': 'Current Value',
+    'pnl': 'P&L', 'pnl_pct': 'P&L %', 'weight': 'Weight %'
+}
+
+def render_holdings(fetcher=None):
     st.header("📦 Your Holdings")
     
-    if 'portfolio' not in st.session_state:
-        st.session_state.portfolio = {
-            'holdings': {},
-            'cash_balance': 15000
-        }
-    
-    portfolio = st.session_state.portfolio
+    store = get_portfolio_store()
+    portfolio = store.portfolio()
     
     with st.expander("➕ Add New Holding", expanded=False):
         col1, col2, col3, col4 = st.columns(4)
@@ -31,93 +34,60 @@ def render_holdings():
         
         if st.button("Add to Portfolio"):
             if symbol and quantity > 0 and purchase_price > 0:
-                if symbol in portfolio['holdings']:
-                    holding = portfolio['holdings'][symbol]
-                    total_quantity = holding['quantity'] + quantity
-                    avg_price = ((holding['quantity'] * holding['purchase_price']) + 
-                                (quantity * purchase_price)) / total_quantity
-                    
-                    portfolio['holdings'][symbol] = {
-                        'quantity': total_quantity,
-                        'purchase_price': avg_price,
-                        'total_invested': total_quantity * avg_price,
-                        'current_price': holding['current_price'],
-                        'current_value': total_quantity * holding['current_price'],
-                        'asset_type': asset_type,
-                        'last_updated': datetime.now().strftime("%Y-%m-%d")
-                    }
-                else:
-                    current_price = purchase_price * (1 + np.random.uniform(-0.1, 0.3))
-                    portfolio['holdings'][symbol] = {
-                        'quantity': quantity,
-                        'purchase_price': purchase_price,
-                        'total_invested': quantity * purchase_price,
-                        'current_price': current_price,
-                        'current_value': quantity * current_price,
-                        'asset_type': asset_type,
-                        'last_updated': datetime.now().strftime("%Y-%m-%d")
-                    }
+                # Recorded as a buy so the transaction log stays the one source of the holdings
+                store.add_transaction({
+                    'date': datetime.now().strftime("%Y-%m-%d"),
+                    'type': 'Buy',
+                    'symbol': symbol.upper(),
+                    'asset_type': asset_type,
+                    'quantity': quantity,
+                    'price': purchase_price,
+                    'total_amount': quantity * purchase_price,
+                    'timestamp': datetime.now().isoformat()
+                })
+                try:
+                    sync_holdings()
+                except LedgerError:
+                    pass  # another symbol's rows are inconsistent; the Transactions page reports it
                 
-                st.success(f"Added {quantity} shares of {symbol} to portfolio!")
+                st.success(f"Added {quantity} shares of {symbol.upper()} to portfolio!")
                 st.rerun()
             else:
                 st.error("Please fill all fields correctly.")
     
     if portfolio['holdings']:
-        holdings_data = []
-        total_invested = 0
-        total_current = 0
-        
-        for symbol, holding in portfolio['holdings'].items():
-            gain_loss = holding['current_value'] - holding['total_invested']
-            gain_loss_pct = (gain_loss / holding['total_invested']) * 100
-            
-            holdings_data.append({
-                'Symbol': symbol,
-                'Type': holding['asset_type'],
-                'Quantity': holding['quantity'],
-                'Avg Price': f"${holding['purchase_price']:.2f}",
-                'Current Price': f"${holding['current_price']:.2f}",
-                'Invested': f"${holding['total_invested']:,.2f}",
-                'Current Value': f"${holding['current_value']:,.2f}",
-                'P&L': f"${gain_loss:,.2f}",
-                'P&L %': f"{gain_loss_pct:.1f}%",
-                'P&L Color': 'green' if gain_loss >= 0 else 'red'
-            })
-            
-            total_invested += holding['total_invested']
-            total_current += holding['current_value']
+        prices = {}
+        if fetcher is not None:
+            prices, errors = fetch_prices(fetcher, {symbol: holding['asset_type']
+                                                    for symbol, holding in portfolio['holdings'].items()})
+            store.update_prices(prices)
+            if errors:
+                st.caption(f"No current quote for {', '.join(sorted(errors))}; showing the last stored price.")
         
-        total_gain_loss = total_current - total_invested
-        total_gain_loss_pct = (total_gain_loss / total_invested) * 100 if total_invested > 0 else 0
+        valued = value_holdings(portfolio['holdings'], prices)
+        totals = valuation_totals(valued)
         
-        holdings_data.append({
-            'Symbol': 'TOTAL',
-            'Type': '',
-            'Quantity': '',
-            'Avg Price': '',
-            'Current Price': '',
-            'Invested': f"${total_invested:,.2f}",
-            'Current Value': f"${total_current:,.2f}",
-            'P&L': f"${total_gain_loss:,.2f}",
-            'P&L %': f"{total_gain_loss_pct:.1f}%",
-            'P&L Color': 'green' if total_gain_loss >= 0 else 'red'
-        })
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Invested", f"${totals['cost_basis']:,.2f}")
+        col2.metric("Current Value", f"${totals['market_value']:,.2f}")
+        col3.metric("P&L", f"${totals['pnl']:,.2f}", f"{totals['pnl_pct']:.1f}%")
         
-        df = pd.DataFrame(holdings_data)
+        df = valued.drop(columns='stale').reset_index().rename(columns=DISPLAY_COLUMNS)
         
         def color_pl(val):
-            color = 'green' if float(val.replace('$', '').replace(',', '').replace('%', '')) >= 0 else 'red'
-            return f'color: {color}'
+            return f"color: {'green' if val >= 0 else 'red'}"
         
-        styled_df = df.style.applymap(color_pl, subset=['P&L', 'P&L %'])
+        money = "${:,.2f}"
+        styled_df = df.style.format({
+            'Quantity': "{:g}", 'Avg Price': money, 'Current Price': money, 'Invested': money,
+            'Current Value': money, 'P&L': money, 'P&L %': "{:.1f}%", 'Weight %': "{:.1f}%"
+        }, na_rep="n/a").map(color_pl, subset=['P&L', 'P&L %'])
         
         st.dataframe(styled_df, use_container_width=True, hide_index=True)
         
         if st.button("📥 Export Holdings to CSV"):
-            export_df = df.drop(columns=['P&L Color'])
-            csv = export_df.to_csv(index=False)
+            csv = df.to_csv(index=False)
             st.download_button("Download CSV", csv, "portfolio_holdings.csv", "text/csv")
     
     else:
-        st.info("No holdings yet. Add some stocks or crypto to your portfolio.")
\ No newline at end of file
+        st.info("No holdings yet. Add some stocks or crypto to your portfolio.")
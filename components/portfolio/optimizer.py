@@ -0,0 +1,95 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+from components.performance import load_closes
+from components.portfolio.risk import WINDOWS
+from core.optimizer import cached_frontier, portfolio_stats, rebalance_trades
+from core.storage import get_portfolio_store
+
+def render_optimizer(fetcher):
+    st.header("🎯 Portfolio Optimizer")
+
+    store = get_portfolio_store()
+    holdings = store.holdings()
+    assets = {symbol: holding['asset_type'] for symbol, holding in holdings.items()}
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        window = WINDOWS[st.selectbox("Lookback", list(WINDOWS), index=2)]
+        include_watchlist = st.checkbox("Include watchlist symbols", value=True)
+    with col2:
+        cap = st.slider("Max weight per asset (%)", 5, 100, 40, 5) / 100
+        risk_free = st.number_input("Risk-free rate (%)", 0.0, 20.0, 4.0, 0.25) / 100
+    with col3:
+        target_name = st.radio("Target portfolio", ["Max Sharpe", "Min Variance"])
+        cash = st.number_input("Cash to invest ($)", 0.0, value=0.0, step=100.0)
+
+    if include_watchlist:
+        for item in store.watchlist():
+            assets.setdefault(item['symbol'], item['asset_type'])
+    if len(assets) < 2:
+        st.info("Add at least two holdings or watchlist symbols to optimize a portfolio.")
+        return
+
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=int(window * 1.5) + 10)
+    closes = load_closes(fetcher, assets, start)
+    if closes.shape[1] < 2 or len(closes) < 3:
+        st.warning("Not enough price history to optimize.")
+        return
+    if cap * closes.shape[1] < 1:
+        st.warning(f"A {cap:.0%} cap cannot be fully invested across {closes.shape[1]} assets; raise the cap.")
+        return
+
+    snapshot = (tuple(closes.columns), str(closes.index[-1]))
+    with st.spinner("Solving the efficient frontier..."):
+        result = cached_frontier(snapshot, window, cap, risk_free, closes)
+
+    mu, cov = result['mu'], result['cov']
+    symbols = result['max_sharpe'].index
+    last = closes.ffill().iloc[-1]
+    current_values = pd.Series({symbol: holding['quantity'] * last.get(symbol, float('nan'))
+                                for symbol, holding in holdings.items()}, dtype=float).dropna()
+
+    fig = go.Figure()
+    frontier = result['frontier']
+    fig.add_trace(go.Scatter(x=frontier['volatility'], y=frontier['return'], mode='lines', name='Efficient Frontier',
+                             line=dict(color='#1f77b4', width=3)))
+    fig.add_trace(go.Scatter(x=(cov.to_numpy().diagonal() ** 0.5), y=mu, mode='markers+text', name='Assets',
+                             text=list(symbols), textposition='top center', marker=dict(color='#888888')))
+    for name, weights, color in (("Max Sharpe", result['max_sharpe'], '#2ca02c'),
+                                 ("Min Variance", result['min_variance'], '#ff7f0e')):
+        expected, volatility, _ = portfolio_stats(weights.to_numpy(), mu[symbols], cov.loc[symbols, symbols])
+        fig.add_trace(go.Scatter(x=volatility, y=expected, mode='markers', name=name,
+                                 marker=dict(color=color, size=14, symbol='star')))
+    if current_values.sum() > 0:
+        current = (current_values / current_values.sum()).reindex(symbols).fillna(0.0)
+        expected, volatility, _ = portfolio_stats(current.to_numpy(), mu[symbols], cov.loc[symbols, symbols])
+        fig.add_trace(go.Scatter(x=volatility, y=expected, mode='markers', name='Current Portfolio',
+                                 marker=dict(color='#d62728', size=12)))
+    fig.update_layout(
+        title="Efficient Frontier",
+        xaxis_title="Annual Volatility",
+        yaxis_title="Expected Annual Return",
+        xaxis_tickformat='.0%',
+        yaxis_tickformat='.0%',
+        height=500
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    target = result['max_sharpe'] if target_name == "Max Sharpe" else result['min_variance']
+    expected, volatility, sharpe = portfolio_stats(target.to_numpy(), mu[symbols], cov.loc[symbols, symbols], risk_free)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Expected Return", f"{expected[0]:.1%}")
+    col2.metric("Volatility", f"{volatility[0]:.1%}")
+    col3.metric("Sharpe Ratio", f"{sharpe[0]:.2f}")
+
+    st.subheader(f"Rebalancing Trades to {target_name}")
+    trades = rebalance_trades(current_values, target.round(6), last, cash)
+    trades = trades[(trades['current_value'] > 0) | (trades['target_weight'] > 0)]
+    money = "${:,.2f}"
+    st.dataframe(trades.style.format({
+        'current_weight': "{:.1%}", 'target_weight': "{:.1%}", 'current_value': money,
+        'target_value': money, 'trade_value': money, 'trade_quantity': "{:,.4f}"
+    }, na_rep="n/a"), use_container_width=True)
+    st.caption("Historical mean returns are noisy estimates; treat the frontier as a guide, not a forecast.")
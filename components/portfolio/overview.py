@@ -5,18 +5,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from core.storage import get_portfolio_store
+
 def render_portfolio_overview():
     st.header("📊 Portfolio Overview")
     
-    if 'portfolio' not in st.session_state:
-        st.session_state.portfolio = {
-            'total_value': 125430,
-            'cash_balance': 15000,
-            'initial_investment': 100000,
-            'holdings': {}
-        }
-    
-    portfolio = st.session_state.portfolio
+    portfolio = get_portfolio_store().portfolio()
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -0,0 +1,69 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from components.performance import BENCHMARK, load_closes
+from core.risk import cached_risk_report
+from core.storage import get_portfolio_store
+
+WINDOWS = {"3 months": 63, "6 months": 126, "1 year": 252, "2 years": 504}
+
+def render_risk(fetcher):
+    st.header("⚠️ Portfolio Risk")
+
+    holdings = get_portfolio_store().holdings()
+    if not holdings:
+        st.info("No holdings yet. Add some stocks or crypto to analyse portfolio risk.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        window = WINDOWS[st.selectbox("Lookback", list(WINDOWS), index=2)]
+    with col2:
+        confidence = st.slider("Confidence (%)", 90.0, 99.5, 95.0, 0.5) / 100
+
+    # Calendar days covering `window` trading days, with room for holidays
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=int(window * 1.5) + 10)
+    assets = {symbol: holding['asset_type'] for symbol, holding in holdings.items()}
+    closes = load_closes(fetcher, {**assets, BENCHMARK: "Stock"}, start)
+    benchmark = closes.get(BENCHMARK)
+    if BENCHMARK not in assets:
+        closes = closes.drop(columns=BENCHMARK, errors='ignore')
+    if closes.empty or len(closes) < 3:
+        st.warning("Not enough price history to estimate risk.")
+        return
+
+    last = closes.ffill().iloc[-1]
+    weights = {symbol: holding['quantity'] * last.get(symbol, float('nan')) for symbol, holding in holdings.items()}
+    snapshot = (tuple(sorted((symbol, holding['quantity']) for symbol, holding in holdings.items())),
+                str(closes.index[-1]))
+    report = cached_risk_report(snapshot, window, confidence, closes, weights, benchmark)
+
+    level = f"{confidence * 100:g}%"
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Annual Volatility", f"{report['volatility'] * 100:.1f}%")
+    col2.metric(f"Beta vs {BENCHMARK}", "n/a" if pd.isna(report['beta']) else f"{report['beta']:.2f}")
+    col3.metric("Max Drawdown", f"{report['max_drawdown'] * 100:.1f}%")
+    col4.metric("Observations", report['observations'])
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(f"Historical VaR ({level})", f"{report['historical_var'] * 100:.2f}%")
+    col2.metric(f"Historical CVaR ({level})", f"{report['historical_cvar'] * 100:.2f}%")
+    col3.metric(f"Parametric VaR ({level})", f"{report['parametric_var'] * 100:.2f}%")
+    col4.metric(f"Parametric CVaR ({level})", f"{report['parametric_cvar'] * 100:.2f}%")
+    st.caption(f"One-day losses at {level} confidence. Covariance shrinkage intensity {report['shrinkage']:.2f}.")
+
+    assets = report['assets'].sort_values('risk_contribution', ascending=False)
+    fig = px.bar(assets.reset_index(names='Asset'), x='Asset', y='risk_contribution',
+                 title='Contribution to Portfolio Risk')
+    fig.update_layout(yaxis_tickformat='.0%', yaxis_title='Share of variance')
+    st.plotly_chart(fig, use_container_width=True)
+
+    percent = "{:.1%}"
+    st.dataframe(assets.style.format({
+        'weight': percent, 'volatility': percent, 'risk_contribution': percent, 'var': "{:.2%}", 'beta': "{:.2f}"
+    }, na_rep="n/a"), use_container_width=True)
+
+    missing = sorted(set(holdings) - set(assets.index))
+    if missing:
+        st.caption(f"Not enough price history for {', '.join(missing)}; excluded.")
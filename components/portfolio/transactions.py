@@ -2,11 +2,16 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
-def render_transactions():
+from core.calculators import SIPCalculator, transaction_cashflows
+from core.ledger import LedgerError, check_log, check_transaction, get_ledger, sync_holdings
+from core.storage import get_portfolio_store
+
+LOT_METHODS = {"FIFO": "fifo", "LIFO": "lifo", "Average cost": "average"}
+
+def render_transactions(fetcher=None):
     st.header("💼 Transaction History")
     
-    if 'transactions' not in st.session_state:
-        st.session_state.transactions = []
+    store = get_portfolio_store()
     
     with st.expander("➕ Record New Transaction", expanded=False):
         col1, col2 = st.columns(2)
@@ -36,19 +41,32 @@ def render_transactions():
                     'timestamp': datetime.now().isoformat()
                 }
                 
-                st.session_state.transactions.append(transaction)
-                st.success(f"Recorded {transaction_type} of {quantity} {symbol} @ ${price:.2f}")
-                st.rerun()
+                try:
+                    # Replayed at its own date, so a back-dated sell can't oversell an earlier position
+                    check_transaction(store.transactions(symbol=symbol.upper()), transaction)
+                except LedgerError as e:
+                    st.error(f"Cannot record this transaction: {e}")
+                else:
+                    store.add_transaction(transaction)
+                    try:
+                        sync_holdings()
+                    except LedgerError:
+                        pass  # another symbol's rows are inconsistent; the Transactions page reports it
+                    st.success(f"Recorded {transaction_type} of {quantity} {symbol} @ ${price:.2f}")
+                    st.rerun()
             else:
                 st.error("Please fill all fields correctly.")
     
-    if st.session_state.transactions:
-        transactions_df = pd.DataFrame(st.session_state.transactions)
+    transactions = store.transactions()
+    if transactions:
+        transactions_df = pd.DataFrame(transactions)
         transactions_df = transactions_df.sort_values('date', ascending=False)
         
         st.dataframe(transactions_df[['date', 'type', 'symbol', 'quantity', 'price', 'total_amount']], 
                     use_container_width=True)
         
+        delete_transaction_form(store, transactions)
+        
         st.subheader("Transaction Statistics")
         
         col1, col2, col3 = st.columns(3)
@@ -65,9 +83,109 @@ def render_transactions():
             total_volume = transactions_df['total_amount'].sum()
             st.metric("Total Volume", f"${total_volume:,.2f}")
         
+        current_prices = fetch_current_prices(transactions_df, fetcher) if fetcher is not None else {}
+        display_positions(current_prices)
+        if fetcher is not None:
+            display_transaction_returns(transactions_df, current_prices)
+        
         if st.button("📥 Export Transactions to CSV"):
             csv = transactions_df.to_csv(index=False)
             st.download_button("Download CSV", csv, "transactions.csv", "text/csv")
     
     else:
-        st.info("No transactions recorded yet. Add your first transaction above.")
\ No newline at end of file
+        st.info("No transactions recorded yet. Add your first transaction above.")
+
+def delete_transaction_form(store, transactions):
+    """Delete one recorded transaction; the way to repair a log with an oversold position"""
+    try:
+        check_log(transactions)
+        log_error = None
+    except LedgerError as e:
+        log_error = e
+        st.error(f"Transaction log is inconsistent: {e}. Delete the offending row below and re-enter it.")
+    
+    with st.expander("🗑️ Delete a Transaction", expanded=log_error is not None):
+        ids = {
+            f"#{transaction['id']} {transaction['date']} {transaction['type']} {transaction['quantity']:g} "
+            f"{transaction['symbol']} @ ${transaction['price']:,.2f}": transaction['id']
+            for transaction in reversed(transactions)
+        }
+        transaction_id = ids[st.selectbox("Transaction", list(ids))]
+        if st.button("Delete Transaction"):
+            remaining = [transaction for transaction in transactions if transaction['id'] != transaction_id]
+            try:
+                check_log(remaining)
+            except LedgerError as e:
+                # Refuse only when the log is consistent now; a broken log may need several deletions
+                if log_error is None:
+                    st.error(f"Cannot delete it: {e}")
+                    return
+            store.delete_transaction(transaction_id)
+            try:
+                sync_holdings(removed=[row['symbol'] for row in transactions if row['id'] == transaction_id])
+            except LedgerError:
+                pass  # still inconsistent: the holdings catch up once the log is repaired
+            st.rerun()
+
+def fetch_current_prices(transactions_df, fetcher):
+    """Latest price per traded symbol, one batched quote request per asset type"""
+    current_prices = {}
+    for asset_type in ("Stock", "Crypto"):
+        symbols = transactions_df.loc[transactions_df['asset_type'] == asset_type, 'symbol'].unique().tolist()
+        if not symbols:
+            continue
+        quotes, _ = fetcher.fetch_many(symbols, asset_type=asset_type.lower(), include_history=False)
+        current_prices.update({symbol: data['current_price'] for symbol, data in quotes.items()})
+    return current_prices
+
+def display_positions(current_prices):
+    """Holdings replayed from the transaction log with realized and unrealized P&L"""
+    st.subheader("Positions & P&L")
+    method = st.radio("Lot matching", list(LOT_METHODS), horizontal=True)
+    try:
+        ledger = get_ledger(LOT_METHODS[method])
+    except LedgerError as e:
+        st.error(f"Transaction log is inconsistent: {e}")
+        return
+    
+    positions = ledger.positions(current_prices)
+    if positions.empty:
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Realized P&L", f"${positions['realized_pnl'].sum():,.2f}")
+    with col2:
+        unrealized = positions['unrealized_pnl'].sum() if 'unrealized_pnl' in positions else float('nan')
+        st.metric("Unrealized P&L", "n/a" if pd.isna(unrealized) else f"${unrealized:,.2f}")
+    
+    money = "${:,.2f}"
+    st.dataframe(positions.style.format({
+        'quantity': "{:g}", 'cost_basis': money, 'avg_cost': money, 'realized_pnl': money,
+        'current_price': money, 'market_value': money, 'unrealized_pnl': money
+    }, na_rep="n/a"), use_container_width=True)
+    
+    with st.expander("Open lots"):
+        st.dataframe(ledger.open_lots(current_prices), use_container_width=True, hide_index=True)
+    with st.expander("Realized lots"):
+        st.dataframe(ledger.realized().sort_values('sell_date', ascending=False),
+                     use_container_width=True, hide_index=True)
+
+def display_transaction_returns(transactions_df, current_prices):
+    """XIRR per symbol and overall, marking open positions at current prices"""
+    flows = transaction_cashflows(transactions_df.to_dict('records'), current_prices)
+    if flows.empty:
+        return
+    
+    calc = SIPCalculator()
+    st.subheader("Money-weighted Returns (XIRR)")
+    by_symbol = calc.xirr(flows['amount'], flows['date'], flows['symbol'])
+    overall = calc.xirr(flows['amount'], flows['date'])
+    
+    st.metric("Portfolio XIRR", "n/a" if pd.isna(overall) else f"{overall:.2f}%")
+    st.dataframe(by_symbol.rename("XIRR (%)").to_frame().style.format("{:.2f}%", na_rep="n/a"),
+                 use_container_width=True)
+    
+    missing = sorted(set(transactions_df['symbol']) - set(current_prices))
+    if missing:
+        st.caption(f"No current price for {', '.join(missing)}; excluded from XIRR.")
@@ -4,36 +4,51 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+def _as_pandas(prices):
+    """Series for 1-D input, DataFrame (one column per symbol) for 2-D input"""
+    return pd.DataFrame(prices) if np.ndim(prices) == 2 else pd.Series(prices)
+
 def calculate_rsi(prices, period=14):
-    """Calculate Relative Strength Index"""
-    deltas = np.diff(prices)
-    seed = deltas[:period+1]
-    up = seed[seed >= 0].sum() / period
-    down = -seed[seed < 0].sum() / period
-    rs = up / down
-    rsi = np.zeros_like(prices)
-    rsi[:period] = 100. - 100. / (1. + rs)
-    
-    for i in range(period, len(prices)):
-        delta = deltas[i - 1]
-        if delta > 0:
-            up_val = delta
-            down_val = 0.
-        else:
-            up_val = 0.
-            down_val = -delta
-        
-        up = (up * (period - 1) + up_val) / period
-        down = (down * (period - 1) + down_val) / period
-        rs = up / down
-        rsi[i] = 100. - 100. / (1. + rs)
+    """Calculate Relative Strength Index
+    
+    Accepts a 1-D price array or a 2-D bars x symbols array/DataFrame and
+    returns the same shape (a DataFrame for DataFrame input). Wilder smoothing
+    is an EWM with alpha = 1/period seeded from the first period + 1 moves,
+    whose average is also reported for the first `period` bars.
+    """
+    frame = prices if isinstance(prices, pd.DataFrame) else None
+    values = np.asarray(prices, dtype=float)
+    one_dim = values.ndim == 1
+    if one_dim:
+        values = values[:, None]
+    
+    deltas = np.diff(values, axis=0)
+    seed = deltas[:period + 1]
+    gains = np.maximum(deltas, 0.)
+    losses = np.maximum(-deltas, 0.)
+    # Smoothing restarts from the seed and continues from delta period - 1 onwards
+    up = np.vstack([gains[:period + 1].sum(axis=0) / period, gains[period - 1:]])
+    down = np.vstack([losses[:period + 1].sum(axis=0) / period, losses[period - 1:]])
+    if len(seed) == 0:
+        up = down = np.full((1, values.shape[1]), np.nan)
+    up = pd.DataFrame(up).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    down = pd.DataFrame(down).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        smoothed = 100. - 100. / (1. + up / down)
+    rsi = np.vstack([np.repeat(smoothed[:1], period, axis=0), smoothed[1:]])[:len(values)]
     
+    if one_dim:
+        return rsi[:, 0]
+    if frame is not None:
+        return pd.DataFrame(rsi, index=frame.index, columns=frame.columns)
     return rsi
 
 def calculate_macd(prices, fast=12, slow=26, signal=9):
-    """Calculate MACD indicator"""
-    ema_fast = pd.Series(prices).ewm(span=fast).mean()
-    ema_slow = pd.Series(prices).ewm(span=slow).mean()
+    """Calculate MACD indicator; 2-D input gives one column per symbol"""
+    prices = _as_pandas(prices)
+    ema_fast = prices.ewm(span=fast).mean()
+    ema_slow = prices.ewm(span=slow).mean()
     macd = ema_fast - ema_slow
     signal_line = macd.ewm(span=signal).mean()
     histogram = macd - signal_line
@@ -41,16 +56,18 @@ def calculate_macd(prices, fast=12, slow=26, signal=9):
     return macd, signal_line, histogram
 
 def calculate_moving_averages(prices, windows=[20, 50, 200]):
-    """Calculate multiple moving averages"""
+    """Calculate multiple moving averages; 2-D input gives one column per symbol"""
+    prices = _as_pandas(prices)
     ma_data = {}
     for window in windows:
-        ma_data[f'MA{window}'] = pd.Series(prices).rolling(window=window).mean()
+        ma_data[f'MA{window}'] = prices.rolling(window=window).mean()
     return ma_data
 
 def calculate_bollinger_bands(prices, window=20, num_std=2):
-    """Calculate Bollinger Bands"""
-    rolling_mean = pd.Series(prices).rolling(window=window).mean()
-    rolling_std = pd.Series(prices).rolling(window=window).std()
+    """Calculate Bollinger Bands; 2-D input gives one column per symbol"""
+    prices = _as_pandas(prices)
+    rolling_mean = prices.rolling(window=window).mean()
+    rolling_std = prices.rolling(window=window).std()
     
     upper_band = rolling_mean + (rolling_std * num_std)
     lower_band = rolling_mean - (rolling_std * num_std)
@@ -168,17 +185,84 @@ def render_technical_indicators(price_data, symbol):
         
         # MACD signals
         if show_macd and len(indicators['MACD']) > 1:
-            current_macd = indicators['MACD'][-1]
-            previous_macd = indicators['MACD'][-2]
-            current_signal = indicators['Signal'][-1]
+            current_macd = indicators['MACD'].iloc[-1]
+            previous_macd = indicators['MACD'].iloc[-2]
+            current_signal = indicators['Signal'].iloc[-1]
             
-            if current_macd > current_signal and previous_macd <= indicators['Signal'][-2]:
+            if current_macd > current_signal and previous_macd <= indicators['Signal'].iloc[-2]:
                 signals.append(("MACD Bullish Crossover", "Buy signal", "🟢"))
-            elif current_macd < current_signal and previous_macd >= indicators['Signal'][-2]:
+            elif current_macd < current_signal and previous_macd >= indicators['Signal'].iloc[-2]:
                 signals.append(("MACD Bearish Crossover", "Sell signal", "🔴"))
         
         if signals:
             for signal, description, icon in signals:
                 st.write(f"{icon} **{signal}**: {description}")
         else:
-            st.info("No strong trading signals detected.")
\ No newline at end of file
+            st.info("No strong trading signals detected.")
+    
+    if st.checkbox("Backtest a Strategy"):
+        render_strategy_backtest(price_data, symbol)
+
+def render_strategy_backtest(price_data, symbol):
+    """Backtest one of the indicator strategies over the full price history"""
+    # Imported here: core.backtest builds its signals from this module
+    from core.backtest import STRATEGIES, backtest
+    
+    st.subheader("Strategy Backtest")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        strategy = st.selectbox("Strategy", list(STRATEGIES))
+    with col2:
+        cost_bps = st.number_input("Commission (bps per trade)", 0.0, 100.0, 5.0, 1.0)
+    with col3:
+        slippage_bps = st.number_input("Slippage (bps per trade)", 0.0, 100.0, 5.0, 1.0)
+    
+    if strategy == 'MA Crossover':
+        col1, col2 = st.columns(2)
+        params = {'fast': col1.number_input("Fast MA", 2, 200, 50), 'slow': col2.number_input("Slow MA", 5, 400, 200)}
+    elif strategy == 'MACD':
+        col1, col2, col3 = st.columns(3)
+        params = {'fast': col1.number_input("Fast EMA", 2, 100, 12), 'slow': col2.number_input("Slow EMA", 5, 200, 26),
+                  'signal': col3.number_input("Signal EMA", 2, 50, 9)}
+    elif strategy == 'RSI Reversal':
+        col1, col2, col3 = st.columns(3)
+        params = {'period': col1.number_input("RSI period", 2, 50, 14), 'lower': col2.number_input("Buy above", 5, 50, 30),
+                  'upper': col3.number_input("Sell below", 50, 95, 70)}
+    else:
+        col1, col2 = st.columns(2)
+        entry = col1.text_input("Entry rule", "close crosses above MA50")
+        exit_rule = col2.text_input("Exit rule (optional)", "close crosses below MA50")
+        params = {'entry': entry, 'exit': exit_rule.strip() or None}
+    
+    closes = price_data[['Close']].rename(columns={'Close': symbol})
+    try:
+        signals = STRATEGIES[strategy](closes, **params)
+    except ValueError as e:
+        st.error(f"Invalid rule: {e}")
+        return
+    result = backtest(closes, signals, cost_bps, slippage_bps)
+    stats = result['stats'].loc[symbol]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Return", f"{stats['total_return'] * 100:.1f}%",
+                f"{(closes[symbol].iloc[-1] / closes[symbol].iloc[0] - 1) * 100:.1f}% buy & hold", delta_color="off")
+    col2.metric("Sharpe Ratio", "n/a" if pd.isna(stats['sharpe']) else f"{stats['sharpe']:.2f}")
+    col3.metric("Max Drawdown", f"{stats['max_drawdown'] * 100:.1f}%")
+    col4.metric("Win Rate", "n/a" if pd.isna(stats['win_rate']) else f"{stats['win_rate'] * 100:.0f}%",
+                f"{int(stats['trades'])} trades", delta_color="off")
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=closes.index, y=result['equity'][symbol], name=strategy))
+    fig.add_trace(go.Scatter(x=closes.index, y=closes[symbol] / closes[symbol].iloc[0], name='Buy & Hold',
+                             line=dict(dash='dash')))
+    fig.update_layout(title="Growth of $1", height=400, hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    trades = result['trades'].drop(columns='symbol')
+    if trades.empty:
+        st.info("The strategy never entered a position.")
+        return
+    st.dataframe(trades.style.format({
+        'entry_price': "${:,.2f}", 'exit_price': "${:,.2f}", 'return': "{:.2%}"
+    }), use_container_width=True)
+    st.caption(f"Signals act on the next bar; {cost_bps + slippage_bps:g} bps paid on each entry and exit.")
@@ -5,19 +5,33 @@ def display_watchlist(portfolio_manager, fetcher):
     """Display the user's watchlist"""
     st.markdown("### ⭐ Your Watchlist")
     
-    if not st.session_state.watchlist:
+    watchlist = portfolio_manager.get_watchlist()
+    if not watchlist:
         st.info("Your watchlist is empty. Add assets to track them here.")
         return
         
     current_prices = {}
-    for item in st.session_state.watchlist:
-        if item['asset_type'] == 'stock':
-            data = fetcher.fetch_stock_data(item['symbol'])
-            if data:
-                current_prices[item['symbol']] = data['current_price']
+    failed = []
+    stocks = [item['symbol'] for item in watchlist if item['asset_type'] == 'stock']
+    for symbol, data, error in fetcher.iter_many(stocks):
+        if error is None:
+            current_prices[symbol] = data['current_price']
+        else:
+            failed.append(symbol)
+    
+    # Crypto watchlist entries are stored upper-cased; CoinGecko ids are lower-case
+    cryptos = {item['symbol'].lower(): item['symbol'] for item in watchlist if item['asset_type'] == 'crypto'}
+    for crypto_id, data, error in fetcher.iter_many(cryptos, asset_type="crypto", include_history=False):
+        if error is None:
+            current_prices[cryptos[crypto_id]] = data['current_price']
+        else:
+            failed.append(cryptos[crypto_id])
+    
+    if failed:
+        st.warning(f"Could not refresh prices for: {', '.join(sorted(failed))}")
     
     cols = st.columns(3)
-    for i, item in enumerate(st.session_state.watchlist):
+    for i, item in enumerate(watchlist):
         with cols[i % 3]:
             with st.expander(f"{item['symbol']} ({item['asset_type']})"):
                 if item['symbol'] in current_prices:
@@ -28,7 +42,7 @@ def display_watchlist(portfolio_manager, fetcher):
                     st.rerun()
     
     if st.button("📥 Export Watchlist to CSV"):
-        watchlist_df = pd.DataFrame(st.session_state.watchlist)
+        watchlist_df = pd.DataFrame(watchlist)
         csv = watchlist_df.to_csv(index=False)
         st.download_button(
             label="Download CSV",
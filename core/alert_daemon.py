@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+from core.alerts import get_alert_book
+from core.http_client import get_http_client
+from core.rules import RuleEngine
+from core.scheduler import PRIORITY_REFRESH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = int(os.getenv('FINDASH_ALERT_INTERVAL', 60))
+DEFAULT_LOG_PATH = os.getenv('FINDASH_ALERT_LOG', os.path.join('data', 'alerts.log'))
+
+# Shortest stock history period holding at least that many daily bars
+HISTORY_PERIODS = (('1y', 250), ('2y', 500), ('5y', 1250), ('10y', 2500))
+
+class LogFileSink:
+    """Append each trigger event to a file as one JSON line"""
+
+    def __init__(self, path=DEFAULT_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, event):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(json.dumps(event, default=str) + '\n')
+
+class WebhookSink:
+    """POST each trigger event as JSON, e.g. to a local stub at http://localhost:8765/alerts"""
+
+    def __init__(self, url, http_client=None, timeout=(3.05, 5)):
+        self.url = url
+        self.http = http_client or get_http_client()
+        self.timeout = timeout
+
+    def send(self, event):
+        response = self.http.request('POST', self.url, json=event, timeout=self.timeout)
+        response.raise_for_status()
+
+class AlertDaemon:
+    """Background thread that evaluates every pending alert on a fixed interval
+
+    Each pass collects the symbols with pending alerts, fetches their quotes in
+    one batched request per asset type, checks them against the book and hands
+    every fired alert to the sinks. Indicator-rule alerts are evaluated in bulk
+    by a RuleEngine over the closes of all their symbols. It runs on its own
+    thread, so alerts fire whether or not any browser session is open.
+    """
+
+    def __init__(self, fetcher, book=None, sinks=None, interval=DEFAULT_INTERVAL, max_events=500):
+        self.fetcher = fetcher
+        self.book = book or get_alert_book()
+        self.sinks = list(sinks) if sinks is not None else [LogFileSink()]
+        self.interval = interval
+        self.events = deque(maxlen=max_events)
+        self.lock = threading.Lock()  # guards `events`; readers snapshot it under the lock
+        self.last_run = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the polling thread if it isn't running"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='alert-daemon', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def recent_events(self, limit=None):
+        """Snapshot of the trigger events, newest first (at most `limit`)"""
+        with self.lock:
+            events = list(self.events)
+        events.reverse()
+        return events if limit is None else events[:limit]
+
+    def run_once(self):
+        """One evaluation pass; returns the trigger events it produced"""
+        symbols = self.book.active_symbols()
+        prices = {}
+        for asset_type in ('stock', 'crypto'):
+            batch = [symbol for symbol, kind in symbols.items() if kind == asset_type]
+            if not batch:
+                continue
+            # Bypasses the 5-minute quote cache so alerts react within one interval
+            try:
+                quotes = self.fetcher.fetch_live_quotes(batch, asset_type=asset_type, priority=PRIORITY_REFRESH)
+            except Exception:
+                logger.exception("Quote request for %d %s alert symbols failed", len(batch), asset_type)
+                continue
+            for symbol in set(batch) - set(quotes):
+                logger.warning("No price for alert symbol %s", symbol)
+            prices.update({symbol: data['current_price'] for symbol, data in quotes.items()})
+
+        fired = self.book.check(prices)
+        for asset_type in ('stock', 'crypto'):
+            rules = [alert for alert in self.book.pending_rules() if alert['asset_type'] == asset_type]
+            if rules:
+                fired += self._check_rules(rules, asset_type)
+
+        events = []
+        for alert in fired:
+            event = {
+                'alert_id': alert['id'],
+                'symbol': alert['symbol'],
+                'asset_type': alert['asset_type'],
+                'condition': alert['condition'],
+                'rule': alert.get('rule'),
+                'target_price': alert['target_price'],
+                'price': alert['triggered_price'],
+                'triggered_at': datetime.now().isoformat(timespec='seconds')
+            }
+            events.append(event)
+            with self.lock:
+                self.events.append(event)
+            self._notify(event)
+        self.last_run = datetime.now()
+        return events
+
+    def _check_rules(self, alerts, asset_type):
+        """Evaluate every distinct rule over every symbol at once, then fire the matching alerts"""
+        engine = RuleEngine(alert['rule'] for alert in alerts)
+        closes = self._closes([alert['symbol'] for alert in alerts], asset_type, engine.lookback)
+        if closes.empty:
+            return []
+        
+        hits = engine.evaluate(closes)
+        last_close = closes.ffill().iloc[-1]
+        fired = []
+        for alert in alerts:
+            if alert['symbol'] in hits.columns and hits.at[alert['rule'], alert['symbol']]:
+                alert = self.book.trigger_rule(alert['id'], float(last_close[alert['symbol']]))
+                if alert is not None:
+                    fired.append(alert)
+        return fired
+
+    def _closes(self, symbols, asset_type, lookback):
+        """Daily closes as a bars x symbols frame with enough history for `lookback` bars"""
+        symbols = list(dict.fromkeys(symbols))
+        if asset_type == 'crypto':
+            # Crypto symbols are stored upper-cased; CoinGecko ids are lower-case
+            ids = {symbol.lower(): symbol for symbol in symbols}
+            results, errors = self.fetcher.fetch_many(list(ids), asset_type='crypto', priority=PRIORITY_REFRESH,
+                                                      days=max(365, lookback + 30))
+            results = {ids[crypto_id]: data for crypto_id, data in results.items()}
+        else:
+            period = next((period for period, bars in HISTORY_PERIODS if bars > lookback + 10), 'max')
+            results, errors = self.fetcher.fetch_many(symbols, priority=PRIORITY_REFRESH, period=period)
+        for symbol, error in errors.items():
+            logger.warning("No history for rule symbol %s: %s", symbol, error)
+        if not results:
+            return pd.DataFrame()
+        closes = {}
+        for symbol, data in results.items():
+            # One close per day: CoinGecko's final point is a per-coin "now" timestamp
+            close = data['history']['Close']
+            closes[symbol] = close.groupby(close.index.normalize()).last()
+        return pd.DataFrame(closes).sort_index().ffill()
+
+    def _notify(self, event):
+        for sink in self.sinks:
+            try:
+                sink.send(event)
+            except Exception:
+                # One broken sink must not stop the others or the daemon
+                logger.exception("Alert sink %r failed", sink)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Alert evaluation pass failed")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+_default_daemon = None
+_default_lock = threading.Lock()
+
+def get_alert_daemon(fetcher):
+    """Process-wide daemon, started on first use
+
+    Sinks: the JSON-lines log at FINDASH_ALERT_LOG, plus FINDASH_ALERT_WEBHOOK when set.
+    """
+    global _default_daemon
+    with _default_lock:
+        if _default_daemon is None:
+            sinks = [LogFileSink()]
+            webhook_url = os.getenv('FINDASH_ALERT_WEBHOOK')
+            if webhook_url:
+                sinks.append(WebhookSink(webhook_url))
+            _default_daemon = AlertDaemon(fetcher, sinks=sinks).start()
+        return _default_daemon
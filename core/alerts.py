@@ -0,0 +1,189 @@
+import bisect
+import itertools
+import math
+import threading
+import uuid
+from datetime import datetime
+
+from core.rules import compile_rule
+from core.storage import get_portfolio_store
+
+CONDITIONS = ('above', 'below')
+
+class AlertBook:
+    """Price alerts indexed per symbol by threshold
+
+    Each symbol keeps its pending alerts in two lists sorted by target price,
+    one per condition. A price crosses a contiguous run of each list (a prefix
+    of the 'above' list, a suffix of the 'below' list), so checking a tick is
+    two binary searches plus work proportional to the alerts it fires.
+    Removal by id is O(1): the alert is dropped from the id map and its index
+    entry left as a tombstone that sweeps skip and compaction clears.
+    With a store, the book loads its alerts from it and writes every change back.
+    """
+
+    def __init__(self, store=None):
+        self._alerts = {}  # id -> alert dict, in creation order
+        self._index = {}   # symbol -> {'above': [(target, seq, id)], 'below': [...], 'asset_type': ...}
+        self._dead = {}    # symbol -> tombstones still sitting in its index
+        self._rules = {}   # id -> pending indicator-rule alert
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.store = store
+        if store is not None:
+            for alert in store.alerts():
+                self._insert(alert)
+
+    def add(self, symbol, target_price, condition, asset_type='stock', **fields):
+        """Create an alert; extra keyword fields are stored on the alert dict"""
+        if condition not in CONDITIONS:
+            raise ValueError(f"Unknown alert condition: {condition}")
+        alert = {
+            'id': uuid.uuid4().hex,
+            'symbol': symbol,
+            'target_price': target_price,
+            'condition': condition,
+            'asset_type': asset_type,
+            'created': datetime.now().strftime("%Y-%m-%d %H:%M"),
+            'triggered': False,
+            **fields
+        }
+        self._insert(alert)
+        self._save([alert])
+        return alert
+
+    def _insert(self, alert):
+        with self._lock:
+            self._alerts[alert['id']] = alert
+            if alert['triggered']:
+                return
+            if alert['condition'] == 'rule':
+                self._rules[alert['id']] = alert
+                return
+            sides = self._index.setdefault(alert['symbol'], {'above': [], 'below': [], 'asset_type': alert['asset_type']})
+            sides['asset_type'] = alert['asset_type']
+            bisect.insort(sides[alert['condition']], (float(alert['target_price']), next(self._seq), alert['id']))
+
+    def _save(self, alerts):
+        if self.store is not None and alerts:
+            self.store.save_alerts(alerts)
+
+    def add_rule(self, symbol, rule, asset_type='stock', **fields):
+        """Create an alert on an indicator rule such as "RSI(14) < 30"; raises RuleError if it doesn't parse"""
+        compile_rule(rule)
+        alert = {
+            'id': uuid.uuid4().hex,
+            'symbol': symbol,
+            'target_price': None,
+            'condition': 'rule',
+            'rule': rule,
+            'asset_type': asset_type,
+            'created': datetime.now().strftime("%Y-%m-%d %H:%M"),
+            'triggered': False,
+            **fields
+        }
+        self._insert(alert)
+        self._save([alert])
+        return alert
+
+    def pending_rules(self):
+        """Rule alerts that haven't fired yet"""
+        with self._lock:
+            return list(self._rules.values())
+
+    def trigger_rule(self, alert_id, price):
+        """Mark a pending rule alert as fired; returns it, or None if it is gone or already fired"""
+        with self._lock:
+            alert = self._rules.pop(alert_id, None)
+            if alert is not None:
+                alert['triggered'] = True
+                alert['triggered_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+                alert['triggered_price'] = price
+        self._save([alert] if alert is not None else [])
+        return alert
+
+    def remove(self, alert_id):
+        """Delete an alert by id; returns it, or None if it didn't exist"""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is not None and alert['condition'] == 'rule':
+                self._rules.pop(alert_id, None)
+            elif alert is not None and not alert['triggered']:
+                symbol = alert['symbol']
+                self._dead[symbol] = self._dead.get(symbol, 0) + 1
+                self._maybe_compact(symbol)
+        if alert is not None and self.store is not None:
+            self.store.delete_alert(alert_id)
+        return alert
+
+    def check(self, current_prices):
+        """Fire every pending alert crossed by current_prices; returns the fired alerts"""
+        triggered = []
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        with self._lock:
+            for symbol, price in current_prices.items():
+                sides = self._index.get(symbol)
+                if sides is None or price is None or math.isnan(price):
+                    continue
+
+                above = sides['above']
+                cut = bisect.bisect_right(above, (price, math.inf))
+                fired = above[:cut]
+                del above[:cut]
+
+                below = sides['below']
+                cut = bisect.bisect_left(below, (price, -1))
+                fired += below[cut:]
+                del below[cut:]
+
+                for _, _, alert_id in fired:
+                    alert = self._alerts.get(alert_id)
+                    if alert is None:
+                        self._dead[symbol] -= 1  # tombstone swept out
+                        continue
+                    alert['triggered'] = True
+                    alert['triggered_date'] = now
+                    alert['triggered_price'] = price
+                    triggered.append(alert)
+        self._save(triggered)
+        return triggered
+
+    def get(self, alert_id):
+        return self._alerts.get(alert_id)
+
+    def alerts(self):
+        """All alerts, triggered ones included, oldest first"""
+        with self._lock:
+            return list(self._alerts.values())
+
+    def active_symbols(self):
+        """Symbols with at least one pending alert, mapped to their asset type"""
+        with self._lock:
+            return {symbol: sides['asset_type'] for symbol, sides in self._index.items()
+                    if len(sides['above']) + len(sides['below']) > self._dead.get(symbol, 0)}
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def _maybe_compact(self, symbol):
+        sides = self._index[symbol]
+        size = len(sides['above']) + len(sides['below'])
+        if self._dead[symbol] * 2 < size:
+            return
+        for condition in CONDITIONS:
+            sides[condition] = [entry for entry in sides[condition] if entry[2] in self._alerts]
+        self._dead[symbol] = 0
+        if not sides['above'] and not sides['below']:
+            del self._index[symbol]
+            del self._dead[symbol]
+
+_default_book = None
+_default_lock = threading.Lock()
+
+def get_alert_book():
+    """Process-wide book, so the alert daemon sees alerts from every session"""
+    global _default_book
+    with _default_lock:
+        if _default_book is None:
+            _default_book = AlertBook(store=get_portfolio_store())
+        return _default_book
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from components.technical.indicators import calculate_macd, calculate_moving_averages, calculate_rsi
+from core.risk import TRADING_DAYS, max_drawdown
+from core.rules import compile_rule
+
+TRADE_COLUMNS = ['symbol', 'entry_date', 'exit_date', 'entry_price', 'exit_price', 'bars', 'return', 'open']
+
+def _hold(entries, exits):
+    """Long (1.0) from an entry bar until the next exit bar, flat otherwise"""
+    state = np.where(entries, 1.0, np.where(exits, 0.0, np.nan))
+    return pd.DataFrame(state, index=entries.index, columns=entries.columns).ffill().fillna(0.0)
+
+def ma_crossover_signals(closes, fast=50, slow=200):
+    """Long while the fast moving average is above the slow one"""
+    averages = calculate_moving_averages(closes, [fast, slow])
+    return (averages[f'MA{fast}'] > averages[f'MA{slow}']).astype(float)
+
+def macd_signals(closes, fast=12, slow=26, signal=9):
+    """Long while MACD is above its signal line"""
+    macd, signal_line, _ = calculate_macd(closes, fast, slow, signal)
+    return (macd > signal_line).astype(float)
+
+def rsi_signals(closes, period=14, lower=30, upper=70):
+    """Buy when RSI crosses back above `lower` (leaves oversold), sell when it crosses below `upper`"""
+    rsi = calculate_rsi(closes, period)
+    previous = rsi.shift()
+    return _hold((previous < lower) & (rsi >= lower), (previous > upper) & (rsi <= upper))
+
+def rule_signals(closes, entry, exit=None):
+    """Position from alert-style rules, e.g. entry "close crosses above MA50", exit "close crosses below MA50"
+
+    Without an exit rule the position is simply whether the entry rule holds.
+    """
+    cache = {}
+    entries = compile_rule(entry).evaluate_all(closes, cache)
+    if exit is None:
+        return entries.astype(float)
+    return _hold(entries, compile_rule(exit).evaluate_all(closes, cache))
+
+STRATEGIES = {
+    'MA Crossover': ma_crossover_signals,
+    'MACD': macd_signals,
+    'RSI Reversal': rsi_signals,
+    'Rules': rule_signals,
+}
+
+def backtest(closes, signals, cost_bps=5.0, slippage_bps=5.0, periods_per_year=TRADING_DAYS):
+    """Backtest long/flat signals over a bars x symbols closes frame
+
+    `signals` is the desired position (0..1) decided at each bar's close; it
+    is held from the next bar, so no bar trades on its own close. Every change
+    in position pays `cost_bps` commission plus `slippage_bps` on the traded
+    fraction. Symbols are backtested independently in one pass, and the
+    portfolio line holds all of them in equal weight, rebalanced daily.
+
+    Returns a dict with 'positions', 'returns' (net, per symbol), 'equity'
+    (per symbol), 'portfolio' (equal-weight equity), 'trades' (one row per
+    round trip, open trades marked at the last close), 'stats' (per symbol)
+    and 'summary' (portfolio level).
+    """
+    closes = closes.sort_index().astype(float)
+    signals = signals.reindex_like(closes).fillna(0.0).clip(0.0, 1.0)
+    price = closes.ffill().to_numpy()
+    listed = np.isfinite(price)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns = np.nan_to_num(price[1:] / price[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+    asset_returns = np.vstack([np.zeros((1, price.shape[1])), asset_returns])
+    # Decided at the close of bar t, held over bar t + 1
+    positions = np.vstack([np.zeros((1, price.shape[1])), signals.to_numpy()[:-1]]) * listed
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    net = positions * asset_returns - turnover * (cost_bps + slippage_bps) / 1e4
+    equity = np.cumprod(1 + net, axis=0)
+
+    index, columns = closes.index, closes.columns
+    returns = pd.DataFrame(net, index=index, columns=columns)
+    portfolio = pd.Series(np.cumprod(1 + net.mean(axis=1)), index=index, name='portfolio')
+    trades = _trades(positions, equity, price, index, columns)
+
+    periods = len(index)
+    years = periods / periods_per_year
+    mean, std = net.mean(axis=0), net.std(axis=0, ddof=1) if periods > 1 else np.zeros(net.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+    grouped = trades.groupby('symbol')['return']
+    stats = pd.DataFrame({
+        'total_return': equity[-1] - 1,
+        'cagr': equity[-1] ** (1 / years) - 1 if years else np.nan,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown(returns).to_numpy(),
+        'exposure': positions.mean(axis=0),
+        'trades': grouped.size().reindex(columns, fill_value=0).to_numpy(),
+        'win_rate': grouped.apply(lambda r: (r > 0).mean()).reindex(columns).to_numpy(),
+        'turnover': turnover.sum(axis=0)
+    }, index=columns)
+
+    portfolio_returns = portfolio.pct_change().fillna(portfolio.iloc[0] - 1)
+    summary = {
+        'total_return': portfolio.iloc[-1] - 1,
+        'cagr': portfolio.iloc[-1] ** (1 / years) - 1 if years else np.nan,
+        'sharpe': (portfolio_returns.mean() / portfolio_returns.std() * np.sqrt(periods_per_year)
+                   if portfolio_returns.std() > 0 else np.nan),
+        'max_drawdown': max_drawdown(portfolio_returns),
+        'trades': len(trades),
+        'win_rate': (trades['return'] > 0).mean() if len(trades) else np.nan
+    }
+    return {
+        'positions': pd.DataFrame(positions, index=index, columns=columns),
+        'returns': returns,
+        'equity': pd.DataFrame(equity, index=index, columns=columns),
+        'portfolio': portfolio,
+        'trades': trades,
+        'stats': stats,
+        'summary': summary
+    }
+
+def _trades(positions, equity, price, index, columns):
+    """Round trips from position changes, pairing each entry with the next exit in its column
+
+    A trade entered on bar e (first bar held) and left on bar x (first bar
+    flat) bought at the close of e - 1 and sold at the close of x - 1; its
+    return, costs included, is equity[x] / equity[e - 1] - 1.
+    """
+    held = positions > 0
+    before = np.vstack([np.zeros((1, held.shape[1]), dtype=bool), held[:-1]])
+    # nonzero on the transpose lists events column by column, bar by bar
+    entry_col, entry_bar = np.nonzero((held & ~before).T)
+    exit_col, exit_bar = np.nonzero((~held & before).T)
+    # Trades still open at the end exit on a virtual bar past the last one
+    open_cols = np.flatnonzero(held[-1])
+    exit_col = np.concatenate([exit_col, open_cols])
+    exit_bar = np.concatenate([exit_bar, np.full(len(open_cols), len(index))])
+    exit_bar = exit_bar[np.lexsort((exit_bar, exit_col))]
+
+    is_open = exit_bar == len(index)
+    last_bar = np.minimum(exit_bar, len(index) - 1)
+    sold_bar = np.where(is_open, len(index) - 1, exit_bar - 1)
+    return pd.DataFrame({
+        'symbol': columns[entry_col],
+        'entry_date': index[entry_bar - 1],
+        'exit_date': index[sold_bar],
+        'entry_price': price[entry_bar - 1, entry_col],
+        'exit_price': price[sold_bar, entry_col],
+        'bars': exit_bar - entry_bar,
+        'return': equity[last_bar, entry_col] / equity[entry_bar - 1, entry_col] - 1,
+        'open': is_open
+    }, columns=TRADE_COLUMNS)
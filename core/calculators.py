@@ -1,6 +1,222 @@
 import streamlit as st
-from datetime import datetime, timedelta
-import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+from core.alerts import get_alert_book
+from core.storage import get_portfolio_store
+
+# Monte Carlo percentiles come from a per-month histogram of log(value / deterministic value),
+# measured in units of the month's return spread, so memory is months x bins whatever the path count
+MC_BINS = 2048
+MC_Z_RANGE = 8.0
+
+def _annuity_factor(monthly_rate, months):
+    """Value of 1 invested at the end of each month for `months` months, broadcast over arrays"""
+    monthly_rate = np.asarray(monthly_rate, dtype=float)
+    months = np.asarray(months, dtype=float)
+    safe_rate = np.where(monthly_rate == 0, 1.0, monthly_rate)
+    # expm1/log1p stay accurate for small rates where (1 + r) ** n - 1 loses digits
+    growth = np.expm1(months * np.log1p(safe_rate)) / safe_rate
+    return np.where(monthly_rate == 0, months, growth)
+
+def _step_up_factor(monthly_rate, step_up, months):
+    """Value after `months` of 1 a month, raised by `step_up` (fraction) every 12 months"""
+    monthly_rate, step_up, months = np.broadcast_arrays(
+        np.asarray(monthly_rate, dtype=float), np.asarray(step_up, dtype=float), np.asarray(months, dtype=float)
+    )
+    full_years, remainder = np.divmod(months, 12)
+    year_growth = np.power(1 + monthly_rate, 12)
+    # Year k pays (1 + g)^k * annuity(r, 12) and then compounds for the remaining full years:
+    # a geometric series in q = (1 + g) / (1 + r)^12
+    ratio = (1 + step_up) / year_growth
+    near_one = np.abs(ratio - 1) < 1e-12
+    safe_ratio = np.where(near_one, 2.0, ratio)
+    series = np.where(near_one, full_years, np.expm1(full_years * np.log(safe_ratio)) / (safe_ratio - 1))
+    full = _annuity_factor(monthly_rate, 12) * np.power(year_growth, full_years - 1) * series
+    full = np.where(full_years > 0, full, 0.0)
+    tail = np.power(1 + step_up, full_years) * _annuity_factor(monthly_rate, remainder)
+    return full * np.power(1 + monthly_rate, remainder) + tail
+
+def _step_up_invested(step_up, months):
+    """Total paid in over `months` by 1 a month stepped up every 12 months"""
+    step_up, months = np.broadcast_arrays(np.asarray(step_up, dtype=float), np.asarray(months, dtype=float))
+    full_years, remainder = np.divmod(months, 12)
+    safe_step = np.where(step_up == 0, 1.0, step_up)
+    paid_years = np.where(step_up == 0, full_years, np.expm1(full_years * np.log1p(safe_step)) / safe_step)
+    return 12 * paid_years + remainder * np.power(1 + step_up, full_years)
+
+def _scalar_or_array(values):
+    return values.item() if np.ndim(values) == 0 else values
+
+@lru_cache(maxsize=64)
+def _scenario_grid(amounts, annual_returns, years):
+    """Cached grid for one parameter set; arrays are read-only because callers share them"""
+    amounts = np.asarray(amounts, dtype=float)
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    years = np.asarray(years, dtype=float)
+    total_months = np.floor(years * 12)
+    
+    # Future value is linear in the amount, so the (returns x tenures) factor is computed once
+    factor = _annuity_factor(annual_returns[:, None] / 12 / 100, total_months[None, :])
+    future_value = amounts[:, None, None] * factor[None, :, :]
+    total_invested = np.broadcast_to((amounts[:, None] * total_months[None, :])[:, None, :], future_value.shape)
+    profit = future_value - total_invested
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return_percentage = np.where(total_invested > 0, profit / total_invested * 100, 0.0)
+    
+    grid = {
+        'amounts': amounts,
+        'annual_returns': annual_returns,
+        'years': years,
+        'future_value': future_value,
+        'total_invested': total_invested,
+        'profit': profit,
+        'return_percentage': return_percentage
+    }
+    for values in grid.values():
+        values.setflags(write=False)
+    return grid
+
+def _solve_monthly_rate(payment, months, future_value, iterations=60, tol=1e-12):
+    """Monthly rate r with payment * annuity(r, months) == future_value, solved elementwise
+    
+    Safeguarded Newton: the annuity factor increases with r, so each element
+    keeps a bracket and falls back to bisection when a step leaves it.
+    """
+    payment, months, future_value = np.broadcast_arrays(
+        np.asarray(payment, dtype=float), np.asarray(months, dtype=float), np.asarray(future_value, dtype=float)
+    )
+    target = future_value / payment
+    lo = np.full(target.shape, -0.99)
+    hi = np.full(target.shape, 1.0)
+    # Start from the rate that would give the same simple return over half the horizon
+    rate = np.clip((target / months - 1) / np.maximum(months / 2, 1), -0.5, 0.5)
+    for _ in range(iterations):
+        factor = _annuity_factor(rate, months)
+        error = factor - target
+        lo = np.where(error < 0, rate, lo)
+        hi = np.where(error > 0, rate, hi)
+        small = np.abs(rate) < 1e-9
+        safe_rate = np.where(small, 1.0, rate)
+        slope = np.where(
+            small,
+            months * (months - 1) / 2,
+            (months * np.power(1 + safe_rate, months - 1) - factor) / safe_rate
+        )
+        step = rate - error / np.maximum(slope, 1e-12)
+        step = np.where((step <= lo) | (step >= hi), (lo + hi) / 2, step)
+        if np.all(np.abs(step - rate) < tol):
+            rate = step
+            break
+        rate = step
+    return rate
+
+def _solve_xirr(amounts, times, iterations=100, tol=1e-10):
+    """Annual rate zeroing sum(a * (1 + r)^-t) for each row of padded (rows x flows) arrays
+    
+    Padding entries must have amount 0. Newton steps are kept inside a sign-change
+    bracket on (-0.9999, 100) and replaced by bisection when they leave it; rows
+    without a sign change in that range get NaN.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    times = np.asarray(times, dtype=float)
+    
+    def npv(rate):
+        discount = np.power(1 + rate[:, None], -times)
+        return (amounts * discount).sum(axis=1), (-times * amounts * discount / (1 + rate[:, None])).sum(axis=1)
+    
+    rows = len(amounts)
+    lo = np.full(rows, -0.9999)
+    hi = np.full(rows, 100.0)
+    npv_lo, _ = npv(lo)
+    npv_hi, _ = npv(hi)
+    solvable = np.sign(npv_lo) != np.sign(npv_hi)
+    rate = np.full(rows, 0.1)
+    for _ in range(iterations):
+        value, slope = npv(rate)
+        same_side = np.sign(value) == np.sign(npv_lo)
+        lo = np.where(same_side, rate, lo)
+        hi = np.where(same_side, hi, rate)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = rate - value / slope
+        step = np.where(~np.isfinite(step) | (step <= lo) | (step >= hi), (lo + hi) / 2, step)
+        done = np.abs(step - rate) < tol * np.maximum(1, np.abs(rate))
+        rate = step
+        if np.all(done | ~solvable):
+            break
+    return np.where(solvable, rate, np.nan)
+
+def _simulate_chunk(monthly_investment, mu, sigma, dof, total_months, paths, seed):
+    """Histogram counts and value sums for one chunk of simulated SIP paths
+    
+    Module-level so it can run in a process pool.
+    """
+    rng = np.random.default_rng(seed)
+    months = np.arange(1, total_months + 1)
+    
+    # Student-t shocks rescaled to unit variance, so volatility means what it says
+    shocks = rng.standard_t(dof, size=(paths, total_months)) * np.sqrt((dof - 2) / dof)
+    log_growth = np.cumsum(mu + sigma * shocks, axis=1)
+    # V_t = P * G_t * sum_{s<=t} 1/G_s: every contribution compounds from its own month
+    values = monthly_investment * np.exp(log_growth) * np.cumsum(np.exp(-log_growth), axis=1)
+    
+    deterministic = monthly_investment * _annuity_factor(np.expm1(mu + sigma ** 2 / 2), months)
+    scale = sigma * np.sqrt(months)
+    z = np.log(values / deterministic) / scale
+    bins = np.clip(((z + MC_Z_RANGE) / (2 * MC_Z_RANGE) * MC_BINS).astype(np.int64), 0, MC_BINS - 1)
+    bins += (months - 1) * MC_BINS
+    counts = np.bincount(bins.ravel(), minlength=total_months * MC_BINS).reshape(total_months, MC_BINS)
+    return counts, values.sum(axis=0)
+
+def _histogram_quantiles(counts, percentiles):
+    """Interpolated quantiles in z units from per-month histogram rows"""
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1:]
+    width = 2 * MC_Z_RANGE / MC_BINS
+    quantiles = {}
+    for q in percentiles:
+        target = q / 100 * total
+        idx = np.minimum((cumulative < target).sum(axis=1), MC_BINS - 1)
+        rows = np.arange(len(counts))
+        below = np.where(idx > 0, cumulative[rows, idx - 1], 0)
+        frac = (target[:, 0] - below) / np.maximum(counts[rows, idx], 1)
+        quantiles[q] = -MC_Z_RANGE + (idx + np.clip(frac, 0, 1)) * width
+    return quantiles
+
+def transaction_cashflows(transactions, current_prices, as_of=None):
+    """Cash flows for XIRR from recorded transactions
+    
+    Buys are outflows and sells inflows on their dates; whatever is still held
+    is added as an inflow at current_prices on `as_of` (today by default).
+    Symbols without a current price are left out entirely.
+    """
+    columns = ['date', 'amount', 'symbol']
+    if not transactions:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(transactions)
+    df = df[df['symbol'].isin(list(current_prices))]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+    
+    sign = np.where(df['type'] == 'Buy', -1.0, 1.0)
+    flows = pd.DataFrame({
+        'date': pd.to_datetime(df['date']),
+        'amount': sign * df['total_amount'].astype(float),
+        'symbol': df['symbol']
+    })
+    held = (-sign * df['quantity'].astype(float)).groupby(df['symbol']).sum()
+    held = held[held > 0]
+    as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+    terminal = pd.DataFrame({
+        'date': [as_of] * len(held),
+        'amount': (held * held.index.map(current_prices).astype(float)).to_numpy(),
+        'symbol': held.index.to_numpy()
+    })
+    return pd.concat([flows, terminal], ignore_index=True)[columns].sort_values('date', kind='stable')
+
 class SIPCalculator:
     """SIP Calculator for Streamlit"""
     
@@ -24,87 +240,281 @@ class SIPCalculator:
             'return_percentage': (profit / total_invested) * 100 if total_invested > 0 else 0
         }
     def generate_sip_timeline(self, monthly_investment, annual_return, years):
-        """Generate SIP timeline"""
-        monthly_rate = annual_return / 12 / 100
-        timeline = []
+        """Generate SIP timeline as a DataFrame with one row per month"""
+        months = np.arange(1, int(years * 12) + 1)
+        invested = monthly_investment * months
+        value = monthly_investment * _annuity_factor(annual_return / 12 / 100, months)
+        
+        return pd.DataFrame({
+            'month': months,
+            'year': np.round(months / 12, 1),
+            'invested': invested,
+            'value': value,
+            'profit': value - invested
+        })
+
+    def generate_sip_timelines(self, monthly_investments, annual_returns, years):
+        """Generate timelines for many plans at once
+
+        Inputs broadcast against each other. Returns a dict of (plans x months)
+        arrays; months past a plan's own tenure are NaN.
+        """
+        monthly_investments, annual_returns, years = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(monthly_investments, dtype=float)),
+            np.atleast_1d(np.asarray(annual_returns, dtype=float)),
+            np.atleast_1d(np.asarray(years, dtype=float))
+        )
+        total_months = (years * 12).astype(int)
+        months = np.arange(1, total_months.max() + 1, dtype=float)
+        monthly_rates = annual_returns / 12 / 100
+        
+        # Work in place on one (plans x months) buffer: this is the hot path for large batches
+        flat = monthly_rates == 0
+        safe_rates = np.where(flat, 1.0, monthly_rates)
+        value = np.multiply.outer(np.log1p(safe_rates), months)
+        np.expm1(value, out=value)
+        value *= (monthly_investments / safe_rates)[:, None]
+        if flat.any():
+            value[flat] = np.multiply.outer(monthly_investments[flat], months)
+        invested = np.multiply.outer(monthly_investments, months)
+        
+        inactive = months[None, :] > total_months[:, None]
+        value[inactive] = np.nan
+        invested[inactive] = np.nan
+        
+        return {
+            'month': months,
+            'invested': invested,
+            'value': value,
+            'profit': value - invested
+        }
+
+    def scenario_grid(self, amounts, annual_returns, years):
+        """Evaluate every amount x return x tenure combination in one broadcast
+        
+        Returns a dict with the three axes and (amounts, returns, years) arrays of
+        future_value, total_invested, profit and return_percentage. Results are
+        cached per parameter set and must not be modified.
+        """
+        return _scenario_grid(
+            tuple(np.atleast_1d(amounts).astype(float).tolist()),
+            tuple(np.atleast_1d(annual_returns).astype(float).tolist()),
+            tuple(np.atleast_1d(years).astype(float).tolist())
+        )
+
+    @st.cache_data(max_entries=32)
+    def simulate_sip(_self, monthly_investment, annual_return, years, volatility=15.0, paths=100_000,
+                     dof=5, percentiles=(5, 50, 95), chunk_size=5_000, workers=None, seed=None):
+        """Monte Carlo SIP projection with fat-tailed monthly returns
+        
+        Monthly log returns are Student-t with `dof` degrees of freedom, scaled to
+        `volatility` (% a year), with drift set so the expected growth matches
+        `annual_return`. Paths are simulated in chunks (across `workers`
+        processes when given) and reduced into fixed-size histograms, so memory
+        does not grow with `paths`. Returns a DataFrame with month, year,
+        invested, mean and one pN column per percentile.
+        """
+        if dof <= 2:
+            raise ValueError("dof must be greater than 2 for a finite volatility")
         total_months = int(years * 12)
+        sigma = volatility / 100 / np.sqrt(12)
+        mu = np.log1p(annual_return / 12 / 100) - sigma ** 2 / 2
+        months = np.arange(1, total_months + 1)
         
-        for month in range(1, total_months + 1):
-            if monthly_rate == 0:
-                value = monthly_investment * month
-            else:
-                value = monthly_investment * (((1 + monthly_rate) ** month - 1) / monthly_rate)
-            
-            timeline.append({
-                'month': month,
-                'year': round(month / 12, 1),
-                'invested': monthly_investment * month,
-                'value': value,
-                'profit': value - (monthly_investment * month)
-            })
-        
-        return timeline
+        if sigma == 0:
+            timeline = _self.generate_sip_timeline(monthly_investment, annual_return, years)
+            result = timeline[['month', 'year', 'invested']].assign(mean=timeline['value'])
+            return result.assign(**{f"p{q:g}": timeline['value'] for q in percentiles})
+        
+        # Spawned seeds make the result independent of chunking and worker count
+        sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(monthly_investment, mu, sigma, dof, total_months, size, chunk_seed)
+                 for size, chunk_seed in zip(sizes, seeds)]
+        
+        counts = np.zeros((total_months, MC_BINS), dtype=np.int64)
+        sums = np.zeros(total_months)
+        if workers and workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(_simulate_chunk, *zip(*tasks))
+                for chunk_counts, chunk_sums in results:
+                    counts += chunk_counts
+                    sums += chunk_sums
+        else:
+            for task in tasks:
+                chunk_counts, chunk_sums = _simulate_chunk(*task)
+                counts += chunk_counts
+                sums += chunk_sums
+        
+        deterministic = monthly_investment * _annuity_factor(annual_return / 12 / 100, months)
+        scale = sigma * np.sqrt(months)
+        result = pd.DataFrame({
+            'month': months,
+            'year': np.round(months / 12, 1),
+            'invested': monthly_investment * months,
+            'mean': sums / paths
+        })
+        for q, z in _histogram_quantiles(counts, percentiles).items():
+            result[f"p{q:g}"] = deterministic * np.exp(z * scale)
+        return result
+
+    def backtest_sip(self, history, monthly_investment, years, price_column='Close'):
+        """Replay a SIP over a price history for every possible start month
+        
+        Units are bought at each month's last close; a window of `years` is
+        valued at the close of its final purchase month. With cumulative units
+        U, the units of the window starting at s are U[s + n] - U[s], so all
+        start dates are evaluated in one pass. Returns one row per start month
+        with invested, units, final_value, profit and annualised xirr (%).
+        """
+        closes = history[price_column].groupby(history.index.to_period('M')).last().dropna()
+        total_months = int(years * 12)
+        starts = len(closes) - total_months + 1
+        columns = ['start', 'end', 'invested', 'units', 'final_value', 'profit', 'xirr']
+        if total_months < 1 or starts < 1:
+            return pd.DataFrame(columns=columns)
+        
+        prices = closes.to_numpy(dtype=float)
+        cumulative_units = np.concatenate(([0.0], np.cumsum(monthly_investment / prices)))
+        first = np.arange(starts)
+        last = first + total_months - 1
+        units = cumulative_units[last + 1] - cumulative_units[first]
+        final_value = units * prices[last]
+        invested = monthly_investment * total_months
+        
+        monthly_rate = _solve_monthly_rate(monthly_investment, total_months, final_value)
+        return pd.DataFrame({
+            'start': closes.index[first].to_timestamp(),
+            'end': closes.index[last].to_timestamp(how='end').normalize(),
+            'invested': invested,
+            'units': units,
+            'final_value': final_value,
+            'profit': final_value - invested,
+            'xirr': np.expm1(12 * np.log1p(monthly_rate)) * 100
+        }, columns=columns)
+
+    def calculate_step_up_future_value(self, monthly_investment, annual_return, years, step_up=10.0):
+        """Future value of a SIP whose instalment rises by step_up % every 12 months"""
+        total_months = int(years * 12)
+        future_value = monthly_investment * float(_step_up_factor(annual_return / 12 / 100, step_up / 100, total_months))
+        total_invested = monthly_investment * float(_step_up_invested(step_up / 100, total_months))
+        profit = future_value - total_invested
+        
+        return {
+            'future_value': future_value,
+            'total_invested': total_invested,
+            'profit': profit,
+            'return_percentage': (profit / total_invested) * 100 if total_invested > 0 else 0
+        }
+
+    def required_monthly_investment(self, target_amount, annual_return, years, step_up=0.0):
+        """Starting monthly instalment that reaches target_amount; all arguments broadcast
+        
+        Value is linear in the instalment, so this is exact: target / value of 1 a month.
+        """
+        months = np.floor(np.asarray(years, dtype=float) * 12)
+        factor = _step_up_factor(np.asarray(annual_return, dtype=float) / 12 / 100,
+                                 np.asarray(step_up, dtype=float) / 100, months)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            required = np.where(factor > 0, np.asarray(target_amount, dtype=float) / factor, np.nan)
+        return _scalar_or_array(required)
+
+    def required_years(self, target_amount, monthly_investment, annual_return, step_up=0.0, max_years=100):
+        """Years (in whole months) until a SIP first reaches target_amount; all arguments broadcast
+        
+        Vectorized bisection over the month count. Goals not reached within
+        max_years come back as NaN.
+        """
+        target_amount, monthly_investment, monthly_rate, step_up = np.broadcast_arrays(
+            np.asarray(target_amount, dtype=float), np.asarray(monthly_investment, dtype=float),
+            np.asarray(annual_return, dtype=float) / 12 / 100, np.asarray(step_up, dtype=float) / 100
+        )
+        
+        def reached(months):
+            return monthly_investment * _step_up_factor(monthly_rate, step_up, months) >= target_amount
+        
+        lo = np.zeros(target_amount.shape)
+        hi = np.full(target_amount.shape, float(max_years * 12))
+        feasible = reached(hi)
+        while np.any(hi - lo > 1):
+            mid = np.floor((lo + hi) / 2)
+            hit = reached(mid)
+            hi = np.where(hit, mid, hi)
+            lo = np.where(hit, lo, mid)
+        months = np.where(target_amount <= 0, 0.0, hi)
+        return _scalar_or_array(np.where(feasible | (target_amount <= 0), months / 12, np.nan))
+
+    def xirr(self, amounts, dates, groups=None):
+        """Annualised internal rate of return (%) over irregular cash flows
+        
+        Outflows are negative and inflows positive. With groups, every group is
+        solved at once and a Series indexed by group is returned; otherwise a float.
+        """
+        flows = pd.DataFrame({
+            'amount': np.asarray(amounts, dtype=float),
+            'date': pd.to_datetime(np.asarray(dates)),
+            'group': 0 if groups is None else np.asarray(groups)
+        })
+        codes, labels = pd.factorize(flows['group'])
+        position = flows.groupby(codes).cumcount().to_numpy()
+        start = flows.groupby(codes)['date'].transform('min')
+        years_in = ((flows['date'] - start).dt.days / 365.0).to_numpy()
+        
+        # Pad to (groups x longest group) so every group solves in the same Newton iterations
+        padded_amounts = np.zeros((len(labels), position.max() + 1 if len(flows) else 0))
+        padded_times = np.zeros_like(padded_amounts)
+        padded_amounts[codes, position] = flows['amount'].to_numpy()
+        padded_times[codes, position] = years_in
+        rates = _solve_xirr(padded_amounts, padded_times) * 100
+        
+        if groups is None:
+            return float(rates[0]) if len(rates) else np.nan
+        return pd.Series(rates, index=labels, name='xirr')
+
+    def sensitivity_table(self, monthly_investment, annual_return, years,
+                          return_steps=(-3, -2, -1, 0, 1, 2, 3), year_steps=(-10, -5, 0, 5, 10)):
+        """Future value around a plan, rows by annual return (%) and columns by years"""
+        annual_returns = sorted({max(0.0, annual_return + step) for step in return_steps})
+        tenures = sorted({max(1, years + step) for step in year_steps})
+        grid = self.scenario_grid([monthly_investment], annual_returns, tenures)
+        
+        table = pd.DataFrame(grid['future_value'][0], index=annual_returns, columns=tenures)
+        table.index.name = 'Annual Return (%)'
+        table.columns.name = 'Years'
+        return table
 
 class PortfolioManager:
     """Manage user portfolio and watchlist"""
     
-    def __init__(self):
-        if 'watchlist' not in st.session_state:
-            st.session_state.watchlist = []
-        
-        if 'price_alerts' not in st.session_state:
-            st.session_state.price_alerts = []
+    def __init__(self, store=None):
+        # Portfolio data persists in SQLite; alerts live in a process-wide book backed by the same store
+        self.store = store or get_portfolio_store()
+        self.alert_book = get_alert_book()
+    
+    def get_watchlist(self):
+        """Watchlist entries, oldest first"""
+        return self.store.watchlist()
     
     def add_to_watchlist(self, symbol, asset_type):
         """Add a symbol to the watchlist"""
-        if symbol not in [item['symbol'] for item in st.session_state.watchlist]:
-            st.session_state.watchlist.append({
-                'symbol': symbol,
-                'asset_type': asset_type,
-                'added_date': datetime.now().strftime("%Y-%m-%d")
-            })
-            return True
-        return False
+        return self.store.add_to_watchlist(symbol, asset_type)
     
     def remove_from_watchlist(self, symbol):
         """Remove a symbol from the watchlist"""
-        st.session_state.watchlist = [item for item in st.session_state.watchlist if item['symbol'] != symbol]
+        self.store.remove_from_watchlist(symbol)
     
-    def add_price_alert(self, symbol, target_price, condition):
+    def add_price_alert(self, symbol, target_price, condition, asset_type='stock'):
         """Add a price alert"""
-        alert_id = f"{symbol}_{target_price}_{condition}_{int(time.time())}"
-        st.session_state.price_alerts.append({
-            'id': alert_id,
-            'symbol': symbol,
-            'target_price': target_price,
-            'condition': condition,
-            'created': datetime.now().strftime("%Y-%m-%d %H:%M"),
-            'triggered': False
-        })
+        return self.alert_book.add(symbol, target_price, condition, asset_type=asset_type)
+    
+    def add_rule_alert(self, symbol, rule, asset_type='stock'):
+        """Add an indicator-rule alert such as "RSI(14) < 30" """
+        return self.alert_book.add_rule(symbol, rule, asset_type=asset_type)
     
     def remove_price_alert(self, alert_id):
         """Remove a price alert"""
-        st.session_state.price_alerts = [alert for alert in st.session_state.price_alerts if alert['id'] != alert_id]
+        self.alert_book.remove(alert_id)
     
     def check_price_alerts(self, current_prices):
         """Check if any price alerts should be triggered"""
-        triggered_alerts = []
-        for alert in st.session_state.price_alerts:
-            if alert['triggered']:
-                continue
-                
-            symbol = alert['symbol']
-            if symbol not in current_prices:
-                continue
-                
-            current_price = current_prices[symbol]
-            target_price = alert['target_price']
-            condition = alert['condition']
-            
-            if ((condition == 'above' and current_price >= target_price) or
-                (condition == 'below' and current_price <= target_price)):
-                alert['triggered'] = True
-                alert['triggered_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                triggered_alerts.append(alert)
-        
-        return triggered_alerts
\ No newline at end of file
+        return self.alert_book.check(current_prices)
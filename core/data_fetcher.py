@@ -1,121 +1,270 @@
-import requests
+import os
+import threading
 import pandas as pd
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from core.history_store import get_history_store
+from core.http_client import get_http_client
+from core.periods import period_start
+from core.providers.base import ProviderError, get_provider
+from core.providers.coingecko import CoinGeckoProvider
+from core.scheduler import PRIORITY_REFRESH, request_priority
+from core.swr_cache import swr_cache
+
+# Price data is fresh for PRICE_TTL seconds; after that the last good value is served
+# (flagged stale) while a background refresh runs, until PRICE_HARD_TTL forces a wait
+PRICE_TTL = 300
+PRICE_HARD_TTL = int(os.getenv('FINDASH_PRICE_HARD_TTL', 3600))
+
+# When the newest stored bar of each (store key, interval) was last fetched. Module-level so
+# it outlives the fetcher, which the app builds again on every rerun
+_tail_fetched = {}
+_tail_lock = threading.Lock()
+
+def _bar_length(interval):
+    try:
+        return pd.Timedelta(interval)
+    except ValueError:
+        return pd.Timedelta(days=31)  # '1wk', '1mo'
+
+def _note_tail_fetched(key, interval):
+    with _tail_lock:
+        _tail_fetched[(key, interval)] = pd.Timestamp.now()
+
+def _with_priority(priority, fetch, *args, **kwargs):
+    with request_priority(priority):
+        return fetch(*args, **kwargs)
 
 class StreamlitDataFetcher:
     """Data fetcher optimized for Streamlit with caching"""
     
-    def __init__(self):
-        self.coingecko_url = "https://api.coingecko.com/api/v3"
-        self.news_api_url = "https://newsapi.org/v2/everything"
+    def __init__(self, coingecko_url="https://api.coingecko.com/api/v3",
+                 news_api_url="https://newsapi.org/v2/everything", max_workers=8, http_client=None,
+                 history_store=None, stock_provider=None, crypto_provider=None):
+        self.http = http_client or get_http_client()
+        self.history_store = history_store or get_history_store()
+        self.news_api_url = news_api_url
+        self.max_workers = max_workers
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        # FINDASH_STOCK_PROVIDER picks the stock backend: synthetic (default), yfinance, alphavantage, replay
+        self.stock_provider = stock_provider or get_provider(os.getenv('FINDASH_STOCK_PROVIDER', 'synthetic'))
+        self.crypto_provider = crypto_provider or CoinGeckoProvider(
+            base_url=coingecko_url, http_client=self.http, headers=self.headers
+        )
 
-    @st.cache_data(ttl=300)  # Cache for 5 minutes
-    def fetch_stock_data(_self, symbol, period="1mo"):
+    @swr_cache(ttl=PRICE_TTL, hard_ttl=PRICE_HARD_TTL)  # Fresh for 5 minutes, then served stale while refreshing
+    def fetch_stock_data(_self, symbol, period="1mo", interval="1d"):
         """Fetch stock data with Streamlit caching"""
-        # Mock realistic data for demo
-        mock_prices = {
-            'AAPL': 220.50, 'GOOGL': 175.25, 'MSFT': 415.80, 'TSLA': 185.30,
-            'AMZN': 180.75, 'META': 520.40, 'NFLX': 485.90, 'NVDA': 920.15,
-            'BRK-B': 425.30, 'JPM': 210.45, 'JNJ': 155.80, 'V': 280.90
-        }
-        
-        company_names = {
-            'AAPL': 'Apple Inc.', 'GOOGL': 'Alphabet Inc.', 'MSFT': 'Microsoft Corporation',
-            'TSLA': 'Tesla Inc.', 'AMZN': 'Amazon.com Inc.', 'META': 'Meta Platforms Inc.',
-            'NFLX': 'Netflix Inc.', 'NVDA': 'NVIDIA Corporation', 'BRK-B': 'Berkshire Hathaway',
-            'JPM': 'JPMorgan Chase & Co.', 'JNJ': 'Johnson & Johnson', 'V': 'Visa Inc.'
-        }
-        
-        base_price = mock_prices.get(symbol, 100.0)
-        
-        # Generate realistic historical data
-        np.random.seed(hash(symbol) % 1000)  # Consistent random data per symbol
-        dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
-        prices = []
-        
-        current = base_price
-        for i in range(30):
-            change = np.random.normal(0, 0.02)  # 2% daily volatility
-            current = max(current * (1 + change), base_price * 0.7)  # Prevent unrealistic drops
-            prices.append(current)
+        end = pd.Timestamp.now()
+        if interval == "1d":
+            end = end.normalize()
+        start = period_start(period, end.normalize())
+        year_start = end.normalize() - pd.DateOffset(weeks=52)
+        # Load at least a year so the 52-week range isn't just the chart period on a cold store
+        loaded = _self.load_history(symbol, min(start, year_start), end, interval)
+        hist = loaded[loaded.index >= start]
+        year = loaded[loaded.index >= year_start]
         
-        hist = pd.DataFrame({
-            'Close': prices,
-            'Open': [p * (1 + np.random.normal(0, 0.005)) for p in prices],
-            'High': [p * (1 + abs(np.random.normal(0, 0.01))) for p in prices],
-            'Low': [p * (1 - abs(np.random.normal(0, 0.01))) for p in prices],
-            'Volume': [np.random.randint(50000000, 200000000) for _ in prices]
-        }, index=dates)
-        
-        current_price = prices[-1]
-        change_30d = ((current_price - prices[0]) / prices[0]) * 100
-        change_1d = ((prices[-1] - prices[-2]) / prices[-2]) * 100
+        prices = hist['Close']
+        current_price = prices.iloc[-1]
+        change_30d = ((current_price - prices.iloc[0]) / prices.iloc[0]) * 100
+        change_1d = ((prices.iloc[-1] - prices.iloc[-2]) / prices.iloc[-2]) * 100 if len(prices) > 1 else 0.0
         
         return {
             'symbol': symbol,
             'current_price': current_price,
             'currency': 'USD',
-            'company_name': company_names.get(symbol, f"{symbol} Corporation"),
+            'company_name': _self.stock_provider.get_profile(symbol)['name'],
             'history': hist,
             'change_30d': change_30d,
             'change_1d': change_1d,
             'volume': hist['Volume'].iloc[-1],
-            'high_52w': max(prices) * 1.1,
-            'low_52w': min(prices) * 0.9
+            'high_52w': year['High'].max(),
+            'low_52w': year['Low'].min()
         }
 
+    def load_history(self, symbol, start, end, interval="1d"):
+        """Bars for [start, end], fetching only the ranges missing from the store
+
+        The last stored bar is fetched again (and overwritten) until it has
+        been read after its period ended, so a partial bar stored during the
+        session doesn't stay frozen in the store.
+        """
+        key = self._store_key(symbol)
+        first, last = self.history_store.bounds(key, interval)
+        if first is None:
+            self.history_store.append(key, self._fetch_stock_bars(symbol, start, end, interval), interval)
+            _note_tail_fetched(key, interval)
+        else:
+            one_tick = pd.Timedelta(1, unit='ns')
+            if start < first:
+                bars = self._fetch_stock_bars(symbol, start, first - one_tick, interval)
+                self.history_store.append(key, bars, interval)
+            if last <= end and self._may_be_partial(key, interval, last):
+                self._fetch_tail(symbol, key, last, end, interval)
+            elif last + _bar_length(interval) <= end:
+                self._fetch_tail(symbol, key, last + one_tick, end, interval)
+        return self.history_store.read(key, interval, start=start, end=end)
+
+    def _fetch_tail(self, symbol, key, start, end, interval):
+        """Fetch and store the bars after the stored history, noting when they were fetched
+
+        An empty window (a weekend, a holiday, before the open) is not an
+        error: the stored bars are served as they are.
+        """
+        try:
+            self.history_store.append(key, self._fetch_stock_bars(symbol, start, end, interval), interval)
+        except ProviderError:
+            pass  # nothing newer upstream yet
+        _note_tail_fetched(key, interval)
+
+    def _may_be_partial(self, key, interval, last):
+        """Whether the bar stamped `last` could still have been forming when it was fetched"""
+        with _tail_lock:
+            fetched = _tail_fetched.get((key, interval))
+        # Unknown after a restart: fetch it again once to be sure
+        return fetched is None or fetched < last + _bar_length(interval)
+
+    def _store_key(self, symbol):
+        # Bars from different backends never mix in one file
+        return f"{self.stock_provider.name}:{symbol}"
+
+    def fetch_stock_quotes(self, symbols):
+        """Fetch latest quotes for many stocks in one provider call"""
+        symbols = tuple(sorted(set(symbols)))
+        if not symbols:
+            return {}
+        try:
+            return self._fetch_stock_quotes(symbols)
+        except Exception as e:
+            st.error(f"Error fetching stock quotes: {e}")
+            return {}
+
     @st.cache_data(ttl=300)
-    def fetch_crypto_data(_self, crypto_id, days=30):
-        """Fetch crypto data with caching"""
+    def _fetch_stock_quotes(_self, symbols):
+        """Batched quote lookup; failures raise so they are not cached"""
+        return _self.stock_provider.get_quotes(symbols)
+
+    def _fetch_stock_bars(self, symbol, start, end, interval="1d"):
+        """Upstream source for stock bars"""
+        return self.stock_provider.get_history(symbol, start, end, interval)
+
+    @swr_cache(ttl=PRICE_TTL, hard_ttl=PRICE_HARD_TTL)
+    def fetch_crypto_data(self, crypto_id, days=30, include_history=True):
+        """Fetch crypto quote and, when a chart needs it, price history"""
         try:
-            # Get current price
-            price_url = f"{_self.coingecko_url}/simple/price"
-            price_params = {
-                'ids': crypto_id,
-                'vs_currencies': 'usd',
-                'include_24hr_change': 'true',
-                'include_market_cap': 'true',
-                'include_24hr_vol': 'true'
-            }
-            
-            price_response = requests.get(price_url, params=price_params, headers=_self.headers)
-            price_data = price_response.json()
-            
-            # Get historical data
-            history_url = f"{_self.coingecko_url}/coins/{crypto_id}/market_chart"
-            history_params = {'vs_currency': 'usd', 'days': days}
-            
-            history_response = requests.get(history_url, params=history_params, headers=_self.headers)
-            history_data = history_response.json()
-            
-            prices = history_data['prices']
-            dates = [datetime.fromtimestamp(price[0]/1000) for price in prices]
-            price_values = [price[1] for price in prices]
+            quotes = self._fetch_crypto_quotes((crypto_id,))
+            if crypto_id not in quotes:
+                raise KeyError(f"CoinGecko returned no price for {crypto_id}")
+            data = dict(quotes[crypto_id])
             
-            hist_df = pd.DataFrame({'Date': dates, 'Close': price_values}).set_index('Date')
+            if include_history:
+                hist_df = self.fetch_crypto_history(crypto_id, days)
+                first_price = hist_df['Close'].iloc[0]
+                data['history'] = hist_df
+                data['change_30d'] = ((data['current_price'] - first_price) / first_price) * 100
             
-            current_price = price_data[crypto_id]['usd']
-            change_30d = ((current_price - price_values[0]) / price_values[0]) * 100
-            
-            return {
-                'symbol': crypto_id.upper(),
-                'current_price': current_price,
-                'currency': 'USD',
-                'history': hist_df,
-                'change_30d': change_30d,
-                '24h_change': price_data[crypto_id].get('usd_24h_change', 0),
-                'market_cap': price_data[crypto_id].get('usd_market_cap', 0),
-                'volume_24h': price_data[crypto_id].get('usd_24h_vol', 0)
-            }
+            return data
         except Exception as e:
             st.error(f"Error fetching crypto data: {e}")
             return None
 
+    def fetch_crypto_quotes(self, crypto_ids):
+        """Fetch current quotes for many coins, batched into as few requests as possible"""
+        ids = tuple(sorted({crypto_id.lower() for crypto_id in crypto_ids}))
+        if not ids:
+            return {}
+        try:
+            return self._fetch_crypto_quotes(ids)
+        except Exception as e:
+            st.error(f"Error fetching crypto quotes: {e}")
+            return {}
+
+    @st.cache_data(ttl=300)
+    def _fetch_crypto_quotes(_self, crypto_ids):
+        """Batched quote lookup; failures raise so they are not cached"""
+        return _self.crypto_provider.get_quotes(crypto_ids)
+
+    def fetch_live_quotes(self, symbols, asset_type="stock", priority=PRIORITY_REFRESH):
+        """Uncached batched quotes keyed by the requested symbols, for pollers that need prices newer than PRICE_TTL
+
+        One provider call per asset type. Failures raise; symbols the provider
+        does not know are simply missing from the result.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        with request_priority(priority):
+            if asset_type == "crypto":
+                quotes = self.crypto_provider.get_quotes(tuple(sorted({symbol.lower() for symbol in symbols})))
+                return {symbol: quotes[symbol.lower()] for symbol in symbols if symbol.lower() in quotes}
+            quotes = self.stock_provider.get_quotes(tuple(sorted(set(symbols))))
+            return {symbol: quotes[symbol] for symbol in symbols if symbol in quotes}
+
+    @st.cache_data(ttl=300)
+    def fetch_crypto_history(_self, crypto_id, days=30):
+        """Fetch crypto price history from /market_chart"""
+        return _self.crypto_provider.get_market_chart(crypto_id, days)
+
+    def iter_many(self, symbols, asset_type="stock", max_workers=None, priority=PRIORITY_REFRESH, **kwargs):
+        """Fetch several symbols concurrently, yielding (symbol, data, error) as each one lands"""
+        fetch = self.fetch_crypto_data if asset_type == "crypto" else self.fetch_stock_data
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return
+        
+        # Quote-only refreshes collapse into one batched provider call
+        # (for crypto, a single /simple/price request keyed by lower-case id)
+        if not kwargs.get('include_history', True):
+            with request_priority(priority):
+                if asset_type == "crypto":
+                    quotes = self.fetch_crypto_quotes(symbols)
+                else:
+                    quotes = self.fetch_stock_quotes(symbols)
+            for symbol in symbols:
+                key = symbol.lower() if asset_type == "crypto" else symbol
+                if key in quotes:
+                    yield symbol, quotes[key], None
+                else:
+                    yield symbol, None, KeyError(f"No quote returned for {symbol}")
+            return
+        
+        # Worker threads inherit the session's script context so cached calls and
+        # st.* messages from inside the fetchers behave as they do on the main thread
+        ctx = get_script_run_ctx()
+        workers = min(max_workers or self.max_workers, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers,
+                                initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as pool:
+            futures = {pool.submit(_with_priority, priority, fetch, symbol, **kwargs): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    yield symbol, None, e
+                    continue
+                
+                if data is None:
+                    yield symbol, None, ValueError(f"No data returned for {symbol}")
+                else:
+                    yield symbol, data, None
+
+    def fetch_many(self, symbols, asset_type="stock", max_workers=None, priority=PRIORITY_REFRESH, **kwargs):
+        """Fetch several symbols concurrently, returning (results, errors) keyed by symbol"""
+        results = {}
+        errors = {}
+        for symbol, data, error in self.iter_many(symbols, asset_type, max_workers, priority, **kwargs):
+            if error is None:
+                results[symbol] = data
+            else:
+                errors[symbol] = error
+        return results, errors
+
     @st.cache_data(ttl=3600)  # Cache for 1 hour
     def fetch_news(_self, query, api_key=None):
         """Fetch news articles related to a query"""
@@ -132,7 +281,8 @@ class StreamlitDataFetcher:
                 'pageSize': 5
             }
             
-            response = requests.get(_self.news_api_url, params=params, headers=_self.headers)
+            # No raise_for_status: NewsAPI reports quota errors in the JSON body
+            response = _self.http.get(_self.news_api_url, params=params, headers=_self.headers)
             data = response.json()
             
             if data['status'] == 'ok':
@@ -141,6 +291,10 @@ class StreamlitDataFetcher:
                 st.warning("News API limit reached. Using demo data.")
                 return _self.generate_mock_news(query)
                 
+        except TimeoutError:
+            # The local NewsAPI quota is spent; waiting for it would stall the page
+            st.warning("News API limit reached. Using demo data.")
+            return _self.generate_mock_news(query)
         except Exception as e:
             st.warning(f"Could not fetch news: {e}. Using demo data.")
             return _self.generate_mock_news(query)
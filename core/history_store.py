@@ -0,0 +1,92 @@
+import os
+import re
+import threading
+
+import pandas as pd
+
+DEFAULT_ROOT = os.path.join('data', 'cache', 'ohlcv')
+
+class HistoryStore:
+    """On-disk Parquet store of OHLCV bars, one file per symbol and interval"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.RLock()
+        self._frames = {}  # path -> (mtime_ns, DataFrame)
+
+    def path_for(self, symbol, interval='1d'):
+        """Parquet file holding a symbol's bars"""
+        safe_symbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.root, interval, f"{safe_symbol}.parquet")
+
+    def read(self, symbol, interval='1d', start=None, end=None):
+        """Stored bars in [start, end], kept in memory until the file changes on disk"""
+        frame = self._load(self.path_for(symbol, interval))
+        if frame is None:
+            return None
+        if start is not None or end is not None:
+            frame = frame.loc[start:end]
+        return frame
+
+    def bounds(self, symbol, interval='1d'):
+        """(first, last) stored timestamps, or (None, None) when nothing is stored"""
+        frame = self.read(symbol, interval)
+        if frame is None or frame.empty:
+            return None, None
+        return frame.index[0], frame.index[-1]
+
+    def append(self, symbol, bars, interval='1d'):
+        """Merge new bars into the store; re-fetched timestamps replace the stored row"""
+        if bars is None or bars.empty:
+            return self.read(symbol, interval)
+
+        path = self.path_for(symbol, interval)
+        with self._lock:
+            existing = self._load(path)
+            if existing is None or existing.empty:
+                combined = bars.sort_index()
+            else:
+                combined = pd.concat([existing, bars])
+                combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            combined.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+            self._frames[path] = (os.stat(path).st_mtime_ns, combined)
+        return combined
+
+    def clear(self, symbol, interval='1d'):
+        """Drop a symbol's stored history"""
+        path = self.path_for(symbol, interval)
+        with self._lock:
+            self._frames.pop(path, None)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load(self, path):
+        with self._lock:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._frames.pop(path, None)
+                return None
+
+            cached = self._frames.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            frame = pd.read_parquet(path)
+            self._frames[path] = (mtime, frame)
+            return frame
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def get_history_store():
+    """Process-wide store so every session shares one in-memory view of the files"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = HistoryStore()
+        return _default_store
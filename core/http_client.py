@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.scheduler import get_scheduler
+from core.singleflight import SingleFlight
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# (connect, read) timeouts in seconds, per upstream host
+DEFAULT_TIMEOUTS = {
+    'api.coingecko.com': (3.05, 10),
+    'newsapi.org': (3.05, 8),
+    'www.alphavantage.co': (3.05, 15),
+}
+
+class HTTPClient:
+    """Pooled HTTP transport with per-host timeouts, jittered retries and usage counters
+
+    When a RateLimitScheduler is given, every attempt (retries included) to a
+    rate-limited host first waits for that provider's quota, for at most the
+    request's own timeout unless `quota_timeout` is passed; past that the
+    request raises TimeoutError instead of stalling its caller.
+    """
+
+    def __init__(self, timeouts=None, default_timeout=(3.05, 10), max_retries=3,
+                 backoff_base=0.5, backoff_cap=8.0, pool_size=20, headers=None, scheduler=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.scheduler = scheduler
+
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._flight = SingleFlight()
+
+    def timeout_for(self, url):
+        """Timeout tuple configured for the host of a URL"""
+        return self.timeouts.get(urlparse(url).hostname, self.default_timeout)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than a server-sent Retry-After"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def request(self, method, url, quota_timeout=None, **kwargs):
+        """Send a request, retrying connection errors, timeouts and 429/5xx responses"""
+        host = urlparse(url).hostname
+        provider = self.scheduler.provider_for(host) if self.scheduler else None
+        kwargs.setdefault('timeout', self.timeout_for(url))
+        if quota_timeout is None:
+            timeout = kwargs['timeout']
+            quota_timeout = sum(timeout) if isinstance(timeout, tuple) else timeout
+
+        for attempt in range(self.max_retries + 1):
+            if provider:
+                self.scheduler.acquire(provider, timeout=quota_timeout)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(host, time.perf_counter() - start, error=True)
+                if attempt == self.max_retries:
+                    raise
+                self._record_retry(host)
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            self._record(host, time.perf_counter() - start, error=response.status_code >= 400)
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._record_retry(host)
+                time.sleep(self.backoff_delay(attempt, _parse_retry_after(response)))
+                continue
+
+            return response
+
+    def get(self, url, params=None, **kwargs):
+        """GET through the pooled session"""
+        return self.request('GET', url, params=params, **kwargs)
+
+    def get_json(self, url, params=None, **kwargs):
+        """GET a URL and decode its JSON body, raising on HTTP errors
+
+        Concurrent calls for the same URL and params share one upstream request,
+        so the decoded body may be shared between callers and must not be mutated.
+        """
+        def load():
+            response = self.get(url, params=params, **kwargs)
+            response.raise_for_status()
+            return response.json()
+
+        key = (url, tuple(sorted((name, str(value)) for name, value in (params or {}).items())))
+        data, shared = self._flight.do(key, load)
+        if shared:
+            with self._lock:
+                self._counters(urlparse(url).hostname)['coalesced'] += 1
+        return data
+
+    def stats(self):
+        """Per-host request, retry, error, coalescing and latency counters"""
+        with self._lock:
+            snapshot = {}
+            for host, counters in self._stats.items():
+                snapshot[host] = dict(counters)
+                snapshot[host]['avg_latency'] = (
+                    counters['total_latency'] / counters['requests'] if counters['requests'] else 0.0
+                )
+            return snapshot
+
+    def reset_stats(self):
+        """Clear all counters"""
+        with self._lock:
+            self._stats.clear()
+
+    def _counters(self, host):
+        return self._stats.setdefault(host, {
+            'requests': 0, 'retries': 0, 'errors': 0, 'coalesced': 0, 'total_latency': 0.0, 'max_latency': 0.0
+        })
+
+    def _record(self, host, latency, error=False):
+        with self._lock:
+            counters = self._counters(host)
+            counters['requests'] += 1
+            counters['errors'] += int(error)
+            counters['total_latency'] += latency
+            counters['max_latency'] = max(counters['max_latency'], latency)
+
+    def _record_retry(self, host):
+        with self._lock:
+            self._counters(host)['retries'] += 1
+
+def _parse_retry_after(response):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_default_client = None
+_default_lock = threading.Lock()
+
+def get_http_client():
+    """Process-wide client so every fetcher and session shares one connection pool"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HTTPClient(headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }, scheduler=get_scheduler())
+        return _default_client
@@ -0,0 +1,413 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.storage import get_portfolio_store
+
+METHODS = ('fifo', 'lifo', 'average')
+LEDGER_COLUMNS = ['id', 'date', 'type', 'symbol', 'quantity', 'price']
+REALIZED_COLUMNS = ['symbol', 'buy_date', 'sell_date', 'quantity', 'cost_price', 'sell_price', 'pnl']
+LOT_COLUMNS = ['symbol', 'buy_date', 'quantity', 'cost_price']
+
+# Quantities closer than this count as equal; cumulative sums of fractional units drift
+QUANTITY_EPS = 1e-9
+
+class LedgerError(ValueError):
+    """Transaction log is inconsistent, e.g. a sell larger than the position"""
+
+def _to_frame(transactions):
+    """Columnar ledger sorted by symbol, then date, then insertion order"""
+    df = pd.DataFrame(transactions)
+    if df.empty:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in (
+            ('id', 'int64'), ('date', 'datetime64[ns]'), ('type', 'object'), ('symbol', 'object'),
+            ('quantity', 'float64'), ('price', 'float64'))})
+    if 'id' not in df:
+        df['id'] = np.arange(len(df))
+    df = df[LEDGER_COLUMNS].assign(
+        date=pd.to_datetime(df['date']),
+        quantity=df['quantity'].astype(float),
+        price=df['price'].astype(float)
+    )
+    return df.sort_values(['symbol', 'date', 'id'], kind='stable').reset_index(drop=True)
+
+def _check_oversold(tx):
+    signed = np.where(tx['type'].to_numpy() == 'Buy', 1.0, -1.0) * tx['quantity'].to_numpy()
+    position = pd.Series(signed).groupby(tx['symbol'].to_numpy()).cumsum().to_numpy()
+    bad = position < -QUANTITY_EPS
+    if bad.any():
+        row = tx.iloc[int(np.argmax(bad))]
+        raise LedgerError(f"Sell of {row['quantity']:g} {row['symbol']} on {row['date']:%Y-%m-%d} "
+                          f"exceeds the position held")
+    return signed, position
+
+def check_log(transactions):
+    """Raise LedgerError if any sell in a transaction log exceeds the position held at its date"""
+    _check_oversold(_to_frame(list(transactions)))
+
+def check_transaction(transactions, transaction):
+    """Raise LedgerError if adding `transaction` to the log would oversell its symbol at any date
+
+    The symbol's rows are replayed with the new one placed at its own date
+    (after rows already on that date), so a back-dated sell is checked
+    against the position held then rather than today's.
+    """
+    transactions = [row for row in transactions if row['symbol'] == transaction['symbol']]
+    next_id = max((row['id'] for row in transactions), default=0) + 1
+    check_log(transactions + [{**transaction, 'id': next_id}])
+
+def _match_fifo(tx):
+    """FIFO matching by intersecting buy and sell intervals on a cumulative-quantity axis
+
+    Within a symbol, buy i owns units [B[i-1], B[i]) of everything ever bought
+    and sell j disposes of units [S[j-1], S[j]) of everything ever sold. FIFO
+    means sold unit u is bought unit u, so every (buy, sell) match is the
+    overlap of two intervals. All interval ends are ranked by (symbol,
+    position) in one sort, snapping points within QUANTITY_EPS together, and
+    each elementary segment finds its buy and sell with a binary search.
+    """
+    _check_oversold(tx)
+    is_buy = tx['type'].to_numpy() == 'Buy'
+    quantity = tx['quantity'].to_numpy()
+    codes, symbols = pd.factorize(tx['symbol'])
+    buys, sells = np.flatnonzero(is_buy), np.flatnonzero(~is_buy)
+
+    buy_end = pd.Series(quantity[buys]).groupby(codes[buys]).cumsum().to_numpy()
+    sell_end = pd.Series(quantity[sells]).groupby(codes[sells]).cumsum().to_numpy()
+    point_code = np.concatenate((codes[buys], codes[buys], codes[sells], codes[sells]))
+    point_pos = np.concatenate((buy_end - quantity[buys], buy_end, sell_end - quantity[sells], sell_end))
+    order = np.lexsort((point_pos, point_code))
+    pos, code = point_pos[order], point_code[order]
+    new = np.ones(len(pos), dtype=bool)
+    new[1:] = (code[1:] != code[:-1]) | (np.diff(pos) > QUANTITY_EPS)
+    rank = np.empty(len(pos), dtype=np.int64)
+    rank[order] = np.cumsum(new) - 1
+    nb, ns = len(buys), len(sells)
+    buy_start_rank, buy_end_rank = rank[:nb], rank[nb:2 * nb]
+    sell_start_rank, sell_end_rank = rank[2 * nb:2 * nb + ns], rank[2 * nb + ns:]
+
+    # Elementary segment k runs from distinct point k to k + 1 within one symbol
+    point_pos, point_code = pos[new], code[new]
+    segment = np.flatnonzero(point_code[1:] == point_code[:-1])
+    length = point_pos[segment + 1] - point_pos[segment]
+    buy_idx = np.searchsorted(buy_end_rank, segment, side='right')
+    sell_idx = np.searchsorted(sell_end_rank, segment, side='right')
+    matched = sell_idx < ns
+    matched[matched] &= sell_start_rank[sell_idx[matched]] <= segment[matched]
+    # Zero-quantity buys own no segment; keep the search pointing at a real one
+    buy_idx = np.minimum(buy_idx, nb - 1)
+
+    dates = tx['date'].to_numpy()
+    prices = tx['price'].to_numpy()
+    b, s, q = buys[buy_idx[matched]], sells[sell_idx[matched]], length[matched]
+    realized = pd.DataFrame({
+        'symbol': symbols[codes[s]],
+        'buy_date': dates[b],
+        'sell_date': dates[s],
+        'quantity': q,
+        'cost_price': prices[b],
+        'sell_price': prices[s],
+        'pnl': q * (prices[s] - prices[b])
+    }, columns=REALIZED_COLUMNS).sort_values(['sell_date', 'symbol'], kind='stable').reset_index(drop=True)
+
+    remaining = np.bincount(buy_idx[~matched], weights=length[~matched], minlength=nb)
+    open_buys = buys[remaining > QUANTITY_EPS]
+    lots = pd.DataFrame({
+        'symbol': symbols[codes[open_buys]],
+        'buy_date': dates[open_buys],
+        'quantity': remaining[remaining > QUANTITY_EPS],
+        'cost_price': prices[open_buys]
+    }, columns=LOT_COLUMNS)
+    return realized, lots
+
+def _match_average(tx):
+    """Average-cost book as a linear recurrence over each symbol's rows
+
+    Cost basis follows C[t] = a[t] * C[t-1] + b[t]: a buy adds q * p (a = 1),
+    a sell keeps the average and so scales the basis by Q[t] / Q[t-1]. The
+    position Q is a plain cumsum, and every run between flat positions is
+    solved in closed form as C = A * cumsum(b / A) with A = cumprod(a).
+    """
+    signed, position = _check_oversold(tx)
+    is_buy = tx['type'].to_numpy() == 'Buy'
+    quantity = tx['quantity'].to_numpy()
+    prices = tx['price'].to_numpy()
+    symbol = tx['symbol'].to_numpy()
+    previous = position - signed
+
+    # A new run starts wherever the position was flat before the row
+    run = np.cumsum(previous <= QUANTITY_EPS)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.where(is_buy, 1.0, np.where(position > QUANTITY_EPS, position / previous, 0.0))
+    b = np.where(is_buy, quantity * prices, 0.0)
+    growth = pd.Series(a).groupby(run).cumprod().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = np.where(growth > 0, b / growth, 0.0)
+    cost = np.where(position > QUANTITY_EPS, growth * pd.Series(scaled).groupby(run).cumsum().to_numpy(), 0.0)
+
+    previous_cost = pd.Series(cost).groupby(symbol).shift(fill_value=0.0).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average = np.where(previous > QUANTITY_EPS, previous_cost / previous, 0.0)
+    sells = ~is_buy
+    dates = tx['date'].to_numpy()
+    realized = pd.DataFrame({
+        'symbol': symbol[sells],
+        'buy_date': np.full(sells.sum(), np.datetime64('NaT'), dtype='datetime64[ns]'),
+        'sell_date': dates[sells],
+        'quantity': quantity[sells],
+        'cost_price': average[sells],
+        'sell_price': prices[sells],
+        'pnl': quantity[sells] * (prices[sells] - average[sells])
+    }, columns=REALIZED_COLUMNS).sort_values(['sell_date', 'symbol'], kind='stable').reset_index(drop=True)
+
+    last = ~pd.Series(symbol).duplicated(keep='last').to_numpy()
+    run_start = pd.Series(dates).groupby(run).transform('first').to_numpy()
+    open_rows = last & (position > QUANTITY_EPS)
+    lots = pd.DataFrame({
+        'symbol': symbol[open_rows],
+        'buy_date': run_start[open_rows],
+        'quantity': position[open_rows],
+        'cost_price': cost[open_rows] / position[open_rows]
+    }, columns=LOT_COLUMNS)
+    return realized, lots
+
+def _match_lifo(tx):
+    """LIFO matching with a stack of open lots per symbol"""
+    _check_oversold(tx)
+    is_buy = (tx['type'].to_numpy() == 'Buy').tolist()
+    symbols, dates = tx['symbol'].tolist(), tx['date'].to_numpy()
+    quantities, prices = tx['quantity'].tolist(), tx['price'].tolist()
+    stacks = {}
+    buy_rows, sell_rows, matched = [], [], []
+    for row, buy in enumerate(is_buy):
+        stack = stacks.setdefault(symbols[row], [])
+        if buy:
+            stack.append([row, quantities[row]])
+            continue
+        # Oversells were rejected up front, so the stack always covers the sell
+        remaining = quantities[row]
+        while remaining > QUANTITY_EPS and stack:
+            lot = stack[-1]
+            take = min(remaining, lot[1])
+            buy_rows.append(lot[0])
+            sell_rows.append(row)
+            matched.append(take)
+            lot[1] -= take
+            remaining -= take
+            if lot[1] <= QUANTITY_EPS:
+                stack.pop()
+
+    prices = np.asarray(prices)
+    symbols = tx['symbol'].to_numpy()
+    b, s, q = np.asarray(buy_rows, dtype=np.int64), np.asarray(sell_rows, dtype=np.int64), np.asarray(matched)
+    realized = pd.DataFrame({
+        'symbol': symbols[s],
+        'buy_date': dates[b],
+        'sell_date': dates[s],
+        'quantity': q,
+        'cost_price': prices[b],
+        'sell_price': prices[s],
+        'pnl': q * (prices[s] - prices[b])
+    }, columns=REALIZED_COLUMNS).sort_values(['sell_date', 'symbol'], kind='stable').reset_index(drop=True)
+
+    open_rows = np.asarray([lot[0] for stack in stacks.values() for lot in stack], dtype=np.int64)
+    lots = pd.DataFrame({
+        'symbol': symbols[open_rows],
+        'buy_date': dates[open_rows],
+        'quantity': [lot[1] for stack in stacks.values() for lot in stack],
+        'cost_price': prices[open_rows]
+    }, columns=LOT_COLUMNS)
+    return realized, lots
+
+MATCHERS = {'fifo': _match_fifo, 'lifo': _match_lifo, 'average': _match_average}
+
+def _apply(lots, realized, method, symbol, date, kind, quantity, price):
+    """Apply one transaction to a symbol's open lots ([buy_date, quantity, cost_price] lists)"""
+    if kind == 'Buy':
+        if method == 'average' and lots:
+            held = lots[0][1] + quantity
+            lots[0][2] = (lots[0][1] * lots[0][2] + quantity * price) / held
+            lots[0][1] = held
+        else:
+            lots.append([date, quantity, price])
+        return
+
+    if quantity > sum(lot[1] for lot in lots) + QUANTITY_EPS:
+        raise LedgerError(f"Sell of {quantity:g} {symbol} on {pd.Timestamp(date):%Y-%m-%d} exceeds the position held")
+    end = -1 if method == 'lifo' else 0
+    remaining = quantity
+    while remaining > QUANTITY_EPS and lots:
+        lot = lots[end]
+        take = min(remaining, lot[1])
+        buy_date = pd.NaT if method == 'average' else lot[0]
+        realized.append((symbol, buy_date, date, take, lot[2], price, take * (price - lot[2])))
+        lot[1] -= take
+        remaining -= take
+        if lot[1] <= QUANTITY_EPS:
+            lots.pop(end)
+
+class Ledger:
+    """Holdings and realized/unrealized P&L derived from a transaction log
+
+    The whole log is matched in one vectorized pass (FIFO, average cost) or a
+    single stack pass (LIFO). Appending a transaction that is the newest for
+    its symbol then only touches that symbol's open lots; a back-dated one
+    re-matches that symbol alone.
+    """
+
+    def __init__(self, transactions=(), method='fifo'):
+        if method not in METHODS:
+            raise ValueError(f"Unknown lot matching method: {method}")
+        self.method = method
+        self.last_id = 0
+        self._lock = threading.RLock()
+        self._reset(_to_frame(list(transactions)))
+
+    def _reset(self, tx):
+        self._tx_chunks = [tx]
+        realized, lots = MATCHERS[self.method](tx)
+        self._realized_chunks = [realized]
+        self._lots_frame = lots
+        self._live = {}  # symbol -> open lots as lists, for symbols changed since the bulk match
+        self._last_date = tx.groupby('symbol')['date'].max().to_dict()
+        if len(tx):
+            self.last_id = max(self.last_id, int(tx['id'].max()))
+
+    @property
+    def transactions(self):
+        with self._lock:
+            if len(self._tx_chunks) > 1:
+                self._tx_chunks = [pd.concat(self._tx_chunks, ignore_index=True)]
+            return self._tx_chunks[0]
+
+    def append(self, transaction):
+        """Add one transaction dict (date, type, symbol, quantity, price[, id])"""
+        with self._lock:
+            row = _to_frame([{**{'id': self.last_id + 1}, **transaction}])
+            symbol, date = row.at[0, 'symbol'], row.at[0, 'date']
+            if symbol in self._last_date and date < self._last_date[symbol]:
+                self._rematch_symbol(symbol, row)
+            else:
+                lots = self._symbol_lots(symbol)
+                realized = []
+                _apply(lots, realized, self.method, symbol, date, row.at[0, 'type'],
+                       row.at[0, 'quantity'], row.at[0, 'price'])
+                if realized:
+                    self._realized_chunks.append(pd.DataFrame(realized, columns=REALIZED_COLUMNS))
+                self._tx_chunks.append(row)
+                self._last_date[symbol] = date
+            self.last_id = max(self.last_id, int(row.at[0, 'id']))
+
+    def sync(self, store):
+        """Append transactions added to a PortfolioStore since the last sync"""
+        with self._lock:
+            for transaction in store.transactions(after_id=self.last_id):
+                self.append(transaction)
+        return self
+
+    def realized(self):
+        """One row per matched lot: symbol, buy_date, sell_date, quantity, cost_price, sell_price, pnl"""
+        with self._lock:
+            if len(self._realized_chunks) > 1:
+                self._realized_chunks = [pd.concat(self._realized_chunks, ignore_index=True)]
+            return self._realized_chunks[0]
+
+    def open_lots(self, current_prices=None):
+        """Open lots; with current prices, adds market value and unrealized P&L per lot"""
+        with self._lock:
+            frames = [self._lots_frame[~self._lots_frame['symbol'].isin(list(self._live))]]
+            live = [(symbol, *lot) for symbol, lots in self._live.items() for lot in lots]
+            if live:
+                frames.append(pd.DataFrame(live, columns=LOT_COLUMNS))
+            lots = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+        if current_prices is not None:
+            price = lots['symbol'].map(current_prices).astype(float)
+            lots = lots.assign(
+                current_price=price,
+                market_value=lots['quantity'] * price,
+                unrealized_pnl=lots['quantity'] * (price - lots['cost_price'])
+            )
+        return lots
+
+    def positions(self, current_prices=None):
+        """Per-symbol quantity, cost basis, average cost, realized and (with prices) unrealized P&L"""
+        lots = self.open_lots(current_prices)
+        cost = (lots['quantity'] * lots['cost_price']).groupby(lots['symbol']).sum()
+        quantity = lots.groupby('symbol')['quantity'].sum()
+        realized = self.realized().groupby('symbol')['pnl'].sum()
+        positions = pd.DataFrame({'quantity': quantity, 'cost_basis': cost})
+        positions = positions.join(realized.rename('realized_pnl'), how='outer').fillna(
+            {'quantity': 0.0, 'cost_basis': 0.0, 'realized_pnl': 0.0})
+        positions['avg_cost'] = positions['cost_basis'] / positions['quantity'].where(positions['quantity'] > 0)
+        if current_prices is not None:
+            positions['current_price'] = positions.index.map(current_prices).astype(float)
+            positions['market_value'] = positions['quantity'] * positions['current_price']
+            positions['unrealized_pnl'] = positions['market_value'] - positions['cost_basis']
+        positions.index.name = 'symbol'
+        return positions
+
+    def _symbol_lots(self, symbol):
+        if symbol not in self._live:
+            lots = self._lots_frame[self._lots_frame['symbol'] == symbol]
+            self._live[symbol] = [[date, quantity, price] for date, quantity, price
+                                  in zip(lots['buy_date'], lots['quantity'], lots['cost_price'])]
+        return self._live[symbol]
+
+    def _rematch_symbol(self, symbol, row):
+        tx = self.transactions
+        symbol_tx = _to_frame(pd.concat([tx[tx['symbol'] == symbol], row], ignore_index=True))
+        realized, lots = MATCHERS[self.method](symbol_tx)
+        others = self.realized()
+        self._realized_chunks = [others[others['symbol'] != symbol], realized]
+        self._live[symbol] = [[date, quantity, price] for date, quantity, price
+                              in zip(lots['buy_date'], lots['quantity'], lots['cost_price'])]
+        self._tx_chunks.append(row)
+        self._last_date[symbol] = symbol_tx['date'].max()
+
+_default_ledgers = {}
+_default_lock = threading.Lock()
+
+def get_ledger(method='fifo'):
+    """Process-wide ledger per matching method, caught up with the portfolio store's transactions
+
+    Appended rows are matched incrementally; if rows were deleted from the
+    store since, the ledger is rebuilt from the whole log.
+    """
+    store = get_portfolio_store()
+    with _default_lock:
+        if method not in _default_ledgers:
+            _default_ledgers[method] = Ledger(store.transactions(), method)
+        ledger = _default_ledgers[method]
+    ledger.sync(store)
+    if len(ledger.transactions) != store.transaction_count():
+        ledger = Ledger(store.transactions(), method)
+        with _default_lock:
+            _default_ledgers[method] = ledger
+    return ledger
+
+def sync_holdings(removed=()):
+    """Rewrite the portfolio store's holdings book from the transaction log, so sells reduce it
+
+    Quantities and average prices come from the average-cost ledger; symbols
+    that were never traded (holdings entered before the transaction log) are
+    left as they are. `removed` names symbols whose transactions were just
+    deleted: if none are left, their holdings go too.
+    """
+    store = get_portfolio_store()
+    positions = get_ledger('average').positions()
+    gone = {symbol: {'quantity': 0.0} for symbol in removed if symbol not in positions.index}
+    if positions.empty:
+        store.set_positions(gone)
+        return
+    # Rows come oldest first: the last one per symbol has its current asset type and latest trade price
+    latest = pd.DataFrame(store.transactions()).groupby('symbol').last()
+    store.set_positions({
+        symbol: {
+            'asset_type': latest.at[symbol, 'asset_type'],
+            'quantity': float(row['quantity']),
+            'purchase_price': float(row['avg_cost']) if row['quantity'] > QUANTITY_EPS else 0.0,
+            'price': float(latest.at[symbol, 'price'])
+        }
+        for symbol, row in positions.iterrows()
+    } | gone)
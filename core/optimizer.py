@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.risk import TRADING_DAYS, covariance, returns_matrix
+
+def project_capped_simplex(v, cap=1.0, tol=1e-12, max_iter=100):
+    """Euclidean projection of each row of `v` onto {0 <= w <= cap, sum(w) = 1}
+
+    The projection is clip(v - tau, 0, cap) for the tau that makes the row
+    sum to one. That sum is piecewise linear in tau, so every row takes Newton
+    steps (slope = number of weights strictly between the bounds), falling
+    back to bisection of its bracket whenever a step would leave it.
+    """
+    v = np.atleast_2d(np.asarray(v, dtype=float))
+    n = v.shape[1]
+    if cap * n < 1 - 1e-12:
+        raise ValueError(f"A weight cap of {cap:g} cannot reach a fully invested portfolio of {n} assets")
+    lo = v.min(axis=1, keepdims=True) - cap  # every weight at the cap: sum >= 1
+    hi = v.max(axis=1, keepdims=True)        # every weight at zero: sum = 0
+    tau = (v.sum(axis=1, keepdims=True) - 1) / n  # exact when no bound is active
+    for _ in range(max_iter):
+        shifted = v - tau
+        excess = np.clip(shifted, 0.0, cap).sum(axis=1, keepdims=True) - 1
+        if np.abs(excess).max() < tol:
+            break
+        lo = np.where(excess > 0, tau, lo)
+        hi = np.where(excess > 0, hi, tau)
+        free = ((shifted > 0) & (shifted < cap)).sum(axis=1, keepdims=True)
+        newton = tau + excess / np.maximum(free, 1)
+        tau = np.where((free > 0) & (newton > lo) & (newton < hi), newton, (lo + hi) / 2)
+    return np.clip(v - tau, 0.0, cap)
+
+def solve_batch(mu, cov, risk_aversion, cap=1.0, tol=1e-7, max_iter=3000):
+    """Minimize lambda w'Cw - mu'w over the capped simplex for many lambdas at once
+
+    Accelerated projected gradient (FISTA) on a (lambdas x assets) weight
+    matrix: each iteration is one matrix product for all frontier points and
+    one batched projection. Momentum restarts per row whenever it points
+    uphill. An infinite lambda gives the minimum-variance portfolio. Returns
+    the weights, one row per lambda.
+    """
+    mu = np.asarray(mu, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    risk_aversion = np.asarray(risk_aversion, dtype=float)[:, None]
+    # Scale both terms so the min-variance row (lambda = inf) stays finite
+    finite = np.isfinite(risk_aversion)
+    quad = np.where(finite, risk_aversion, 1.0)
+    lin = np.where(finite, 1.0, 0.0)
+    step = 1 / (2 * quad * max(np.linalg.eigvalsh(cov)[-1], 1e-12))
+
+    n = len(mu)
+    w = project_capped_simplex(np.full((len(risk_aversion), n), 1.0 / n), cap)
+    y, t = w, np.ones((len(w), 1))
+    for _ in range(max_iter):
+        gradient = 2 * quad * (y @ cov) - lin * mu
+        w_next = project_capped_simplex(y - step * gradient, cap)
+        change = w_next - w
+        restart = (np.sum(gradient * change, axis=1, keepdims=True) > 0)
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + np.where(restart, 0.0, (t - 1) / t_next) * change
+        w, t = w_next, t_next
+        if np.abs(change).max() < tol:
+            break
+    return w
+
+def portfolio_stats(weights, mu, cov, risk_free=0.0):
+    """Expected return, volatility and Sharpe ratio for each row of weights"""
+    weights = np.atleast_2d(weights)
+    expected = weights @ np.asarray(mu)
+    volatility = np.sqrt(np.einsum('ij,jk,ik->i', weights, np.asarray(cov), weights))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, (expected - risk_free) / volatility, np.nan)
+    return expected, volatility, sharpe
+
+def efficient_frontier(mu, cov, cap=1.0, points=40, risk_free=0.0):
+    """Long-only, capped efficient frontier plus its max-Sharpe and min-variance portfolios
+
+    Frontier points come from one batched solve over a log-spaced grid of
+    risk aversions (and the minimum-variance limit). The max-Sharpe portfolio
+    is the best frontier point, refined by a second batch on a finer grid
+    around it. `mu` and `cov` are annualized, indexed by symbol.
+    """
+    symbols = pd.Index(mu.index)
+    mu_values, cov_values = mu.to_numpy(dtype=float), cov.loc[symbols, symbols].to_numpy(dtype=float)
+    # Risk aversions around the point where return spread and average variance balance
+    scale = max(np.ptp(mu_values), 1e-6) / (2 * max(np.trace(cov_values) / len(symbols), 1e-12))
+    grid = np.append(np.logspace(np.log10(scale) - 2.5, np.log10(scale) + 2.5, points - 1), np.inf)
+    weights = solve_batch(mu_values, cov_values, grid, cap)
+    expected, volatility, sharpe = portfolio_stats(weights, mu_values, cov_values, risk_free)
+
+    best = int(np.nanargmax(sharpe))
+    lo, hi = grid[max(best - 1, 0)], grid[min(best + 1, points - 2)]
+    fine = np.logspace(np.log10(lo), np.log10(hi), 21)
+    refined = solve_batch(mu_values, cov_values, fine, cap)
+    refined_sharpe = portfolio_stats(refined, mu_values, cov_values, risk_free)[2]
+    max_sharpe = refined[int(np.nanargmax(refined_sharpe))]
+    if np.nanmax(refined_sharpe) < sharpe[best]:
+        max_sharpe = weights[best]
+
+    frontier = pd.DataFrame({'return': expected, 'volatility': volatility, 'sharpe': sharpe})
+    # Low risk aversions all land on the same max-return corner
+    distinct = ~frontier[['return', 'volatility']].round(8).duplicated().to_numpy()
+    frontier = frontier[distinct].sort_values('volatility').reset_index(drop=True)
+    return {
+        'frontier': frontier,
+        'max_sharpe': pd.Series(max_sharpe, index=symbols),
+        'min_variance': pd.Series(weights[-1], index=symbols),
+        'weights': pd.DataFrame(weights, columns=symbols)
+    }
+
+def estimate_inputs(closes, window=TRADING_DAYS, shrinkage=None):
+    """Annualized mean returns and shrunk covariance from a closes frame"""
+    returns = returns_matrix(closes, window)
+    cov, _ = covariance(returns, shrinkage)
+    return returns.mean() * TRADING_DAYS, cov * TRADING_DAYS
+
+def rebalance_trades(current_values, target_weights, prices, cash=0.0):
+    """Trades that move current holdings (market value per symbol) to target weights
+
+    The book being rebalanced is the current market value plus `cash`.
+    Returns one row per symbol with current and target weight and value, the
+    trade value and quantity, and the side.
+    """
+    symbols = pd.Index(current_values.index).union(target_weights.index)
+    current = current_values.reindex(symbols).fillna(0.0).astype(float)
+    target = target_weights.reindex(symbols).fillna(0.0).astype(float)
+    total = current.sum() + cash
+    trade = target * total - current
+    price = pd.Series(prices, dtype=float).reindex(symbols)
+    trades = pd.DataFrame({
+        'current_weight': current / total if total else 0.0,
+        'target_weight': target,
+        'current_value': current,
+        'target_value': target * total,
+        'trade_value': trade,
+        'trade_quantity': trade / price,
+        'side': np.where(trade > 0, 'Buy', np.where(trade < 0, 'Sell', 'Hold'))
+    })
+    trades.index.name = 'symbol'
+    return trades
+
+@st.cache_data(max_entries=32)
+def cached_frontier(snapshot, window, cap, risk_free, _closes, points=40):
+    """efficient_frontier() from closes, cached per (universe snapshot, window, cap, risk-free rate)
+
+    `snapshot` identifies the universe and its price data (e.g. symbols and
+    the last close date); the closes frame itself is not hashed. The result
+    also carries the 'mu' and 'cov' it was optimized on.
+    """
+    mu, cov = estimate_inputs(_closes, window)
+    return {**efficient_frontier(mu, cov, cap, points, risk_free), 'mu': mu, 'cov': cov}
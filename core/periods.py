@@ -0,0 +1,17 @@
+import pandas as pd
+
+# yfinance-style period strings
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1), '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1), '3mo': pd.DateOffset(months=3), '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1), '2y': pd.DateOffset(years=2), '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10), 'max': pd.DateOffset(years=25)
+}
+
+def period_start(period, end):
+    """First timestamp covered by a yfinance-style period ending at `end`"""
+    if period == 'ytd':
+        return pd.Timestamp(year=end.year, month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return end - PERIOD_OFFSETS[period]
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+SERIES_COLUMNS = ['holdings_value', 'cash', 'value', 'contributions', 'flow', 'twr', 'drawdown']
+
+class PortfolioSeries:
+    """Daily portfolio value rebuilt from a transaction log and a dates x symbols close matrix
+
+    Quantities held are a cumulative sum of per-day trade deltas, marked at
+    the close (or that day's trade price where there is none), carried
+    forward over missing days. Cash starts at `initial_cash` and moves with every trade; a buy
+    the cash can't cover is funded by a contribution, so contributions are the
+    running maximum of the cash shortfall. The time-weighted return chains
+    daily returns with each contribution counted at the start of its day,
+    and drawdown is measured on it.
+
+    Adding a day of prices extends every series by one row (or re-marks the
+    last one); adding a transaction dated on or after the first day updates the affected symbol's quantities from its date on and
+    re-derives only that suffix.
+    """
+
+    def __init__(self, transactions, prices, initial_cash=0.0, benchmark=None):
+        prices = prices.sort_index()
+        self.initial_cash = float(initial_cash)
+        self.dates = pd.DatetimeIndex(prices.index).normalize()
+        self.symbols = pd.Index(prices.columns)
+        self._tx = _to_frame(transactions)
+        self._prices = prices.to_numpy(dtype=float, copy=True)
+        self._benchmark = (np.full(len(self.dates), np.nan) if benchmark is None
+                           else benchmark.reindex(prices.index, method='ffill').to_numpy(dtype=float))
+        self._add_symbols(self._tx['symbol'].unique())
+
+        dq, dc, trade_price = self._deltas(self._tx, self.dates)
+        self._quantity = np.cumsum(dq, axis=0)
+        self._trade_cash = np.cumsum(dc)
+        self._trade_price = trade_price
+        self._mark = np.full_like(self._prices, np.nan)
+        self._derived = {column: np.zeros(len(self.dates)) for column in SERIES_COLUMNS}
+        self._derive(0)
+
+    def frame(self, benchmark_name='benchmark'):
+        """Daily series indexed by date; twr, drawdown and the benchmark columns are in percent"""
+        frame = pd.DataFrame(self._derived, index=self.dates)[SERIES_COLUMNS]
+        benchmark = self._benchmark
+        first = np.flatnonzero(np.isfinite(benchmark))
+        if len(first):
+            growth = benchmark / benchmark[first[0]]
+            frame[benchmark_name] = (growth - 1) * 100
+            frame[f'{benchmark_name}_drawdown'] = (growth / np.fmax.accumulate(growth) - 1) * 100
+        return frame
+
+    def positions(self):
+        """Quantity held per symbol at the end of each day"""
+        return pd.DataFrame(self._quantity, index=self.dates, columns=self.symbols)
+
+    def add_prices(self, date, prices, benchmark=None):
+        """Append one day of closes ({symbol: close}), applying transactions dated since the last day
+
+        Closes for the last day already in the series replace its marks
+        instead, so a day priced while still trading is re-marked at its close.
+        """
+        date = pd.Timestamp(date).normalize()
+        if len(self.dates) and date == self.dates[-1]:
+            self._add_symbols(pd.Index(prices))
+            column = self.symbols.get_indexer(pd.Index(prices))
+            self._prices[-1, column] = np.fromiter(prices.values(), dtype=float, count=len(prices))
+            if benchmark is not None:
+                self._benchmark[-1] = benchmark
+            self._derive(len(self.dates) - 1)
+            return
+        if len(self.dates) and date < self.dates[-1]:
+            raise ValueError(f"Prices for {date:%Y-%m-%d} are before the last day in the series")
+        pending = self._tx[(self._tx['date'] > (self.dates[-1] if len(self.dates) else pd.Timestamp.min))
+                           & (self._tx['date'] <= date)]
+        self._add_symbols(pd.Index(prices).union(pending['symbol'].unique()))
+
+        row = pd.Series(prices, dtype=float).reindex(self.symbols).to_numpy()
+        dq, dc, trade_price = self._deltas(pending, pd.DatetimeIndex([date]))
+        start = len(self.dates)
+        self.dates = self.dates.append(pd.DatetimeIndex([date]))
+        self._prices = np.vstack([self._prices, row])
+        self._benchmark = np.append(self._benchmark, np.nan if benchmark is None else benchmark)
+        previous = self._quantity[-1] if start else np.zeros(len(self.symbols))
+        self._quantity = np.vstack([self._quantity, previous + dq[0]])
+        self._trade_cash = np.append(self._trade_cash, (self._trade_cash[-1] if start else 0.0) + dc[0])
+        self._trade_price = np.vstack([self._trade_price, trade_price])
+        self._mark = np.vstack([self._mark, np.full(len(self.symbols), np.nan)])
+        for column in SERIES_COLUMNS:
+            self._derived[column] = np.append(self._derived[column], 0.0)
+        self._derive(start)
+
+    def add_transaction(self, transaction, prices=None):
+        """Apply one transaction; `prices` may supply the close history of a symbol not yet in the matrix"""
+        tx = _to_frame([transaction])
+        self._tx = pd.concat([self._tx, tx], ignore_index=True)
+        symbol = tx.at[0, 'symbol']
+        row = int(np.searchsorted(self.dates.values, tx['date'].values[0]))
+        start = row
+        if symbol not in self.symbols:
+            self._add_symbols([symbol])
+            if prices is not None:
+                self._prices[:, -1] = prices.reindex(self.dates, method='ffill').to_numpy(dtype=float)
+                start = 0  # the new column's marks start from its own history
+        if row < len(self.dates):
+            dq, dc, trade_price = self._deltas(tx, self.dates[row:row + 1])
+            column = self.symbols.get_loc(symbol)
+            self._quantity[row:, column] += dq[0, column]
+            self._trade_cash[row:] += dc[0]
+            self._trade_price[row, column] = trade_price[0, column]
+        # Transactions dated after the last day are applied when that day's prices arrive
+        self._derive(start)
+
+    def _add_symbols(self, symbols):
+        new = pd.Index(symbols).difference(self.symbols)
+        if new.empty:
+            return
+        self.symbols = self.symbols.append(new)
+        padding = np.full((len(self.dates), len(new)), np.nan)
+        self._prices = np.hstack([self._prices, padding])
+        if hasattr(self, '_quantity'):
+            self._quantity = np.hstack([self._quantity, np.zeros_like(padding)])
+            self._trade_price = np.hstack([self._trade_price, padding])
+            self._mark = np.hstack([self._mark, padding])
+
+    def _deltas(self, tx, dates):
+        """Per-day quantity deltas, trade cash and last trade price for transactions mapped onto `dates`
+
+        A transaction on a non-trading day lands on the next trading day.
+        """
+        shape = (len(dates), len(self.symbols))
+        row = np.searchsorted(dates.values, tx['date'].values)
+        keep = row < len(dates)
+        row, tx = row[keep], tx[keep]
+        column = self.symbols.get_indexer(tx['symbol'])
+        sign = np.where(tx['type'].to_numpy() == 'Buy', 1.0, -1.0)
+        quantity = tx['quantity'].to_numpy()
+        cell = row * shape[1] + column
+
+        dq = np.bincount(cell, weights=sign * quantity, minlength=shape[0] * shape[1]).reshape(shape)
+        dc = np.bincount(row, weights=-sign * quantity * tx['price'].to_numpy(), minlength=shape[0])
+        trade_price = np.full(shape, np.nan)
+        trade_price.flat[cell] = tx['price'].to_numpy()  # sorted input, so the day's last trade wins
+        return dq, dc, trade_price
+
+    def _derive(self, start):
+        """Recompute value, cash, flows, TWR and drawdown from row `start` on"""
+        if start >= len(self.dates):
+            return
+        d = self._derived
+        # Mark at the close, or at that day's trade price where there is no close, carried forward
+        raw = np.where(np.isnan(self._prices[start:]), self._trade_price[start:], self._prices[start:])
+        if start:
+            raw = np.vstack([self._mark[start - 1], raw])
+        mark = pd.DataFrame(raw).ffill().to_numpy()[1 if start else 0:]
+        self._mark[start:] = mark
+        quantity = self._quantity[start:]
+        d['holdings_value'][start:] = np.where(quantity != 0, quantity * mark, 0.0).sum(axis=1)
+
+        base = self.initial_cash + self._trade_cash[start:]
+        prior = d['contributions'][start - 1] if start else 0.0
+        contributions = np.maximum.accumulate(np.maximum(np.maximum(-base, 0.0), prior))
+        d['contributions'][start:] = contributions
+        d['flow'][start:] = np.diff(contributions, prepend=prior)
+        d['cash'][start:] = base + contributions
+        d['value'][start:] = d['holdings_value'][start:] + d['cash'][start:]
+
+        previous = np.concatenate(([d['value'][start - 1] if start else self.initial_cash], d['value'][start:-1]))
+        # Contributions arrive at the start of the day they fund
+        invested = previous + d['flow'][start:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily = np.where(invested > 0, d['value'][start:] / invested, 1.0)
+        last = 1 + d['twr'][start - 1] / 100 if start else 1.0
+        last_peak = last / (1 + d['drawdown'][start - 1] / 100) if start else 1.0
+        growth = last * np.cumprod(daily)
+        peak = np.maximum.accumulate(np.maximum(growth, last_peak))
+        d['twr'][start:] = (growth - 1) * 100
+        d['drawdown'][start:] = (growth / peak - 1) * 100
+
+def _to_frame(transactions):
+    df = pd.DataFrame(list(transactions), columns=['id', 'date', 'type', 'symbol', 'quantity', 'price'])
+    df = df.assign(date=pd.to_datetime(df['date']).dt.normalize(),
+                   quantity=df['quantity'].astype(float), price=df['price'].astype(float))
+    return df.sort_values(['date', 'id'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,84 @@
+import os
+import threading
+
+import pandas as pd
+
+from core.http_client import get_http_client
+from core.providers.base import OHLCV_COLUMNS, MarketDataProvider, ProviderError
+
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+INTRADAY_INTERVALS = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min', '60m': '60min', '1h': '60min'}
+
+class AlphaVantageProvider(MarketDataProvider):
+    """Alpha Vantage REST API; key from ALPHAVANTAGE_API_KEY unless passed in"""
+
+    name = 'alphavantage'
+
+    def __init__(self, api_key=None, base_url=ALPHA_VANTAGE_URL, http_client=None):
+        self.api_key = api_key or os.getenv('ALPHAVANTAGE_API_KEY')
+        self.base_url = base_url
+        self.http = http_client or get_http_client()
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        if interval == '1d':
+            # compact = last 100 bars; only pull the full 20-year series when it's needed
+            compact = pd.Timestamp(start) > pd.Timestamp.now() - pd.Timedelta(days=140)
+            data = self._query(function='TIME_SERIES_DAILY', symbol=symbol,
+                               outputsize='compact' if compact else 'full')
+            series_key = 'Time Series (Daily)'
+        elif interval in INTRADAY_INTERVALS:
+            data = self._query(function='TIME_SERIES_INTRADAY', symbol=symbol,
+                               interval=INTRADAY_INTERVALS[interval], outputsize='full')
+            series_key = f"Time Series ({INTRADAY_INTERVALS[interval]})"
+        else:
+            raise ValueError(f"Unsupported interval for Alpha Vantage: {interval}")
+
+        if series_key not in data:
+            raise ProviderError(f"Alpha Vantage returned no history for {symbol}")
+        hist = pd.DataFrame.from_dict(data[series_key], orient='index').astype(float)
+        hist.columns = OHLCV_COLUMNS  # "1. open" ... "5. volume"
+        hist.index = pd.to_datetime(hist.index)
+        return hist.sort_index().loc[start:end]
+
+    def get_quotes(self, symbols):
+        # The free tier has no batch quote endpoint; the scheduler paces these calls
+        quotes = {}
+        for symbol in dict.fromkeys(symbols):
+            quote = self._query(function='GLOBAL_QUOTE', symbol=symbol).get('Global Quote')
+            if not quote:
+                continue
+            quotes[symbol] = {
+                'symbol': symbol,
+                'current_price': float(quote['05. price']),
+                'currency': 'USD',
+                'change_1d': float(quote['10. change percent'].rstrip('%')),
+                'volume': float(quote['06. volume'])
+            }
+        return quotes
+
+    def get_profile(self, symbol):
+        # OVERVIEW costs a request from the same small quota; names don't change, so keep them for the process
+        with self._lock:
+            if symbol in self._profiles:
+                return self._profiles[symbol]
+        try:
+            overview = self._query(function='OVERVIEW', symbol=symbol)
+        except Exception:
+            return {'name': symbol}  # not kept, so the name is retried once the quota allows
+        profile = {'name': overview.get('Name', symbol), 'currency': overview.get('Currency', 'USD')}
+        with self._lock:
+            self._profiles[symbol] = profile
+        return profile
+
+    def _query(self, **params):
+        if not self.api_key:
+            raise ProviderError("ALPHAVANTAGE_API_KEY is not set")
+        data = self.http.get_json(self.base_url, params={**params, 'apikey': self.api_key})
+        # Quota and key problems come back as 200 responses with a message
+        for key in ('Error Message', 'Note', 'Information'):
+            if key in data:
+                raise ProviderError(f"Alpha Vantage: {data[key]}")
+        return data
@@ -0,0 +1,57 @@
+import importlib
+import threading
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# name -> "module:Class", imported on first use so optional backends cost nothing until selected
+PROVIDER_CLASSES = {
+    'synthetic': 'core.providers.synthetic:SyntheticProvider',
+    'yfinance': 'core.providers.yahoo:YFinanceProvider',
+    'coingecko': 'core.providers.coingecko:CoinGeckoProvider',
+    'alphavantage': 'core.providers.alpha_vantage:AlphaVantageProvider',
+    'replay': 'core.providers.replay:ReplayProvider',
+}
+
+class ProviderError(Exception):
+    """Upstream returned no usable data"""
+
+class MarketDataProvider:
+    """Interface every market-data backend implements
+
+    get_history returns an OHLCV DataFrame (OHLCV_COLUMNS; backends without
+    intraday ranges may return only Close) on a tz-naive DatetimeIndex.
+    get_quotes returns {symbol: quote dict} with at least 'symbol',
+    'current_price' and 'currency'; symbols the backend can't price are omitted.
+    """
+
+    name = 'base'
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        """Bars for symbol with start <= timestamp <= end"""
+        raise NotImplementedError
+
+    def get_quotes(self, symbols):
+        """Latest quotes for many symbols, batched where the backend allows"""
+        raise NotImplementedError
+
+    def get_profile(self, symbol):
+        """Descriptive data; at least {'name': ...}"""
+        return {'name': symbol}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+def create_provider(name, **kwargs):
+    """Instantiate a registered provider by name"""
+    if name not in PROVIDER_CLASSES:
+        raise ValueError(f"Unknown market data provider: {name}")
+    module_name, class_name = PROVIDER_CLASSES[name].split(':')
+    provider_class = getattr(importlib.import_module(module_name), class_name)
+    return provider_class(**kwargs)
+
+def get_provider(name):
+    """Shared default-configured instance, so per-provider caches outlive a Streamlit rerun"""
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = create_provider(name)
+        return _instances[name]
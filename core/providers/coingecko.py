@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from core.http_client import get_http_client
+from core.providers.base import MarketDataProvider
+
+# CoinGecko's /simple/price accepts a comma-separated id list; keep URLs a sane length
+COINGECKO_BATCH_SIZE = 250
+
+class CoinGeckoProvider(MarketDataProvider):
+    """CoinGecko public API; symbols are CoinGecko coin ids such as 'bitcoin'"""
+
+    name = 'coingecko'
+
+    def __init__(self, base_url="https://api.coingecko.com/api/v3", http_client=None, headers=None):
+        self.base_url = base_url
+        self.http = http_client or get_http_client()
+        self.headers = headers or {}
+
+    def get_quotes(self, symbols):
+        """One /simple/price call per batch of ids"""
+        ids = sorted({symbol.lower() for symbol in symbols})
+        price_url = f"{self.base_url}/simple/price"
+        quotes = {}
+        for i in range(0, len(ids), COINGECKO_BATCH_SIZE):
+            batch = ids[i:i + COINGECKO_BATCH_SIZE]
+            price_params = {
+                'ids': ','.join(batch),
+                'vs_currencies': 'usd',
+                'include_24hr_change': 'true',
+                'include_market_cap': 'true',
+                'include_24hr_vol': 'true'
+            }
+            price_data = self.http.get_json(price_url, params=price_params, headers=self.headers)
+            
+            for crypto_id in batch:
+                if crypto_id not in price_data or 'usd' not in price_data[crypto_id]:
+                    continue
+                quote = price_data[crypto_id]
+                quotes[crypto_id] = {
+                    'symbol': crypto_id.upper(),
+                    'current_price': quote['usd'],
+                    'currency': 'USD',
+                    '24h_change': quote.get('usd_24h_change', 0),
+                    'market_cap': quote.get('usd_market_cap', 0),
+                    'volume_24h': quote.get('usd_24h_vol', 0)
+                }
+        return quotes
+
+    def get_market_chart(self, crypto_id, days=30):
+        """Price history for the last `days` days from /market_chart"""
+        history_url = f"{self.base_url}/coins/{crypto_id}/market_chart"
+        history_params = {'vs_currency': 'usd', 'days': days}
+        
+        history_data = self.http.get_json(history_url, params=history_params, headers=self.headers)
+        return parse_market_chart(history_data)
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        # /market_chart always ends now and picks its own granularity from `days`
+        days = max(1, math.ceil((pd.Timestamp.now() - pd.Timestamp(start)) / pd.Timedelta(days=1)))
+        return self.get_market_chart(symbol.lower(), days).loc[start:end]
+
+    def get_profile(self, symbol):
+        return {'name': symbol.replace('-', ' ').title()}
+
+def parse_market_chart(payload):
+    """Columnar parse of a /market_chart payload into Close, Market Cap and Volume
+
+    Each [ms, value] series becomes one (n, 2) float array and the epoch
+    milliseconds become a DatetimeIndex (UTC, tz-naive) in a single vectorized
+    conversion. Caps and volumes share the price timestamps in practice; when
+    they don't they are aligned onto them.
+    """
+    prices = _series_array(payload.get('prices'))
+    index = pd.to_datetime(prices[:, 0].astype(np.int64), unit='ms')
+    columns = {'Close': prices[:, 1]}
+
+    for key, column in (('market_caps', 'Market Cap'), ('total_volumes', 'Volume')):
+        series = _series_array(payload.get(key))
+        if len(series) == len(prices) and np.array_equal(series[:, 0], prices[:, 0]):
+            columns[column] = series[:, 1]
+        else:
+            columns[column] = pd.Series(
+                series[:, 1], index=pd.to_datetime(series[:, 0].astype(np.int64), unit='ms')
+            ).groupby(level=0).last().reindex(index).to_numpy()
+
+    return pd.DataFrame(columns, index=index).rename_axis('Date')
+
+def _series_array(series):
+    if not series:
+        return np.empty((0, 2))
+    return np.asarray(series, dtype=np.float64).reshape(-1, 2)
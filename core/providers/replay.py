@@ -0,0 +1,119 @@
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+from core.providers.base import MarketDataProvider, ProviderError
+
+DEFAULT_ROOT = os.path.join('data', 'replay')
+
+class RecordingProvider(MarketDataProvider):
+    """Pass-through wrapper that captures every response under root/<provider>/"""
+
+    def __init__(self, inner, root=DEFAULT_ROOT):
+        self.inner = inner
+        self.name = inner.name
+        self.root = os.path.join(root, inner.name)
+        self._lock = threading.Lock()
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        hist = self.inner.get_history(symbol, start, end, interval)
+        path = _history_path(self.root, symbol, interval)
+        with self._lock:
+            if os.path.exists(path):
+                hist_all = pd.concat([pd.read_pickle(path), hist])
+                hist_all = hist_all[~hist_all.index.duplicated(keep='last')].sort_index()
+            else:
+                hist_all = hist
+            _atomic_write(path, lambda tmp: hist_all.to_pickle(tmp))
+        return hist
+
+    def get_quotes(self, symbols):
+        quotes = self.inner.get_quotes(symbols)
+        for symbol, quote in quotes.items():
+            _atomic_write(_json_path(self.root, 'quotes', symbol), lambda tmp: _dump_json(tmp, quote))
+        return quotes
+
+    def get_profile(self, symbol):
+        profile = self.inner.get_profile(symbol)
+        _atomic_write(_json_path(self.root, 'profiles', symbol), lambda tmp: _dump_json(tmp, profile))
+        return profile
+
+class ReplayProvider(MarketDataProvider):
+    """Serve responses captured by RecordingProvider without touching the network
+
+    shift_to_now moves each recorded series forward by whole weeks so its last
+    bar lands in the current week (weekdays stay weekdays), which lets the live
+    app run on old captures. latency adds a fixed delay per call so benchmarks
+    can model upstream cost.
+    """
+
+    name = 'replay'
+
+    def __init__(self, root=DEFAULT_ROOT, source='synthetic', shift_to_now=False, latency=0.0):
+        self.root = os.path.join(root, source)
+        self.shift_to_now = shift_to_now
+        self.latency = latency
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        self._simulate_latency()
+        hist = self._load_history(symbol, interval)
+        return hist.loc[start:end]
+
+    def get_quotes(self, symbols):
+        self._simulate_latency()
+        quotes = {}
+        for symbol in dict.fromkeys(symbols):
+            path = _json_path(self.root, 'quotes', symbol)
+            if os.path.exists(path):
+                with open(path) as f:
+                    quotes[symbol] = json.load(f)
+        return quotes
+
+    def get_profile(self, symbol):
+        path = _json_path(self.root, 'profiles', symbol)
+        if not os.path.exists(path):
+            return super().get_profile(symbol)
+        with open(path) as f:
+            return json.load(f)
+
+    def _load_history(self, symbol, interval):
+        path = _history_path(self.root, symbol, interval)
+        with self._lock:
+            if path not in self._frames:
+                if not os.path.exists(path):
+                    raise ProviderError(f"No recorded {interval} history for {symbol} in {self.root}")
+                hist = pd.read_pickle(path)
+                if self.shift_to_now and not hist.empty:
+                    weeks = (pd.Timestamp.now().normalize() - hist.index[-1].normalize()).days // 7
+                    hist = hist.set_axis(hist.index + pd.Timedelta(weeks=weeks))
+                self._frames[path] = hist
+            return self._frames[path]
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+def _safe(name):
+    return re.sub(r'[^A-Za-z0-9._-]', '_', name)
+
+def _history_path(root, symbol, interval):
+    return os.path.join(root, 'history', interval, f"{_safe(symbol)}.pkl")
+
+def _json_path(root, kind, symbol):
+    return os.path.join(root, kind, f"{_safe(symbol)}.json")
+
+def _dump_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, default=str)
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from core.providers.base import MarketDataProvider
+from core.synthetic import SyntheticMarketData
+
+# Mock realistic data for demo
+MOCK_PRICES = {
+    'AAPL': 220.50, 'GOOGL': 175.25, 'MSFT': 415.80, 'TSLA': 185.30,
+    'AMZN': 180.75, 'META': 520.40, 'NFLX': 485.90, 'NVDA': 920.15,
+    'BRK-B': 425.30, 'JPM': 210.45, 'JNJ': 155.80, 'V': 280.90
+}
+
+COMPANY_NAMES = {
+    'AAPL': 'Apple Inc.', 'GOOGL': 'Alphabet Inc.', 'MSFT': 'Microsoft Corporation',
+    'TSLA': 'Tesla Inc.', 'AMZN': 'Amazon.com Inc.', 'META': 'Meta Platforms Inc.',
+    'NFLX': 'Netflix Inc.', 'NVDA': 'NVIDIA Corporation', 'BRK-B': 'Berkshire Hathaway',
+    'JPM': 'JPMorgan Chase & Co.', 'JNJ': 'Johnson & Johnson', 'V': 'Visa Inc.'
+}
+
+class SyntheticProvider(MarketDataProvider):
+    """Deterministic generated stock data for demos, load tests and offline work"""
+
+    name = 'synthetic'
+
+    def __init__(self, base_prices=None):
+        self.engine = SyntheticMarketData(base_prices=base_prices or MOCK_PRICES)
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        return self.engine.generate_history(symbol, start=start, end=end, interval=interval)
+
+    def get_quotes(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        end = pd.Timestamp.now().normalize()
+        close = self.engine.generate_panel(symbols, start=end - pd.Timedelta(days=7), end=end)['Close']
+        last = close.iloc[-1]
+        change_1d = (close.iloc[-1] / close.iloc[-2] - 1) * 100
+        return {
+            symbol: {
+                'symbol': symbol,
+                'current_price': float(last[symbol]),
+                'currency': 'USD',
+                'change_1d': float(change_1d[symbol])
+            }
+            for symbol in symbols
+        }
+
+    def get_profile(self, symbol):
+        return {'name': COMPANY_NAMES.get(symbol, f"{symbol} Corporation")}
@@ -0,0 +1,74 @@
+import threading
+
+import pandas as pd
+import yfinance as yf
+
+from core.providers.base import OHLCV_COLUMNS, MarketDataProvider, ProviderError
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance (no API key)"""
+
+    name = 'yfinance'
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def get_history(self, symbol, start, end, interval='1d'):
+        # yfinance treats `end` as exclusive
+        hist = yf.Ticker(symbol).history(start=start, end=pd.Timestamp(end) + pd.Timedelta(days=1),
+                                         interval=interval, auto_adjust=True)
+        if hist.empty:
+            raise ProviderError(f"yfinance returned no history for {symbol}")
+        hist.index = _naive(hist.index)
+        return hist[OHLCV_COLUMNS].loc[start:end]
+
+    def get_quotes(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        # One download call covers every ticker
+        data = yf.download(symbols, period='5d', interval='1d', group_by='column',
+                           auto_adjust=True, progress=False, threads=True)
+        if data.empty:
+            return {}
+        close = data['Close']
+        volume = data['Volume']
+        if isinstance(close, pd.Series):
+            close = close.to_frame(symbols[0])
+            volume = volume.to_frame(symbols[0])
+
+        quotes = {}
+        for symbol in symbols:
+            if symbol not in close:
+                continue
+            prices = close[symbol].dropna()
+            if prices.empty:
+                continue
+            change_1d = (prices.iloc[-1] / prices.iloc[-2] - 1) * 100 if len(prices) > 1 else 0.0
+            quotes[symbol] = {
+                'symbol': symbol,
+                'current_price': float(prices.iloc[-1]),
+                'currency': 'USD',
+                'change_1d': float(change_1d),
+                'volume': float(volume[symbol].dropna().iloc[-1]) if volume[symbol].notna().any() else 0.0
+            }
+        return quotes
+
+    def get_profile(self, symbol):
+        # Ticker.info is a slow scrape; names don't change, so keep them for the process
+        with self._lock:
+            if symbol in self._profiles:
+                return self._profiles[symbol]
+        try:
+            info = yf.Ticker(symbol).info
+            profile = {'name': info.get('longName') or info.get('shortName') or symbol,
+                       'currency': info.get('currency', 'USD')}
+        except Exception:
+            profile = {'name': symbol}
+        with self._lock:
+            self._profiles[symbol] = profile
+        return profile
+
+def _naive(index):
+    return index.tz_localize(None) if index.tz is not None else index
@@ -0,0 +1,137 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+TRADING_DAYS = 252
+
+def returns_matrix(closes, window=None, min_periods=20):
+    """Daily simple returns (dates x symbols) over the last `window` days
+
+    Symbols with fewer than `min_periods` returns in the window are dropped;
+    remaining gaps (holidays on one exchange, late listings) count as flat days.
+    """
+    returns = closes.sort_index().ffill().pct_change(fill_method=None).iloc[1:]
+    if window is not None:
+        returns = returns.iloc[-window:]
+    returns = returns.loc[:, returns.count() >= min(min_periods, len(returns))]
+    return returns.fillna(0.0)
+
+def covariance(returns, shrinkage=None):
+    """Covariance matrix, shrunk towards a scaled identity
+
+    With `shrinkage` None the Ledoit-Wolf intensity is estimated from the data:
+    it is close to zero when there are many more days than assets and grows as
+    the sample covariance gets noisy, which keeps a 500-asset matrix well
+    conditioned on a year of history. Returns (covariance, intensity).
+    """
+    x = np.asarray(returns, dtype=float)
+    t, n = x.shape
+    x = x - x.mean(axis=0)
+    sample = x.T @ x / t
+    target = np.trace(sample) / n
+    if shrinkage is None:
+        distance = np.sum(sample ** 2) - 2 * target * np.trace(sample) + n * target ** 2  # ||S - mu I||^2
+        noise = (np.sum(np.sum(x ** 2, axis=1) ** 2) / t - np.sum(sample ** 2)) / t
+        shrinkage = float(np.clip(noise / distance, 0.0, 1.0)) if distance > 0 else 1.0
+    shrunk = (1 - shrinkage) * sample
+    shrunk[np.diag_indices(n)] += shrinkage * target
+    if isinstance(returns, pd.DataFrame):
+        shrunk = pd.DataFrame(shrunk, index=returns.columns, columns=returns.columns)
+    return shrunk, shrinkage
+
+def beta(returns, benchmark_returns):
+    """Beta of every column against the benchmark over their common dates"""
+    returns, benchmark = returns.align(benchmark_returns, join='inner', axis=0)
+    b = benchmark.to_numpy() - benchmark.mean()
+    x = returns.to_numpy() - returns.mean().to_numpy()
+    variance = b @ b
+    return pd.Series(b @ x / variance if variance else np.nan, index=returns.columns, name='beta')
+
+def var_cvar(returns, confidence=0.95, method='historical'):
+    """One-day Value at Risk and Conditional VaR as positive loss fractions
+
+    `returns` is a Series (one pair of floats) or a dates x symbols frame (one
+    pair per column, computed in a single pass). 'parametric' assumes normal
+    returns: VaR = -(mu + sigma z) and CVaR = -mu + sigma phi(z) / (1 - c).
+    """
+    x = np.asarray(returns, dtype=float)
+    tail = 1 - confidence
+    if method == 'parametric':
+        normal = NormalDist()
+        z = normal.inv_cdf(tail)
+        mu, sigma = x.mean(axis=0), x.std(axis=0, ddof=1)
+        var = -(mu + sigma * z)
+        cvar = -mu + sigma * normal.pdf(z) / tail
+    elif method == 'historical':
+        cutoff = np.quantile(x, tail, axis=0)
+        var = -cutoff
+        # Mean of the returns at or below the cutoff, column by column
+        in_tail = x <= cutoff
+        cvar = -(np.where(in_tail, x, 0.0).sum(axis=0) / np.maximum(in_tail.sum(axis=0), 1))
+    else:
+        raise ValueError(f"Unknown VaR method: {method}")
+    if isinstance(returns, pd.DataFrame):
+        return pd.Series(var, index=returns.columns), pd.Series(cvar, index=returns.columns)
+    return float(var), float(cvar)
+
+def max_drawdown(returns):
+    """Largest peak-to-trough fall of compounded returns, as a negative fraction (per column for a frame)"""
+    growth = np.cumprod(1 + np.asarray(returns, dtype=float), axis=0)
+    peak = np.maximum.accumulate(np.maximum(growth, 1.0), axis=0)
+    drawdown = (growth / peak - 1).min(axis=0)
+    if isinstance(returns, pd.DataFrame):
+        return pd.Series(drawdown, index=returns.columns)
+    return float(drawdown)
+
+def risk_report(closes, weights, benchmark=None, window=TRADING_DAYS, confidence=0.95, shrinkage=None):
+    """Portfolio and per-asset risk for a weights vector over the last `window` days
+
+    Returns a dict with portfolio volatility, beta, historical and parametric
+    VaR/CVaR and max drawdown, plus an 'assets' frame with per-asset weight,
+    volatility, beta, contribution to risk and historical VaR.
+    """
+    returns = returns_matrix(closes, window)
+    weights = pd.Series(weights, dtype=float).reindex(returns.columns).fillna(0.0)
+    if weights.sum():
+        weights = weights / weights.sum()
+    cov, intensity = covariance(returns, shrinkage)
+    w = weights.to_numpy()
+    marginal = cov.to_numpy() @ w
+    variance = float(w @ marginal)
+    volatility = np.sqrt(variance)
+    portfolio = pd.Series(returns.to_numpy() @ w, index=returns.index)
+
+    assets = pd.DataFrame({
+        'weight': weights,
+        'volatility': np.sqrt(np.diag(cov.to_numpy()) * TRADING_DAYS),
+        'risk_contribution': w * marginal / variance if variance else np.nan,
+        'var': var_cvar(returns, confidence)[0]
+    })
+    report = {
+        'volatility': volatility * np.sqrt(TRADING_DAYS),
+        'shrinkage': intensity,
+        'observations': len(returns),
+        'max_drawdown': max_drawdown(portfolio),
+        'returns': portfolio,
+        'assets': assets
+    }
+    for method in ('historical', 'parametric'):
+        report[f'{method}_var'], report[f'{method}_cvar'] = var_cvar(portfolio, confidence, method)
+
+    report['beta'] = np.nan
+    if benchmark is not None:
+        benchmark_returns = benchmark.sort_index().ffill().pct_change(fill_method=None).dropna()
+        assets['beta'] = beta(returns, benchmark_returns)
+        report['beta'] = float(beta(portfolio.to_frame('portfolio'), benchmark_returns).iloc[0])
+    return report
+
+@st.cache_data(max_entries=32)
+def cached_risk_report(snapshot, window, confidence, _closes, _weights, _benchmark=None):
+    """risk_report() cached per (holdings snapshot, window, confidence)
+
+    `snapshot` identifies the book and its price data (e.g. holdings and the
+    last close date); the underscored arguments are not hashed.
+    """
+    return risk_report(_closes, _weights, _benchmark, window, confidence)
@@ -0,0 +1,188 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from components.technical.indicators import (
+    calculate_bollinger_bands, calculate_macd, calculate_moving_averages, calculate_rsi
+)
+
+# Operand syntax -> indicator key; the first capture group, when present, is the window
+OPERANDS = [
+    (re.compile(r'(?:CLOSE|PRICE)'), 'CLOSE', None),
+    (re.compile(r'RSI(?:\s*\(\s*(\d+)\s*\))?'), 'RSI', 14),
+    (re.compile(r'S?MA\s*\(?\s*(\d+)\s*\)?'), 'MA', None),
+    (re.compile(r'MACD[\s_]*SIGNAL|SIGNAL'), 'MACD_SIGNAL', None),
+    (re.compile(r'MACD'), 'MACD', None),
+    (re.compile(r'BB[\s_]*UPPER(?:\s*\(\s*(\d+)\s*\))?'), 'BB_UPPER', 20),
+    (re.compile(r'BB[\s_]*LOWER(?:\s*\(\s*(\d+)\s*\))?'), 'BB_LOWER', 20),
+    (re.compile(r'CHANGE\s*\(\s*(\d+)\s*\)|(\d+)\s*D\s+CHANGE'), 'CHANGE', None),
+]
+NUMBER = re.compile(r'([-+]?\d+(?:\.\d+)?)\s*%?')
+COMPARATOR = re.compile(r'\s+CROSSES\s+ABOVE\s+|\s+CROSSES\s+BELOW\s+|\s+CROSSES\s+|<=|>=|<|>')
+COMPARISONS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+class RuleError(ValueError):
+    """Rule text could not be parsed"""
+
+class Rule:
+    """A parsed rule: left operand, comparator, right operand
+
+    Operands are indicator keys such as ('RSI', 14), ('MA', 50), ('CLOSE',)
+    or ('CONST', 30.0). Comparators are <, <=, >, >=, 'crosses above',
+    'crosses below' and 'crosses' (either direction); crossings are judged
+    between the last two bars.
+    """
+
+    def __init__(self, text, left, op, right):
+        self.text = text
+        self.left = left
+        self.op = op
+        self.right = right
+
+    @property
+    def indicators(self):
+        return {key for key in (self.left, self.right) if key[0] != 'CONST'}
+
+    def evaluate(self, last_two):
+        """Boolean per symbol from a {key: (2 x symbols) array} of the last two bars"""
+        left = _operand(self.left, last_two)
+        right = _operand(self.right, last_two)
+        return _judge(self.op, left[-2], right[-2], left[-1], right[-1])
+
+    def evaluate_all(self, closes, cache=None):
+        """Boolean frame (bars x symbols): whether the rule holds at every bar of a closes frame"""
+        cache = {} if cache is None else cache
+        closes = closes.astype(float)
+        left, right = (
+            np.full((len(closes), 1), key[1]) if key[0] == 'CONST'
+            else compute_indicator(key, closes, cache).to_numpy()
+            for key in (self.left, self.right)
+        )
+        holds = _judge(self.op, _previous(left), _previous(right), left, right)
+        return pd.DataFrame(np.broadcast_to(holds, closes.shape), index=closes.index, columns=closes.columns)
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+@lru_cache(maxsize=1024)
+def compile_rule(text):
+    """Parse rule text such as "RSI(14) < 30", "close crosses MA50" or "30d change > 10%" """
+    normalized = ' '.join(text.upper().split())
+    match = COMPARATOR.search(normalized)
+    if match is None:
+        raise RuleError(f"No comparison in rule: {text!r}")
+    op = ' '.join(match.group().split()).lower()
+    left = _parse_operand(normalized[:match.start()].strip(), text)
+    right = _parse_operand(normalized[match.end():].strip(), text)
+    if left[0] == 'CONST' and right[0] == 'CONST':
+        raise RuleError(f"Rule compares two constants: {text!r}")
+    return Rule(text, left, op, right)
+
+def _parse_operand(token, text):
+    match = NUMBER.fullmatch(token)
+    if match:
+        return ('CONST', float(match.group(1)))
+    for pattern, name, default in OPERANDS:
+        match = pattern.fullmatch(token)
+        if match:
+            groups = [group for group in match.groups() if group]
+            window = int(groups[0]) if groups else default
+            if window is not None and window < 1:
+                raise RuleError(f"Window must be positive in rule: {text!r}")
+            return (name,) if window is None else (name, window)
+    raise RuleError(f"Unknown operand {token!r} in rule: {text!r}")
+
+def _judge(op, previous_left, previous_right, left, right):
+    """Apply a comparator to current values, using the previous ones for crossings"""
+    with np.errstate(invalid='ignore'):
+        if op in COMPARISONS:
+            return COMPARISONS[op](left, right)
+        was_above = previous_left > previous_right
+        is_above = left > right
+        was_below = previous_left < previous_right
+        is_below = left < right
+    # An indicator still warming up on the previous bar has not crossed anything
+    known = np.isfinite(previous_left) & np.isfinite(previous_right)
+    up = known & ~was_above & is_above
+    down = known & ~was_below & is_below
+    if op == 'crosses above':
+        return up
+    if op == 'crosses below':
+        return down
+    return up | down
+
+def _previous(values):
+    """Values one bar earlier, NaN on the first bar"""
+    return np.vstack([np.full((1, values.shape[1]), np.nan), values[:-1]])
+
+def _operand(key, last_two):
+    if key[0] == 'CONST':
+        return np.full((2, 1), key[1])
+    return last_two[key]
+
+def compute_indicator(key, closes, cache=None):
+    """Full indicator frame (bars x symbols) for one key over a closes frame
+    
+    Indicators computed together (MACD and its signal line, both Bollinger
+    bands) are stored in `cache` so their sibling key is free.
+    """
+    cache = {} if cache is None else cache
+    if key not in cache:
+        cache.update(_compute(key, closes))
+    return cache[key]
+
+def _compute(key, closes):
+    name = key[0]
+    if name == 'CLOSE':
+        return {key: closes}
+    if name == 'RSI':
+        return {key: calculate_rsi(closes, key[1])}
+    if name == 'MA':
+        return {key: calculate_moving_averages(closes, [key[1]])[f'MA{key[1]}']}
+    if name in ('MACD', 'MACD_SIGNAL'):
+        macd, signal_line, _ = calculate_macd(closes)
+        return {('MACD',): macd, ('MACD_SIGNAL',): signal_line}
+    if name in ('BB_UPPER', 'BB_LOWER'):
+        upper, _, lower = calculate_bollinger_bands(closes, key[1])
+        return {('BB_UPPER', key[1]): upper, ('BB_LOWER', key[1]): lower}
+    if name == 'CHANGE':
+        return {key: (closes / closes.shift(key[1]) - 1) * 100}
+    raise RuleError(f"Unknown indicator: {key}")
+
+class RuleEngine:
+    """Evaluate many rules over many symbols, computing each distinct indicator once
+
+    Every rule is compiled up front; evaluate() computes the union of their
+    indicators on the whole bars x symbols frame and then compares only the
+    last two rows, so cost grows with distinct indicators, not with rules.
+    """
+
+    def __init__(self, rules):
+        self.rules = [compile_rule(text) for text in dict.fromkeys(rules)]
+        self.indicators = set().union(*(rule.indicators for rule in self.rules))
+
+    @property
+    def lookback(self):
+        """Bars of history the slowest indicator needs"""
+        windows = [key[1] for key in self.indicators if len(key) > 1]
+        if any(key[0].startswith('MACD') for key in self.indicators):
+            windows.append(35)
+        return max(windows, default=1) + 1
+
+    def evaluate(self, closes):
+        """DataFrame of booleans, one row per rule text and one column per symbol"""
+        closes = closes.astype(float)
+        last_two = {}
+        computed = {}
+        for key in self.indicators:
+            values = compute_indicator(key, closes, computed).to_numpy()[-2:]
+            if len(values) < 2:
+                values = np.vstack([np.full((2 - len(values), closes.shape[1]), np.nan), values])
+            last_two[key] = values
+        results = [rule.evaluate(last_two) for rule in self.rules]
+        return pd.DataFrame(
+            np.array(results, dtype=bool).reshape(len(self.rules), closes.shape[1]),
+            index=[rule.text for rule in self.rules], columns=closes.columns
+        )
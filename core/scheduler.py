@@ -0,0 +1,148 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+PRIORITY_INTERACTIVE = 0  # page the user is looking at
+PRIORITY_REFRESH = 1      # watchlist / alert refreshes
+PRIORITY_PREFETCH = 2     # background revalidation and warm-up
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: 'interactive', PRIORITY_REFRESH: 'refresh', PRIORITY_PREFETCH: 'prefetch'}
+
+# Free-tier quotas as (requests, period in seconds)
+DEFAULT_QUOTAS = {
+    'coingecko': (30, 60),
+    'newsapi': (100, 86_400),
+    'alphavantage': (5, 60),
+}
+
+PROVIDER_HOSTS = {
+    'api.coingecko.com': 'coingecko',
+    'newsapi.org': 'newsapi',
+    'www.alphavantage.co': 'alphavantage',
+}
+
+_local = threading.local()
+
+@contextmanager
+def request_priority(priority):
+    """Tag upstream requests made by this thread with a scheduling priority"""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+def current_priority():
+    """Priority of the calling thread; unmarked threads count as interactive"""
+    return getattr(_local, 'priority', PRIORITY_INTERACTIVE)
+
+class TokenBucket:
+    """Token bucket that never grants more than `limit` tokens in any `period`-second window
+
+    A full bucket of `burst` tokens plus (limit - burst) refilled over the
+    window adds up to exactly `limit`, so bursts can't overshoot the quota.
+    """
+
+    def __init__(self, limit, period, burst=None):
+        self.capacity = burst if burst is not None else max(1, limit // 5)
+        self.rate = max(limit - self.capacity, 1) / period
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def try_take(self):
+        """Take a token; returns 0.0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class RateLimitScheduler:
+    """Per-provider token buckets with a priority queue of waiting requests
+
+    Waiters for one provider are served strictly in (priority, arrival) order:
+    only the head of the queue may take a token, so a prefetch never consumes
+    quota an interactive request is waiting for.
+    """
+
+    def __init__(self, quotas=None, hosts=None):
+        quotas = {**DEFAULT_QUOTAS, **(quotas or {})}
+        self.buckets = {provider: TokenBucket(*quota) for provider, quota in quotas.items()}
+        self.hosts = {**PROVIDER_HOSTS, **(hosts or {})}
+        self._cond = threading.Condition()
+        self._queues = {provider: [] for provider in self.buckets}
+        self._seq = itertools.count()
+        self._stats = {provider: {} for provider in self.buckets}
+
+    def provider_for(self, host):
+        """Provider name for a hostname, or None when it isn't rate limited"""
+        return self.hosts.get(host)
+
+    def acquire(self, provider, priority=None, timeout=None):
+        """Block until the provider's quota allows one request; returns seconds waited"""
+        if provider not in self.buckets:
+            return 0.0
+        priority = current_priority() if priority is None else priority
+        ticket = (priority, next(self._seq))
+        queue = self._queues[provider]
+        start = time.monotonic()
+
+        with self._cond:
+            heapq.heappush(queue, ticket)
+            while True:
+                delay = None
+                if queue[0] == ticket:
+                    delay = self.buckets[provider].try_take()
+                    if delay == 0.0:
+                        heapq.heappop(queue)
+                        self._cond.notify_all()
+                        break
+
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        queue.remove(ticket)
+                        heapq.heapify(queue)
+                        self._cond.notify_all()
+                        raise TimeoutError(f"Timed out waiting for {provider} quota")
+                    delay = remaining if delay is None else min(delay, remaining)
+                self._cond.wait(delay)
+
+            waited = time.monotonic() - start
+            self._record(provider, priority, waited)
+        return waited
+
+    def stats(self):
+        """Queue depth, tokens left and per-priority wait times for each provider"""
+        with self._cond:
+            snapshot = {}
+            for provider, bucket in self.buckets.items():
+                row = {'queue_depth': len(self._queues[provider]), 'tokens': round(bucket.tokens, 2)}
+                for priority, counters in self._stats[provider].items():
+                    name = PRIORITY_NAMES.get(priority, str(priority))
+                    row[f'{name}_granted'] = counters['granted']
+                    row[f'{name}_avg_wait'] = counters['total_wait'] / counters['granted']
+                    row[f'{name}_max_wait'] = counters['max_wait']
+                snapshot[provider] = row
+            return snapshot
+
+    def _record(self, provider, priority, waited):
+        counters = self._stats[provider].setdefault(priority, {'granted': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+        counters['granted'] += 1
+        counters['total_wait'] += waited
+        counters['max_wait'] = max(counters['max_wait'], waited)
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+def get_scheduler():
+    """Process-wide scheduler: quotas are per API key, not per session"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RateLimitScheduler()
+        return _default_scheduler
@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+    """Coalesce concurrent identical calls onto one in-flight execution
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running block on the same result (or exception) instead of starting
+    their own. Results are shared, so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future
+        self._stats = {'calls': 0, 'executed': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        """Run fn once per concurrent key; returns (result, shared)"""
+        with self._lock:
+            self._stats['calls'] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats['executed'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._calls.pop(key, None)
+        future.set_result(result)
+        return result, False
+
+    def stats(self):
+        """Counts of calls, upstream executions and coalesced waiters"""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
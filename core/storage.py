@@ -0,0 +1,291 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.getenv('FINDASH_DB', os.path.join('data', 'findash.db'))
+
+DEFAULT_SETTINGS = {
+    'cash_balance': 15000.0,
+    'initial_investment': 100000.0,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watchlist (
+    symbol      TEXT PRIMARY KEY,
+    asset_type  TEXT NOT NULL,
+    added_date  TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    date          TEXT NOT NULL,
+    type          TEXT NOT NULL CHECK (type IN ('Buy', 'Sell')),
+    symbol        TEXT NOT NULL,
+    asset_type    TEXT NOT NULL,
+    quantity      REAL NOT NULL,
+    price         REAL NOT NULL,
+    total_amount  REAL NOT NULL,
+    timestamp     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_symbol_date ON transactions (symbol, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions (type);
+
+CREATE TABLE IF NOT EXISTS holdings (
+    symbol          TEXT PRIMARY KEY,
+    asset_type      TEXT NOT NULL,
+    quantity        REAL NOT NULL,
+    purchase_price  REAL NOT NULL,
+    current_price   REAL NOT NULL,
+    last_updated    TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    name   TEXT PRIMARY KEY,
+    value  REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id               TEXT PRIMARY KEY,
+    symbol           TEXT NOT NULL,
+    asset_type       TEXT NOT NULL,
+    condition        TEXT NOT NULL,
+    target_price     REAL,
+    rule             TEXT,
+    created          TEXT NOT NULL,
+    triggered        INTEGER NOT NULL DEFAULT 0,
+    triggered_date   TEXT,
+    triggered_price  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_symbol ON alerts (symbol);
+CREATE INDEX IF NOT EXISTS idx_alerts_triggered ON alerts (triggered);
+"""
+
+TRANSACTION_COLUMNS = ('date', 'type', 'symbol', 'asset_type', 'quantity', 'price', 'total_amount', 'timestamp')
+ALERT_COLUMNS = ('id', 'symbol', 'asset_type', 'condition', 'target_price', 'rule', 'created',
+                 'triggered', 'triggered_date', 'triggered_price')
+
+class PortfolioStore:
+    """SQLite-backed watchlist, holdings, transactions, settings and alerts
+
+    Each thread gets its own connection (the alert daemon writes from a
+    background thread). The database runs in WAL mode so page reads never wait
+    on a writer, and bulk inserts go through executemany in one transaction.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.executescript(SCHEMA)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self.conn
+        with conn:  # commits on success, rolls back on error
+            yield conn
+
+    # Watchlist
+
+    def add_to_watchlist(self, symbol, asset_type):
+        """Add a symbol; returns False when it was already there"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO watchlist (symbol, asset_type, added_date) VALUES (?, ?, ?)',
+                (symbol, asset_type, datetime.now().strftime("%Y-%m-%d"))
+            )
+        return cursor.rowcount == 1
+
+    def remove_from_watchlist(self, symbol):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM watchlist WHERE symbol = ?', (symbol,))
+
+    def watchlist(self):
+        rows = self.conn.execute('SELECT symbol, asset_type, added_date FROM watchlist ORDER BY rowid')
+        return [dict(row) for row in rows]
+
+    # Transactions
+
+    def add_transaction(self, transaction):
+        self.add_transactions([transaction])
+
+    def add_transactions(self, transactions):
+        """Insert many transaction dicts in one batch"""
+        rows = [tuple(transaction[column] for column in TRANSACTION_COLUMNS) for transaction in transactions]
+        with self._transaction() as conn:
+            conn.executemany(
+                f"INSERT INTO transactions ({', '.join(TRANSACTION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(TRANSACTION_COLUMNS))})",
+                rows
+            )
+
+    def delete_transaction(self, transaction_id):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM transactions WHERE id = ?', (transaction_id,))
+
+    def transaction_count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+    def transactions(self, symbol=None, start=None, end=None, type=None, after_id=None):
+        """Transactions oldest first, optionally filtered by symbol, date range, type and id watermark"""
+        clauses, params = [], []
+        for clause, value in (('symbol = ?', symbol), ('date >= ?', start), ('date <= ?', end), ('type = ?', type),
+                              ('id > ?', after_id)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.conn.execute(
+            f"SELECT id, {', '.join(TRANSACTION_COLUMNS)} FROM transactions {where} ORDER BY date, id", params
+        )
+        return [dict(row) for row in rows]
+
+    # Holdings and settings
+
+    def add_holding(self, symbol, asset_type, quantity, purchase_price, current_price):
+        """Add to a position, averaging the purchase price with any existing quantity"""
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO holdings (symbol, asset_type, quantity, purchase_price, current_price, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (symbol) DO UPDATE SET
+                    purchase_price = (quantity * purchase_price + excluded.quantity * excluded.purchase_price)
+                                     / (quantity + excluded.quantity),
+                    quantity = quantity + excluded.quantity,
+                    asset_type = excluded.asset_type,
+                    last_updated = excluded.last_updated
+                """,
+                (symbol, asset_type, quantity, purchase_price, current_price, datetime.now().strftime("%Y-%m-%d"))
+            )
+
+    def set_positions(self, positions):
+        """Make holdings match {symbol: {asset_type, quantity, purchase_price, price}}; zero quantity removes the row
+
+        Existing rows keep their stored current_price; new ones start at
+        `price`. Only rows that actually change are written.
+        """
+        current = self.holdings()
+        today = datetime.now().strftime("%Y-%m-%d")
+        removed, upserts = [], []
+        for symbol, position in positions.items():
+            held = current.get(symbol)
+            if position['quantity'] <= 1e-9:
+                if held is not None:
+                    removed.append((symbol,))
+            elif held is None or (held['quantity'], held['purchase_price'], held['asset_type']) != (
+                    position['quantity'], position['purchase_price'], position['asset_type']):
+                price = held['current_price'] if held is not None else position['price']
+                upserts.append((symbol, position['asset_type'], position['quantity'], position['purchase_price'],
+                                price, today))
+        if not removed and not upserts:
+            return
+        with self._transaction() as conn:
+            conn.executemany('DELETE FROM holdings WHERE symbol = ?', removed)
+            conn.executemany(
+                """
+                INSERT INTO holdings (symbol, asset_type, quantity, purchase_price, current_price, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (symbol) DO UPDATE SET
+                    asset_type = excluded.asset_type,
+                    quantity = excluded.quantity,
+                    purchase_price = excluded.purchase_price,
+                    last_updated = excluded.last_updated
+                """,
+                upserts
+            )
+
+    def update_prices(self, prices):
+        """Store the latest price for many holdings in one batch"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._transaction() as conn:
+            conn.executemany(
+                'UPDATE holdings SET current_price = ?, last_updated = ? WHERE symbol = ?',
+                [(price, today, symbol) for symbol, price in prices.items()]
+            )
+
+    def holdings(self):
+        """Holdings keyed by symbol, with invested and current value derived"""
+        rows = self.conn.execute('SELECT * FROM holdings ORDER BY rowid')
+        return {
+            row['symbol']: {
+                'quantity': row['quantity'],
+                'purchase_price': row['purchase_price'],
+                'total_invested': row['quantity'] * row['purchase_price'],
+                'current_price': row['current_price'],
+                'current_value': row['quantity'] * row['current_price'],
+                'asset_type': row['asset_type'],
+                'last_updated': row['last_updated']
+            }
+            for row in rows
+        }
+
+    def get_setting(self, name):
+        row = self.conn.execute('SELECT value FROM settings WHERE name = ?', (name,)).fetchone()
+        return DEFAULT_SETTINGS.get(name) if row is None else row['value']
+
+    def set_setting(self, name, value):
+        with self._transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)', (name, value))
+
+    def portfolio(self):
+        """The one portfolio shape every page reads"""
+        holdings = self.holdings()
+        cash_balance = self.get_setting('cash_balance')
+        return {
+            'holdings': holdings,
+            'cash_balance': cash_balance,
+            'initial_investment': self.get_setting('initial_investment'),
+            'total_value': cash_balance + sum(holding['current_value'] for holding in holdings.values())
+        }
+
+    # Alerts
+
+    def save_alert(self, alert):
+        self.save_alerts([alert])
+
+    def save_alerts(self, alerts):
+        """Insert or update many alert dicts in one batch"""
+        rows = [tuple(alert.get(column) for column in ALERT_COLUMNS) for alert in alerts]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO alerts ({', '.join(ALERT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(ALERT_COLUMNS))})",
+                rows
+            )
+
+    def delete_alert(self, alert_id):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM alerts WHERE id = ?', (alert_id,))
+
+    def alerts(self):
+        """All alerts, oldest first"""
+        rows = self.conn.execute(f"SELECT {', '.join(ALERT_COLUMNS)} FROM alerts ORDER BY rowid")
+        return [{**dict(row), 'triggered': bool(row['triggered'])} for row in rows]
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def get_portfolio_store():
+    """Process-wide store at FINDASH_DB (default data/findash.db)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PortfolioStore()
+        return _default_store
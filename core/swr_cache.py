@@ -0,0 +1,117 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from core.scheduler import PRIORITY_PREFETCH, request_priority
+from core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Shared by every SWR cache so background refreshes can't pile up unbounded threads
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='swr-refresh')
+
+class SWRCache:
+    """Stale-while-revalidate cache: serve the last good value, refresh it in the background
+
+    Entries younger than `ttl` are fresh. Between `ttl` and `hard_ttl` the cached
+    value is returned immediately, marked stale, while one background refresh
+    runs. Past `hard_ttl` (or on a miss) the caller waits for a fresh load.
+    A load that fails or returns None never replaces the last good value.
+    Concurrent loads of one key (misses from many sessions, or a miss racing a
+    background refresh) are coalesced into a single call.
+    """
+
+    def __init__(self, ttl=300, hard_ttl=3600, max_entries=1024):
+        self.ttl = ttl
+        self.hard_ttl = hard_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, fetched_at monotonic, fetched_at wall clock)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.flight = SingleFlight()
+
+    def get(self, key, loader):
+        """Cached value for key, loading or scheduling a refresh as its age requires"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        age = None if entry is None else time.monotonic() - entry[1]
+        if entry is None or age > self.hard_ttl:
+            value = self._load(key, loader)
+            if value is not None:
+                return _mark(value, datetime.now(), stale=False)
+            if entry is None:
+                return None
+            # Upstream is down past hard expiry: the old value beats nothing
+            return _mark(entry[0], entry[2], stale=True)
+
+        if age > self.ttl:
+            self._schedule_refresh(key, loader)
+            return _mark(entry[0], entry[2], stale=True)
+        return _mark(entry[0], entry[2], stale=False)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _schedule_refresh(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with request_priority(PRIORITY_PREFETCH):
+                    self._load(key, loader)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _refresh_pool.submit(refresh)
+
+    def _load(self, key, loader):
+        try:
+            value, _ = self.flight.do(key, loader)
+        except Exception:
+            logger.exception("SWR load failed for %r", key)
+            return None
+        if value is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), datetime.now())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+def _mark(value, as_of, stale):
+    """Dict results carry their freshness so the UI can flag stale data"""
+    if isinstance(value, dict):
+        return {**value, 'stale': stale, 'as_of': as_of}
+    return value
+
+def swr_cache(ttl=300, hard_ttl=3600, max_entries=1024):
+    """Decorate a fetcher method; like st.cache_data, `self` is not part of the key"""
+    def decorator(func):
+        cache = SWRCache(ttl=ttl, hard_ttl=hard_ttl, max_entries=max_entries)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return cache.get(key, lambda: func(self, *args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,171 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from core.periods import period_start
+
+# Synthetic prices sit exactly at their base price on this session
+REFERENCE_DATE = pd.Timestamp('2024-01-02')
+TRADING_DAYS = 252
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+INTRADAY_MINUTES = {'1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60}
+AGGREGATED_INTERVALS = {'1wk': 'W-FRI', '1mo': 'M'}
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+DAY_NS = 86_400 * 10**9
+
+# Independent random streams, one per quantity drawn
+SALT_PARAMS, SALT_RETURNS, SALT_INTRADAY, SALT_OPEN, SALT_HIGH, SALT_LOW, SALT_VOLUME = range(7)
+
+class SyntheticMarketData:
+    """Deterministic, vectorized OHLCV generator for demos and load tests
+
+    Every draw is a hash of (symbol, bar timestamp, stream), so a symbol's bars
+    are identical whichever window, batch of symbols or process asks for them.
+    Daily closes follow a geometric random walk pinned to the base price on
+    REFERENCE_DATE; intraday bars are Brownian bridges between daily closes.
+    """
+
+    def __init__(self, base_prices=None, reference_date=REFERENCE_DATE):
+        self.base_prices = base_prices or {}
+        self.reference_date = pd.Timestamp(reference_date)
+
+    def generate_history(self, symbol, start=None, end=None, period='1mo', interval='1d'):
+        """OHLCV DataFrame for one symbol"""
+        panel = self.generate_panel([symbol], start=start, end=end, period=period, interval=interval)
+        return pd.DataFrame({field: panel[field][symbol] for field in FIELDS})
+
+    def generate_panel(self, symbols, start=None, end=None, period='1mo', interval='1d'):
+        """Dict of field -> DataFrame (bars x symbols) generated in one vectorized pass"""
+        symbols = list(symbols)
+        end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+        start = period_start(period, end.normalize()) if start is None else pd.Timestamp(start)
+
+        if interval in AGGREGATED_INTERVALS:
+            daily = self.generate_panel(symbols, start=start, end=end, interval='1d')
+            return _aggregate(daily, AGGREGATED_INTERVALS[interval])
+        if interval != '1d' and interval not in INTRADAY_MINUTES:
+            raise ValueError(f"Unsupported interval: {interval}")
+
+        params = self._symbol_params(symbols)
+        sessions = pd.bdate_range(start.normalize(), end.normalize())
+        if sessions.empty:
+            return {field: pd.DataFrame(columns=symbols, dtype=float) for field in FIELDS}
+
+        # Daily walk spans the reference session so levels don't depend on the window
+        days = pd.bdate_range(min(sessions[0] - pd.offsets.BDay(1), self.reference_date),
+                              max(sessions[-1], self.reference_date))
+        log_close = self._daily_log_close(params, days)
+        first = days.get_loc(sessions[0])
+        prev_log = log_close[first - 1:first - 1 + len(sessions)]
+        day_log = log_close[first:first + len(sessions)]
+
+        if interval == '1d':
+            index = sessions
+            sigma = params['sigma'][None, :]
+            counters = _day_counters(index)
+            frames = _ohlcv(params, prev_log, day_log, sigma, counters, 1.0)
+        else:
+            index, frames = self._intraday(params, sessions, prev_log, day_log, INTRADAY_MINUTES[interval])
+
+        frames = {field: pd.DataFrame(values, index=index, columns=symbols) for field, values in frames.items()}
+        mask = (index >= start) & (index <= end)
+        return {field: frame.loc[mask] for field, frame in frames.items()}
+
+    def _symbol_params(self, symbols):
+        seeds = np.array([_symbol_seed(symbol) for symbol in symbols], dtype=np.uint64)
+        u = _uniform(seeds[None, :], np.arange(4, dtype=np.uint64)[:, None], SALT_PARAMS)
+
+        base = np.array([self.base_prices.get(symbol, np.nan) for symbol in symbols], dtype=float)
+        base = np.where(np.isnan(base), 20.0 * np.exp(u[0] * np.log(25.0)), base)  # $20 - $500
+        vol = 0.15 + 0.30 * u[1]                                                   # 15% - 45% annual
+        drift = -0.02 + 0.14 * u[2]                                                # -2% - 12% annual
+        volume = 5e5 * np.exp(u[3] * np.log(400.0))                                # 0.5M - 200M shares
+        sigma = vol / np.sqrt(TRADING_DAYS)
+        return {
+            'seeds': seeds,
+            'log_base': np.log(base),
+            'sigma': sigma,
+            'mu': drift / TRADING_DAYS - 0.5 * sigma ** 2,
+            'volume': volume,
+        }
+
+    def _daily_log_close(self, params, days):
+        z = _normal(params['seeds'][None, :], _day_counters(days), SALT_RETURNS)
+        log_path = np.cumsum(params['mu'][None, :] + params['sigma'][None, :] * z, axis=0)
+        log_path -= log_path[min(days.searchsorted(self.reference_date), len(days) - 1)]
+        return params['log_base'][None, :] + log_path
+
+    def _intraday(self, params, sessions, prev_log, day_log, minutes):
+        bars_per_day = -(-SESSION_MINUTES // minutes)
+        offsets = SESSION_OPEN + pd.to_timedelta(np.arange(bars_per_day) * minutes, unit='min')
+        index = pd.DatetimeIndex((sessions.values[:, None] + offsets.values[None, :]).ravel())
+
+        n_days, n_symbols = day_log.shape
+        z = _normal(params['seeds'][None, :], (index.asi8 // 10**9).astype(np.uint64)[:, None], SALT_INTRADAY)
+        steps = z.reshape(n_days, bars_per_day, n_symbols).cumsum(axis=1)
+
+        # Brownian bridge pinned to the previous and current daily closes
+        frac = (np.arange(1, bars_per_day + 1) / bars_per_day)[None, :, None]
+        sigma_bar = params['sigma'] / np.sqrt(bars_per_day)
+        bridge = steps - frac * steps[:, -1:, :]
+        close = prev_log[:, None, :] + frac * (day_log - prev_log)[:, None, :] + sigma_bar * bridge
+        close = close.reshape(-1, n_symbols)
+        prev = np.vstack([prev_log[:1], close[:-1]])
+
+        counters = (index.asi8 // 10**9).astype(np.uint64)[:, None]
+        return index, _ohlcv(params, prev, close, sigma_bar[None, :], counters, 1.0 / bars_per_day)
+
+def _ohlcv(params, prev_log, close_log, sigma, counters, volume_scale):
+    """Open/High/Low/Volume around a close path, all drawn from hashed streams"""
+    seeds = params['seeds'][None, :]
+    close = np.exp(close_log)
+    open_ = np.exp(prev_log + 0.25 * sigma * _normal(seeds, counters, SALT_OPEN))
+    high = np.maximum(open_, close) * np.exp(0.5 * sigma * np.abs(_normal(seeds, counters, SALT_HIGH)))
+    low = np.minimum(open_, close) * np.exp(-0.5 * sigma * np.abs(_normal(seeds, counters, SALT_LOW)))
+    volume = params['volume'][None, :] * volume_scale * np.exp(0.35 * _normal(seeds, counters, SALT_VOLUME) - 0.06)
+    return {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': np.round(volume)}
+
+def _aggregate(daily, freq):
+    """Roll daily bars up to weekly/monthly bars labelled by their first session"""
+    index = daily['Close'].index
+    if index.empty:
+        return daily
+    keys = index.to_period(freq)
+    labels = pd.Series(index, index=index).groupby(keys).first()
+    reducers = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    panel = {}
+    for field, how in reducers.items():
+        frame = daily[field].groupby(keys).agg(how)
+        frame.index = pd.DatetimeIndex(labels.values)
+        panel[field] = frame
+    return panel
+
+def _symbol_seed(symbol):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(symbol.encode(), digest_size=8).digest(), 'little')
+
+def _day_counters(index):
+    return (index.asi8 // DAY_NS).astype(np.uint64)[:, None]
+
+def _mix(x):
+    """splitmix64 finalizer, vectorized over uint64 arrays"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def _uniform(seeds, counters, salt):
+    offset = np.uint64((salt * 0x9E3779B97F4A7C15) % 2**64)
+    bits = _mix(seeds ^ _mix(counters + offset))
+    return ((bits >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0 ** -53
+
+def _normal(seeds, counters, salt):
+    """Standard normals via Box-Muller over two hashed uniform streams"""
+    u1 = _uniform(seeds, counters, 2 * salt + 100)
+    u2 = _uniform(seeds, counters, 2 * salt + 101)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from core.scheduler import PRIORITY_REFRESH
+
+HOLDING_COLUMNS = ['asset_type', 'quantity', 'purchase_price', 'current_price']
+VALUATION_COLUMNS = HOLDING_COLUMNS + ['cost_basis', 'market_value', 'pnl', 'pnl_pct', 'weight', 'stale']
+
+def fetch_prices(fetcher, assets, priority=PRIORITY_REFRESH):
+    """Latest price per symbol from a {symbol: asset_type} mapping
+
+    Quotes are fetched with one batched request per asset type. Returns
+    (prices, errors) keyed by symbol.
+    """
+    assets = pd.Series(assets, dtype=object)
+    prices, errors = {}, {}
+    for asset_type, symbols in assets.groupby(assets.str.lower()).groups.items():
+        quotes, failed = fetcher.fetch_many(list(symbols), asset_type=asset_type, priority=priority,
+                                            include_history=False)
+        prices.update({symbol: data['current_price'] for symbol, data in quotes.items()})
+        errors.update(failed)
+    return prices, errors
+
+def value_holdings(holdings, prices=None, cash=0.0):
+    """Mark holdings to market as one numeric frame indexed by symbol
+
+    `holdings` is PortfolioStore.holdings() or a frame with the same columns.
+    Symbols missing from `prices` keep their stored current_price and are
+    flagged stale. Weights are shares of market value plus `cash`.
+    """
+    if isinstance(holdings, dict):
+        holdings = pd.DataFrame.from_dict(holdings, orient='index', columns=HOLDING_COLUMNS)
+    frame = holdings[HOLDING_COLUMNS].astype({'quantity': float, 'purchase_price': float, 'current_price': float})
+    frame.index.name = 'symbol'
+
+    quoted = frame.index.to_series().map(prices or {}).astype(float)
+    stale = quoted.isna().to_numpy()
+    current = np.where(stale, frame['current_price'].to_numpy(), quoted.to_numpy())
+    quantity = frame['quantity'].to_numpy()
+    cost = quantity * frame['purchase_price'].to_numpy()
+    value = quantity * current
+    total = value.sum() + cash
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pnl_pct = np.where(cost != 0, (value - cost) / cost * 100, np.nan)
+        weight = value / total * 100 if total else np.full(len(value), np.nan)
+    return frame.assign(
+        current_price=current,
+        cost_basis=cost,
+        market_value=value,
+        pnl=value - cost,
+        pnl_pct=pnl_pct,
+        weight=weight,
+        stale=stale
+    )[VALUATION_COLUMNS]
+
+def valuation_totals(valued, cash=0.0):
+    """Book-level cost, value and P&L from a value_holdings() frame"""
+    cost = valued['cost_basis'].sum()
+    value = valued['market_value'].sum()
+    return {
+        'cost_basis': cost,
+        'market_value': value,
+        'pnl': value - cost,
+        'pnl_pct': (value - cost) / cost * 100 if cost else 0.0,
+        'cash': cash,
+        'total_value': value + cash
+    }
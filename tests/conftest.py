@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Tests import the app's packages (core, components) from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class StubServer:
+    """Local HTTP upstream answering from canned responses and counting hits per path
+
+    `reply(path, *responses)` queues (status, body[, headers]) tuples, or a
+    callable of the query dict returning one; the last response repeats.
+    Unrouted paths answer 404. Every response is held for `delay` seconds.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = Counter()
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, body, headers = stub._respond(url.path, parse_qs(url.query))
+                time.sleep(stub.delay)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in {'Content-Type': 'application/json', **headers}.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def reply(self, path, *responses):
+        with self._lock:
+            self.routes[path] = list(responses)
+
+    def _respond(self, path, query):
+        with self._lock:
+            self.hits[path] += 1
+            responses = self.routes.get(path)
+            if not responses:
+                return 404, {'error': 'not found'}, {}
+            response = responses.pop(0) if len(responses) > 1 else responses[0]
+        if callable(response):
+            response = response({name: values[0] for name, values in query.items()})
+        status, body, *headers = response
+        return status, body, headers[0] if headers else {}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest import _trades, backtest, ma_crossover_signals, rule_signals
+from core.rules import RuleEngine
+
+def random_closes(seed, bars=400, symbols=4):
+    rng = np.random.default_rng(seed)
+    closes = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (bars, symbols)), axis=0)),
+                          index=pd.bdate_range('2020-01-01', periods=bars),
+                          columns=[f"S{i}" for i in range(symbols)])
+    closes.iloc[:40, -1] = np.nan  # listed late
+    return closes
+
+def loop_backtest(price, signal, cost):
+    """Bar-by-bar reference for one symbol: equity and the return of each round trip"""
+    equity, position, entry, trades = 1.0, 0.0, None, []
+    for t in range(1, len(price)):
+        target = signal[t - 1] if np.isfinite(price[t]) else 0.0
+        move = price[t] / price[t - 1] - 1 if np.isfinite(price[t]) and np.isfinite(price[t - 1]) else 0.0
+        if target > 0 and position == 0:
+            entry = equity
+        equity *= 1 + target * move - abs(target - position) * cost
+        if target == 0 and position > 0:
+            trades.append(equity / entry - 1)
+        position = target
+    if position > 0:
+        trades.append(equity / entry - 1)
+    return equity, trades
+
+@pytest.mark.parametrize('seed', range(3))
+def test_backtest_agrees_with_a_bar_by_bar_loop(seed):
+    closes = random_closes(seed)
+    signals = ma_crossover_signals(closes, 10, 30)
+    result = backtest(closes, signals, cost_bps=5, slippage_bps=5)
+    for symbol in closes:
+        equity, trades = loop_backtest(closes[symbol].ffill().to_numpy(), signals[symbol].to_numpy(), 10 / 1e4)
+        assert result['equity'][symbol].iloc[-1] == pytest.approx(equity, rel=1e-10)
+        got = result['trades'].loc[result['trades']['symbol'] == symbol, 'return']
+        np.testing.assert_allclose(got, trades, rtol=1e-9, atol=1e-12)
+        assert result['stats'].at[symbol, 'trades'] == len(trades)
+
+def test_trades_pair_each_entry_with_the_next_exit():
+    index = pd.bdate_range('2024-01-01', periods=8)
+    # Column A: held bars 1-2 and 5-7 (open at the end); column B: held bar 3 only
+    positions = np.array([[0, 0], [1, 0], [1, 0], [0, 1], [0, 0], [1, 0], [1, 0], [1, 0]], dtype=float)
+    price = np.column_stack([np.arange(10.0, 18.0), np.arange(20.0, 28.0)])
+    equity = np.cumprod(np.full((8, 2), 1.01), axis=0)
+    trades = _trades(positions, equity, price, index, pd.Index(['A', 'B']))
+
+    assert list(trades['symbol']) == ['A', 'A', 'B']
+    assert list(trades['entry_date']) == [index[0], index[4], index[2]]
+    assert list(trades['exit_date']) == [index[2], index[7], index[3]]
+    assert list(trades['entry_price']) == [10.0, 14.0, 22.0]
+    assert list(trades['exit_price']) == [12.0, 17.0, 23.0]
+    assert list(trades['bars']) == [2, 3, 1]
+    assert list(trades['open']) == [False, True, False]
+    np.testing.assert_allclose(trades['return'], [1.01 ** 3 - 1, 1.01 ** 3 - 1, 1.01 ** 2 - 1])
+
+def test_trades_of_a_flat_book_is_empty():
+    index = pd.bdate_range('2024-01-01', periods=3)
+    trades = _trades(np.zeros((3, 2)), np.ones((3, 2)), np.ones((3, 2)), index, pd.Index(['A', 'B']))
+    assert trades.empty and list(trades.columns)[0] == 'symbol'
+
+def test_signals_act_on_the_next_bar():
+    closes = pd.DataFrame({'X': [100.0, 200.0, 100.0, 100.0]}, index=pd.bdate_range('2024-01-01', periods=4))
+    # Long only on the bar of the jump: too late to earn it, then held through the fall
+    signals = pd.DataFrame({'X': [0.0, 1.0, 0.0, 0.0]}, index=closes.index)
+    result = backtest(closes, signals, cost_bps=0, slippage_bps=0)
+    assert result['positions']['X'].tolist() == [0.0, 0.0, 1.0, 0.0]
+    assert result['equity']['X'].iloc[-1] == pytest.approx(0.5)
+
+def test_costs_are_charged_on_entry_and_exit():
+    closes = pd.DataFrame({'X': [100.0] * 5}, index=pd.bdate_range('2024-01-01', periods=5))
+    signals = pd.DataFrame({'X': [1.0, 1.0, 0.0, 0.0, 0.0]}, index=closes.index)
+    result = backtest(closes, signals, cost_bps=10, slippage_bps=15)
+    assert result['equity']['X'].iloc[-1] == pytest.approx((1 - 0.0025) ** 2)
+    assert result['stats'].at['X', 'turnover'] == 2.0
+
+def test_rule_evaluation_over_history_matches_the_last_bar_engine():
+    closes = random_closes(9, bars=120).iloc[:, :3]
+    rules = ['close crosses above MA20', 'RSI(14) < 40', 'MA10 > MA30', '30d change > 5%']
+    engine = RuleEngine(rules)
+    for rule in rules:
+        entries = rule_signals(closes, rule)
+        for end in (60, 90, 120):
+            expected = engine.evaluate(closes.iloc[:end]).loc[rule]
+            assert entries.iloc[end - 1].astype(bool).tolist() == expected.tolist(), (rule, end)
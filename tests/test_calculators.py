@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.calculators import SIPCalculator, _annuity_factor, _solve_monthly_rate
+
+@pytest.fixture
+def calculator():
+    return SIPCalculator()
+
+def npv(rate, amounts, dates):
+    years = (pd.to_datetime(dates) - pd.to_datetime(dates).min()).days / 365.0
+    return float(np.sum(np.asarray(amounts) * (1 + rate) ** -np.asarray(years)))
+
+def test_xirr_of_a_single_year(calculator):
+    assert calculator.xirr([-1000, 1100], ['2023-01-01', '2024-01-01']) == pytest.approx(10.0, abs=1e-8)
+
+def test_xirr_zeroes_the_npv_of_irregular_flows(calculator):
+    amounts = [-5000, -1200, 300, -800, 7900]
+    dates = ['2020-03-15', '2020-09-01', '2021-02-10', '2022-06-30', '2023-11-20']
+    rate = calculator.xirr(amounts, dates)
+    assert npv(rate / 100, amounts, dates) == pytest.approx(0.0, abs=1e-6)
+
+def test_grouped_xirr_matches_each_group_alone(calculator):
+    flows = pd.DataFrame({
+        'group': ['A', 'A', 'B', 'B', 'B', 'C', 'C'],
+        'amount': [-100, 150, -1000, -500, 1400, -50, 40],
+        'date': ['2021-01-01', '2023-01-01', '2020-01-01', '2020-07-01', '2022-01-01', '2022-01-01', '2022-12-01'],
+    })
+    grouped = calculator.xirr(flows['amount'], flows['date'], groups=flows['group'])
+    for group, rows in flows.groupby('group'):
+        assert grouped[group] == pytest.approx(calculator.xirr(rows['amount'], rows['date']), abs=1e-8)
+    assert grouped['C'] < 0
+
+def test_xirr_without_a_sign_change_is_nan(calculator):
+    assert np.isnan(calculator.xirr([-100, -100], ['2023-01-01', '2024-01-01']))
+
+@pytest.mark.parametrize('annual_return', [0.0, 4.0, 12.0, 25.0])
+@pytest.mark.parametrize('step_up', [0.0, 10.0])
+def test_required_monthly_investment_reaches_the_target(calculator, annual_return, step_up):
+    monthly = calculator.required_monthly_investment(1_000_000, annual_return, 15, step_up)
+    result = calculator.calculate_step_up_future_value(monthly, annual_return, 15, step_up)
+    assert result['future_value'] == pytest.approx(1_000_000, rel=1e-9)
+
+def test_required_years_is_the_first_month_reaching_the_target(calculator):
+    years = calculator.required_years(500_000, 2_000, 12.0, step_up=5.0)
+    months = round(years * 12)
+    reached = calculator.calculate_step_up_future_value(2_000, 12.0, months / 12, 5.0)['future_value']
+    short = calculator.calculate_step_up_future_value(2_000, 12.0, (months - 1) / 12, 5.0)['future_value']
+    assert reached >= 500_000 > short
+
+def test_required_years_broadcasts_and_flags_unreachable_goals(calculator):
+    years = calculator.required_years([100_000, 1e12], 1_000, 8.0, max_years=50)
+    assert np.isfinite(years[0]) and np.isnan(years[1])
+
+def test_monthly_rate_solver_inverts_the_annuity_factor():
+    rates = np.array([-0.01, 0.0, 0.002, 0.01, 0.03])
+    months = np.array([24, 60, 120, 240, 36])
+    future_value = 500 * _annuity_factor(rates, months)
+    np.testing.assert_allclose(_solve_monthly_rate(500, months, future_value), rates, atol=1e-10)
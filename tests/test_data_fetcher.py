@@ -0,0 +1,41 @@
+import time
+import uuid
+
+from core.data_fetcher import StreamlitDataFetcher
+from core.http_client import HTTPClient
+
+def coingecko_routes(stub, ids):
+    """Quotes and a three-day chart for `ids`; any other coin is unknown"""
+    stub.reply('/simple/price', lambda query: (200, {
+        coin: {'usd': 100.0 + i} for i, coin in enumerate(ids) if coin in query['ids'].split(',')
+    }))
+    chart = {'prices': [[1_700_000_000_000 + day * 86_400_000, 90.0 + day] for day in range(3)]}
+    for coin in ids:
+        stub.reply(f'/coins/{coin}/market_chart', (200, chart))
+
+def test_fetch_many_fetches_symbols_concurrently(stub_server):
+    # Fresh ids per run: the fetcher's caches are process-wide
+    ids = [f"coin-{uuid.uuid4().hex[:8]}" for _ in range(6)]
+    coingecko_routes(stub_server, ids)
+    stub_server.delay = 0.2
+    fetcher = StreamlitDataFetcher(coingecko_url=stub_server.url, http_client=HTTPClient(max_retries=0))
+
+    start = time.perf_counter()
+    results, errors = fetcher.fetch_many(ids, asset_type="crypto", max_workers=6)
+    elapsed = time.perf_counter() - start
+
+    assert sorted(results) == sorted(ids) and not errors
+    assert results[ids[2]]['current_price'] == 102.0
+    assert len(results[ids[0]]['history']) == 3
+    # Two requests per coin; one after another they would take 6 * 2 * 0.2s
+    assert elapsed < 6 * 2 * 0.2 / 2
+
+def test_fetch_many_reports_failed_symbols_separately(stub_server):
+    ids = [f"coin-{uuid.uuid4().hex[:8]}" for _ in range(3)]
+    coingecko_routes(stub_server, ids)
+    fetcher = StreamlitDataFetcher(coingecko_url=stub_server.url, http_client=HTTPClient(max_retries=0))
+    unknown = f"missing-{uuid.uuid4().hex[:8]}"
+
+    results, errors = fetcher.fetch_many(ids + [unknown], asset_type="crypto")
+    assert sorted(results) == sorted(ids)
+    assert list(errors) == [unknown]
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import core.http_client
+from core.http_client import HTTPClient
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the client asked for, without actually waiting"""
+    delays = []
+    # Swap the module's clock, not time.sleep itself, which the stub server's threads share
+    monkeypatch.setattr(core.http_client, 'time', SimpleNamespace(
+        sleep=delays.append, perf_counter=time.perf_counter, time=time.time))
+    return delays
+
+def test_transient_errors_are_retried(stub_server, sleeps):
+    stub_server.reply('/quote', (503, {}), (502, {}), (200, {'price': 1.0}))
+    client = HTTPClient(max_retries=3)
+    assert client.get_json(f"{stub_server.url}/quote") == {'price': 1.0}
+    assert stub_server.hits['/quote'] == 3
+    stats = client.stats()['127.0.0.1']
+    assert (stats['requests'], stats['retries'], stats['errors']) == (3, 2, 2)
+    assert len(sleeps) == 2
+
+def test_retries_stop_after_max_retries(stub_server, sleeps):
+    stub_server.reply('/quote', (500, {}))
+    client = HTTPClient(max_retries=2)
+    assert client.get(f"{stub_server.url}/quote").status_code == 500
+    with pytest.raises(requests.HTTPError):
+        client.get_json(f"{stub_server.url}/quote")
+    assert stub_server.hits['/quote'] == 6
+
+def test_client_errors_are_not_retried(stub_server, sleeps):
+    stub_server.reply('/quote', (404, {}))
+    assert HTTPClient().get(f"{stub_server.url}/quote").status_code == 404
+    assert stub_server.hits['/quote'] == 1 and not sleeps
+
+def test_retry_after_sets_the_minimum_backoff(stub_server, sleeps):
+    stub_server.reply('/quote', (429, {}, {'Retry-After': '3'}), (429, {}, {'Retry-After': '120'}), (200, {}))
+    HTTPClient(backoff_base=0.01, backoff_cap=8.0).get_json(f"{stub_server.url}/quote")
+    # Honoured, but never beyond the backoff cap
+    assert sleeps[0] >= 3.0 and sleeps[1] == 8.0
+
+def test_backoff_is_jittered_under_an_exponential_cap():
+    client = HTTPClient(backoff_base=0.5, backoff_cap=4.0)
+    for attempt, ceiling in enumerate([0.5, 1.0, 2.0, 4.0, 4.0]):
+        delays = [client.backoff_delay(attempt) for _ in range(200)]
+        assert 0.0 <= min(delays) and max(delays) <= ceiling
+        assert len(set(delays)) > 1
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    client = HTTPClient(max_retries=2, default_timeout=(0.5, 0.5))
+    with pytest.raises(requests.ConnectionError):
+        client.get("http://127.0.0.1:9/quote")  # discard port: nothing listens
+    assert client.stats()['127.0.0.1']['requests'] == 3
+
+def concurrently(count, fn):
+    """Run fn in `count` threads released together; returns their results"""
+    barrier = threading.Barrier(count)
+
+    def run(_):
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(run, range(count)))
+
+def test_identical_concurrent_calls_share_one_upstream_request(stub_server):
+    stub_server.reply('/price', (200, {'price': 42.0}))
+    stub_server.delay = 0.3
+    client = HTTPClient()
+    results = concurrently(8, lambda: client.get_json(f"{stub_server.url}/price", params={'ids': 'btc'}))
+    assert results == [{'price': 42.0}] * 8
+    assert stub_server.hits['/price'] == 1
+    assert client.stats()['127.0.0.1']['coalesced'] == 7
+
+def test_calls_with_different_params_are_not_coalesced(stub_server):
+    stub_server.reply('/price', (200, {}))
+    stub_server.delay = 0.2
+    client = HTTPClient()
+    concurrently(4, lambda: client.get_json(f"{stub_server.url}/price",
+                                            params={'ids': threading.current_thread().name}))
+    assert stub_server.hits['/price'] == 4
+
+def test_a_failed_flight_fails_every_waiter_and_is_not_remembered(stub_server):
+    stub_server.reply('/price', (404, {}), (200, {'price': 1.0}))
+    stub_server.delay = 0.3
+    client = HTTPClient(max_retries=0)
+
+    def call():
+        try:
+            return client.get_json(f"{stub_server.url}/price")
+        except requests.HTTPError:
+            return 'failed'
+
+    assert concurrently(5, call) == ['failed'] * 5
+    assert client.get_json(f"{stub_server.url}/price") == {'price': 1.0}
+    assert stub_server.hits['/price'] == 2
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.ledger
+from core.ledger import METHODS, Ledger, LedgerError, check_transaction, get_ledger, sync_holdings
+from core.storage import PortfolioStore
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD']
+
+def random_log(seed, n=300):
+    """Buys and sells that never oversell, with fractional quantities and full exits"""
+    rng = np.random.default_rng(seed)
+    rows, held = [], {}
+    for i in range(n):
+        symbol = SYMBOLS[rng.integers(len(SYMBOLS))]
+        quantity = float(rng.integers(1, 20)) + float(rng.choice([0.0, 0.5, 0.25]))
+        if held.get(symbol, 0) > 0 and rng.random() < 0.45:
+            quantity = held[symbol] if rng.random() < 0.2 else min(quantity, held[symbol])
+            kind = 'Sell'
+            held[symbol] -= quantity
+        else:
+            kind = 'Buy'
+            held[symbol] = held.get(symbol, 0) + quantity
+        rows.append({'id': i + 1, 'date': pd.Timestamp('2024-01-01') + pd.Timedelta(hours=int(i)),
+                     'type': kind, 'symbol': symbol, 'quantity': quantity,
+                     'price': round(float(rng.uniform(50, 150)), 2)})
+    return rows
+
+def naive_positions(transactions, method):
+    """Reference matcher: every sell walks the open lots of its symbol one at a time"""
+    lots, realized = {}, {}
+    ordered = sorted(transactions, key=lambda t: (t['symbol'], pd.Timestamp(t['date']), t['id']))
+    for t in ordered:
+        symbol = t['symbol']
+        held = lots.setdefault(symbol, [])
+        realized.setdefault(symbol, 0.0)
+        if t['type'] == 'Buy':
+            held.append([t['quantity'], t['price']])
+            if method == 'average':
+                quantity = sum(lot[0] for lot in held)
+                cost = sum(lot[0] * lot[1] for lot in held)
+                held[:] = [[quantity, cost / quantity]]
+            continue
+        remaining = t['quantity']
+        while remaining > 1e-9:
+            index = -1 if method == 'lifo' else 0
+            lot = held[index]
+            take = min(remaining, lot[0])
+            realized[symbol] += take * (t['price'] - lot[1])
+            lot[0] -= take
+            remaining -= take
+            if lot[0] <= 1e-9:
+                held.pop(index)
+    return pd.DataFrame({
+        'quantity': {symbol: sum(lot[0] for lot in held) for symbol, held in lots.items()},
+        'cost_basis': {symbol: sum(lot[0] * lot[1] for lot in held) for symbol, held in lots.items()},
+        'realized_pnl': realized
+    })
+
+def assert_matches(ledger, expected):
+    got = ledger.positions()[['quantity', 'cost_basis', 'realized_pnl']]
+    pd.testing.assert_frame_equal(got.reindex(expected.index), expected, check_names=False, atol=1e-6)
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('seed', range(5))
+def test_bulk_match_agrees_with_per_lot_loop(method, seed):
+    transactions = random_log(seed)
+    assert_matches(Ledger(transactions, method), naive_positions(transactions, method))
+
+@pytest.mark.parametrize('method', METHODS)
+def test_realized_rows_cover_every_sold_unit(method):
+    transactions = random_log(7)
+    sold = sum(t['quantity'] for t in transactions if t['type'] == 'Sell')
+    assert Ledger(transactions, method).realized()['quantity'].sum() == pytest.approx(sold)
+
+@pytest.mark.parametrize('method', METHODS)
+def test_append_agrees_with_bulk_match(method):
+    transactions = random_log(11)
+    ledger = Ledger(transactions[:200], method)
+    for transaction in transactions[200:]:
+        ledger.append(transaction)
+    assert ledger.last_id == transactions[-1]['id']
+    assert_matches(ledger, naive_positions(transactions, method))
+
+@pytest.mark.parametrize('method', METHODS)
+def test_back_dated_append_rematches_its_symbol(method):
+    transactions = random_log(13)
+    late = {'id': 1000, 'date': pd.Timestamp('2024-01-01 00:30'), 'type': 'Buy', 'symbol': 'BBB',
+            'quantity': 7.0, 'price': 42.0}
+    ledger = Ledger(transactions, method)
+    ledger.append(late)
+    assert_matches(ledger, naive_positions(transactions + [late], method))
+
+def test_fifo_and_lifo_pick_opposite_lots():
+    transactions = [
+        {'id': 1, 'date': '2024-01-01', 'type': 'Buy', 'symbol': 'X', 'quantity': 10, 'price': 100},
+        {'id': 2, 'date': '2024-02-01', 'type': 'Buy', 'symbol': 'X', 'quantity': 10, 'price': 120},
+        {'id': 3, 'date': '2024-03-01', 'type': 'Sell', 'symbol': 'X', 'quantity': 5, 'price': 130},
+    ]
+    assert Ledger(transactions, 'fifo').positions().at['X', 'realized_pnl'] == pytest.approx(150)
+    assert Ledger(transactions, 'lifo').positions().at['X', 'realized_pnl'] == pytest.approx(50)
+    assert Ledger(transactions, 'average').positions().at['X', 'realized_pnl'] == pytest.approx(100)
+
+@pytest.mark.parametrize('method', METHODS)
+def test_oversold_sell_is_rejected(method):
+    buy = {'id': 1, 'date': '2024-01-01', 'type': 'Buy', 'symbol': 'X', 'quantity': 1, 'price': 10}
+    sell = {'id': 2, 'date': '2024-01-02', 'type': 'Sell', 'symbol': 'X', 'quantity': 2, 'price': 10}
+    with pytest.raises(LedgerError):
+        Ledger([buy, sell], method)
+    ledger = Ledger([buy], method)
+    with pytest.raises(LedgerError):
+        ledger.append(sell)
+
+def test_back_dated_sell_is_checked_at_its_own_date():
+    log = [{'id': 1, 'date': '2024-06-01', 'type': 'Buy', 'symbol': 'X', 'quantity': 10, 'price': 10},
+           {'id': 2, 'date': '2024-03-01', 'type': 'Buy', 'symbol': 'Y', 'quantity': 10, 'price': 10}]
+    sell = {'date': '2024-01-01', 'type': 'Sell', 'symbol': 'X', 'quantity': 5, 'price': 12}
+    with pytest.raises(LedgerError):
+        check_transaction(log, sell)
+    check_transaction(log, {**sell, 'date': '2024-06-01'})
+    check_transaction(log, {**sell, 'date': '2024-07-01', 'quantity': 10})
+    with pytest.raises(LedgerError):
+        # A back-dated sell that leaves a later sell short
+        check_transaction(log + [{'id': 3, 'date': '2024-08-01', 'type': 'Sell', 'symbol': 'X', 'quantity': 8,
+                                  'price': 12}], {**sell, 'date': '2024-07-01'})
+
+def test_get_ledger_rebuilds_after_a_deletion(tmp_path, monkeypatch):
+    store = PortfolioStore(str(tmp_path / 'ledger.db'))
+    monkeypatch.setattr(core.ledger, 'get_portfolio_store', lambda: store)
+    monkeypatch.setattr(core.ledger, '_default_ledgers', {})
+    row = {'date': '2024-01-01', 'type': 'Buy', 'symbol': 'X', 'asset_type': 'Stock', 'quantity': 4.0,
+           'price': 10.0, 'total_amount': 40.0, 'timestamp': '2024-01-01T00:00:00'}
+    store.add_transactions([row, {**row, 'date': '2024-02-01', 'quantity': 6.0, 'total_amount': 60.0}])
+    assert get_ledger().positions().at['X', 'quantity'] == 10.0
+    store.delete_transaction(store.transactions()[0]['id'])
+    assert get_ledger().positions().at['X', 'quantity'] == 6.0
+
+def test_sync_holdings_follows_sells_and_deletions(tmp_path, monkeypatch):
+    store = PortfolioStore(str(tmp_path / 'holdings.db'))
+    monkeypatch.setattr(core.ledger, 'get_portfolio_store', lambda: store)
+    monkeypatch.setattr(core.ledger, '_default_ledgers', {})
+    store.add_holding('OLD', 'Stock', 3.0, 50.0, 55.0)
+    row = {'date': '2024-01-01', 'type': 'Buy', 'symbol': 'X', 'asset_type': 'Stock', 'quantity': 10.0,
+           'price': 10.0, 'total_amount': 100.0, 'timestamp': '2024-01-01T00:00:00'}
+    store.add_transactions([row, {**row, 'date': '2024-02-01', 'type': 'Sell', 'quantity': 4.0, 'price': 12.0,
+                                  'total_amount': 48.0}])
+    sync_holdings()
+    assert store.holdings()['X']['quantity'] == 6.0
+    assert store.holdings()['X']['purchase_price'] == 10.0
+    assert store.holdings()['OLD']['quantity'] == 3.0  # never traded: left alone
+
+    store.add_transactions([{**row, 'date': '2024-03-01', 'type': 'Sell', 'quantity': 6.0, 'total_amount': 60.0}])
+    sync_holdings()
+    assert 'X' not in store.holdings()
+
+    store.add_transactions([{**row, 'symbol': 'Y'}])
+    sync_holdings()
+    store.delete_transaction(store.transactions(symbol='Y')[0]['id'])
+    sync_holdings(removed=['Y'])
+    assert 'Y' not in store.holdings()
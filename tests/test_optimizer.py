@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.optimizer import (efficient_frontier, portfolio_stats, project_capped_simplex, rebalance_trades,
+                            solve_batch)
+
+def random_problem(seed, n=8):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(n, 3)) * 0.1
+    cov = factors @ factors.T + np.diag(rng.uniform(0.01, 0.06, n))
+    mu = rng.uniform(0.02, 0.15, n)
+    symbols = [f"A{i}" for i in range(n)]
+    return pd.Series(mu, index=symbols), pd.DataFrame(cov, index=symbols, columns=symbols)
+
+def random_capped_portfolios(rng, count, n, cap):
+    return project_capped_simplex(rng.dirichlet(np.full(n, 0.5), size=count) * rng.uniform(0.5, 2.0), cap)
+
+@pytest.mark.parametrize('cap', [1.0, 0.5, 0.25, 0.125])
+def test_projection_is_feasible(cap):
+    v = np.random.default_rng(0).normal(scale=3.0, size=(500, 8))
+    w = project_capped_simplex(v, cap)
+    np.testing.assert_allclose(w.sum(axis=1), 1.0, atol=1e-10)
+    assert w.min() >= 0.0 and w.max() <= cap + 1e-12
+
+def test_projection_is_the_closest_feasible_point():
+    rng = np.random.default_rng(1)
+    v = rng.normal(size=(50, 6))
+    w = project_capped_simplex(v, 0.4)
+    candidates = random_capped_portfolios(rng, 2000, 6, 0.4)
+    for row, projected in zip(v, w):
+        assert np.sum((row - projected) ** 2) <= np.min(np.sum((candidates - row) ** 2, axis=1)) + 1e-12
+
+def test_projection_keeps_feasible_points():
+    w = np.array([[0.2, 0.3, 0.5], [0.4, 0.4, 0.2]])
+    np.testing.assert_allclose(project_capped_simplex(w, 0.5), w, atol=1e-12)
+
+def test_projection_rejects_an_unreachable_cap():
+    with pytest.raises(ValueError):
+        project_capped_simplex(np.ones((1, 4)), cap=0.2)
+
+def test_min_variance_matches_the_closed_form_when_unconstrained():
+    # Diagonal-dominant covariance: the unconstrained optimum is long-only
+    cov = np.diag([0.04, 0.09, 0.16, 0.25]) + 0.005
+    inverse = np.linalg.solve(cov, np.ones(4))
+    w = solve_batch(np.zeros(4), cov, [np.inf])[0]
+    np.testing.assert_allclose(w, inverse / inverse.sum(), atol=1e-6)
+
+@pytest.mark.parametrize('cap', [1.0, 0.3])
+def test_no_feasible_perturbation_improves_min_variance(cap):
+    mu, cov = random_problem(2)
+    w = solve_batch(mu.to_numpy(), cov.to_numpy(), [np.inf], cap)[0]
+    variance = w @ cov.to_numpy() @ w
+    eps = 1e-4
+    for i in range(len(w)):
+        for j in range(len(w)):
+            # Move eps of weight from asset i to asset j, where the bounds allow it
+            if i == j or w[i] < eps or w[j] > cap - eps:
+                continue
+            moved = w.copy()
+            moved[i] -= eps
+            moved[j] += eps
+            assert moved @ cov.to_numpy() @ moved >= variance - 1e-10
+
+@pytest.mark.parametrize('cap', [1.0, 0.4])
+def test_max_sharpe_beats_random_portfolios(cap):
+    mu, cov = random_problem(3)
+    result = efficient_frontier(mu, cov, cap, risk_free=0.02)
+    best = portfolio_stats(result['max_sharpe'].to_numpy(), mu, cov, 0.02)[2][0]
+    samples = random_capped_portfolios(np.random.default_rng(4), 20_000, len(mu), cap)
+    assert best >= np.nanmax(portfolio_stats(samples, mu, cov, 0.02)[2]) - 1e-6
+    assert result['max_sharpe'].max() <= cap + 1e-9
+
+def test_frontier_is_sorted_and_ends_at_min_variance():
+    mu, cov = random_problem(5)
+    result = efficient_frontier(mu, cov, 0.5)
+    frontier = result['frontier']
+    assert frontier['volatility'].is_monotonic_increasing
+    min_volatility = portfolio_stats(result['min_variance'].to_numpy(), mu, cov)[1][0]
+    assert frontier['volatility'].iloc[0] == pytest.approx(min_volatility)
+
+def test_rebalance_trades_reach_the_target_weights():
+    current = pd.Series({'A': 6000.0, 'B': 4000.0})
+    target = pd.Series({'B': 0.5, 'C': 0.5})
+    trades = rebalance_trades(current, target, {'A': 60.0, 'B': 40.0, 'C': 25.0}, cash=2000.0)
+    after = current.reindex(trades.index).fillna(0.0) + trades['trade_value']
+    np.testing.assert_allclose(after / 12000.0, [0.0, 0.5, 0.5])
+    assert trades.at['A', 'trade_quantity'] == pytest.approx(-100.0)
+    assert list(trades['side']) == ['Sell', 'Buy', 'Buy']
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.portfolio_series import PortfolioSeries
+
+def random_closes(seed, days=60):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, 3)), axis=0)),
+                        index=pd.bdate_range('2024-01-01', periods=days), columns=['A', 'B', 'C'])
+
+def random_transactions(closes, seed, n=20):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        date = closes.index[rng.integers(len(closes))]
+        symbol = closes.columns[rng.integers(3)]
+        rows.append({'id': i + 1, 'date': date.strftime('%Y-%m-%d'), 'type': 'Buy', 'symbol': symbol,
+                     'quantity': float(rng.integers(1, 10)), 'price': float(closes.at[date, symbol])})
+    return rows
+
+def assert_same_series(got, expected):
+    pd.testing.assert_frame_equal(got.frame(), expected.frame(), atol=1e-9, check_freq=False)
+
+def test_appended_days_agree_with_a_full_build():
+    closes = random_closes(0)
+    transactions = random_transactions(closes, 1)
+    series = PortfolioSeries(transactions, closes.iloc[:40])
+    for date, row in closes.iloc[40:].iterrows():
+        series.add_prices(date, row.to_dict())
+    assert_same_series(series, PortfolioSeries(transactions, closes))
+
+def test_added_transactions_agree_with_a_full_build():
+    closes = random_closes(2)
+    transactions = random_transactions(closes, 3)
+    series = PortfolioSeries(transactions[:10], closes)
+    for transaction in transactions[10:]:
+        series.add_transaction(transaction)
+    assert_same_series(series, PortfolioSeries(transactions, closes))
+
+def test_last_day_is_re_marked_at_its_close():
+    closes = random_closes(4)
+    transactions = random_transactions(closes, 5)
+    intraday = closes.copy()
+    intraday.iloc[-1] *= 0.9
+    series = PortfolioSeries(transactions, intraday)
+    series.add_prices(closes.index[-1], closes.iloc[-1].to_dict())
+    assert_same_series(series, PortfolioSeries(transactions, closes))
+
+def test_prices_before_the_last_day_are_rejected():
+    closes = random_closes(6)
+    series = PortfolioSeries(random_transactions(closes, 7), closes)
+    with pytest.raises(ValueError):
+        series.add_prices(closes.index[-2], closes.iloc[-2].to_dict())
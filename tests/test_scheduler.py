@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from core.http_client import HTTPClient
+from core.scheduler import (PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, PRIORITY_REFRESH, RateLimitScheduler,
+                            TokenBucket, request_priority)
+
+def wait_for_queue(scheduler, provider, depth):
+    deadline = time.monotonic() + 5
+    while scheduler.stats()[provider]['queue_depth'] < depth:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.005)
+
+def test_bucket_never_exceeds_its_quota_in_a_window():
+    bucket = TokenBucket(10, 0.3)
+    start = time.monotonic()
+    granted = 0
+    while time.monotonic() - start < 0.3:
+        granted += bucket.try_take() == 0.0
+    assert granted <= 10
+
+def test_waiters_are_served_by_priority_then_arrival():
+    scheduler = RateLimitScheduler({'stub': (2, 600)})  # one token, then none for minutes
+    scheduler.acquire('stub')
+    order = []
+
+    def wait(name, priority):
+        scheduler.acquire('stub', priority=priority)
+        order.append(name)
+
+    waiters = [('prefetch', PRIORITY_PREFETCH), ('refresh-1', PRIORITY_REFRESH),
+               ('interactive', PRIORITY_INTERACTIVE), ('refresh-2', PRIORITY_REFRESH)]
+    threads = [threading.Thread(target=wait, args=waiter) for waiter in waiters]
+    for depth, thread in enumerate(threads, start=1):
+        thread.start()
+        wait_for_queue(scheduler, 'stub', depth)
+    # Everyone is queued on an empty bucket; now let tokens flow one at a time
+    with scheduler._cond:
+        scheduler.buckets['stub'].rate = 50.0
+        scheduler._cond.notify_all()
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ['interactive', 'refresh-1', 'refresh-2', 'prefetch']
+
+def test_thread_priority_applies_when_none_is_passed():
+    scheduler = RateLimitScheduler({'stub': (100, 1.0)})
+    with request_priority(PRIORITY_PREFETCH):
+        scheduler.acquire('stub')
+    assert scheduler.stats()['stub']['prefetch_granted'] == 1
+
+def test_quota_wait_times_out_and_leaves_the_queue():
+    scheduler = RateLimitScheduler({'stub': (1, 60)})
+    scheduler.acquire('stub')
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        scheduler.acquire('stub', timeout=0.2)
+    assert 0.2 <= time.monotonic() - start < 1.0
+    assert scheduler.stats()['stub']['queue_depth'] == 0
+
+def test_http_requests_give_up_when_the_quota_wait_times_out(stub_server):
+    stub_server.reply('/price', (200, {}))
+    scheduler = RateLimitScheduler({'stub': (1, 60)}, hosts={'127.0.0.1': 'stub'})
+    client = HTTPClient(scheduler=scheduler)
+    client.get_json(f"{stub_server.url}/price")
+    with pytest.raises(TimeoutError):
+        client.get(f"{stub_server.url}/price", quota_timeout=0.2)
+    assert stub_server.hits['/price'] == 1